@@ -0,0 +1,333 @@
+# benchmarks.py
+"""
+Benchmark suite for the LHL Trading Bot
+- Seeded synthetic candle generators (based on the test_sr*.py scripts)
+- Times S/R detection, the CSV loader and a simulated bot cycle
+- Saves results to a JSON baseline and fails on regressions
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from data_fetcher import load_market_data_from_csv
+from support_resistance import find_lhl_support_resistance
+from candle_buffer import CandleBuffer
+from position_book import PositionBook
+import live_signal_bot
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_WINDOWS = [5, 10, 20]
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_THRESHOLD = 0.25
+
+BENCH_CONFIG = {
+    'sr_price_tolerance': 0.01,
+    'entry_proximity': 0.002,
+    'trade_margin_usdt': 10.0,
+    'leverage': 25
+}
+
+
+def generate_lhl_candles(num_candles, seed=42, base_price=100.0, pattern_every=100, timeframe_minutes=5):
+    """
+    Generate seeded OHLCV candles with injected LHL patterns.
+
+    Vectorized version of test_sr.generate_test_data: a mean-reverting random
+    walk (so prices stay positive over millions of candles) with a low-high-low
+    motif every `pattern_every` candles.
+
+    Args:
+        num_candles (int): Number of candles to generate.
+        seed (int): Seed for the random generator.
+        base_price (float): Price level the walk reverts to.
+        pattern_every (int): Spacing of the injected LHL motifs.
+        timeframe_minutes (int): Candle duration used for the timestamps.
+
+    Returns:
+        pd.DataFrame: Columns 'timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'.
+    """
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0.0, 0.002, num_candles)
+    log_dev = lfilter([1.0], [1.0, -0.999], shocks)
+    close = base_price * np.exp(log_dev)
+
+    # Low-High-Low motif, second low slightly deeper like in test_sr.py
+    starts = np.arange(0, max(num_candles - 2, 0), pattern_every)
+    close[starts] *= 0.98
+    close[starts + 1] *= 1.02
+    close[starts + 2] *= 0.979
+
+    return _ohlcv_from_close(close, rng, timeframe_minutes)
+
+
+def generate_regime_candles(num_candles, seed=42, base_price=100.0, timeframe_minutes=5):
+    """
+    Generate seeded OHLCV candles following the three sine regimes of
+    test_sr_updates.generate_sample_data, with a little noise on top.
+    """
+    rng = np.random.default_rng(seed)
+    i = np.arange(num_candles)
+    offsets = np.select([i < num_candles / 3, i < num_candles * 2 / 3], [0.0, 5.0], default=-2.0)
+    close = base_price + offsets + np.sin(i / 10) * 2 + rng.normal(0.0, 0.05, num_candles)
+    return _ohlcv_from_close(close, rng, timeframe_minutes)
+
+
+def _ohlcv_from_close(close, rng, timeframe_minutes):
+    """Build Open/High/Low/Volume columns around a close series"""
+    num_candles = len(close)
+    open_ = np.empty_like(close)
+    if num_candles:
+        open_[0] = close[0]
+        open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0.0, 0.001, (2, num_candles)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = np.round(rng.lognormal(8.0, 1.0, num_candles), 1)
+
+    start = pd.Timestamp('2025-01-01')
+    timestamps = pd.date_range(start, periods=num_candles, freq=f'{timeframe_minutes}min')
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume
+    })
+
+
+class FakeExchange:
+    """Minimal stand-in for the ccxt client that replays candles two at a time"""
+
+    def __init__(self, candles_df):
+        self._rows = np.column_stack([
+            candles_df['timestamp'].values.astype('datetime64[ms]').astype(np.int64),
+            candles_df[['Open', 'High', 'Low', 'Close', 'Volume']].values
+        ]).tolist()
+        self._cursor = 2
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        if self._cursor > len(self._rows):
+            self._cursor = 2
+        rows = self._rows[self._cursor - (limit or 2):self._cursor]
+        self._cursor += 1
+        return [[int(r[0])] + r[1:] for r in rows]
+
+
+def time_call(func, repeat=3):
+    """Return the best wall-clock time of `repeat` calls to func (seconds)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _repeats_for(num_candles):
+    if num_candles <= 10_000:
+        return 5
+    if num_candles <= 100_000:
+        return 3
+    return 1
+
+
+def bench_find_lhl(sizes, windows, max_seconds):
+    """Time find_lhl_support_resistance across candle counts and window sizes"""
+    results = {}
+    for window in windows:
+        for size in sorted(sizes):
+            name = f"find_lhl[n={size},w={window}]"
+            df = generate_lhl_candles(size)
+            elapsed = time_call(
+                lambda: find_lhl_support_resistance(df, tolerance_percent=0.01, window_size=window, sr_count=10),
+                repeat=_repeats_for(size)
+            )
+            results[name] = elapsed
+            print(f"{name}: {elapsed:.4f}s")
+            if elapsed > max_seconds:
+                print(f"Skipping larger sizes for window {window}: {elapsed:.1f}s exceeds {max_seconds}s")
+                break
+    return results
+
+
+def bench_closest_sr(num_candles=1000, calls=20):
+    """Time get_closest_sr_levels on a bot-sized history"""
+    df = generate_lhl_candles(num_candles)
+    current_price = float(df['Close'].iloc[-1])
+    elapsed = time_call(
+        lambda: [live_signal_bot.get_closest_sr_levels(current_price, df, BENCH_CONFIG) for _ in range(calls)]
+    )
+    return {f"get_closest_sr_levels[n={num_candles}]": elapsed / calls}
+
+
+def bench_csv_loader(sizes):
+    """Time load_market_data_from_csv on generated market_data-style files"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sorted(sizes):
+            df = generate_lhl_candles(size).rename(columns={'timestamp': 'Time'})
+            df['Symbol'] = 'BENCHUSDT_UMCBL'
+            csv_path = os.path.join(tmp_dir, f'market_data_{size}.csv')
+            df.to_csv(csv_path, index=False)
+            name = f"load_market_data_from_csv[n={size}]"
+            results[name] = time_call(lambda: load_market_data_from_csv(csv_path), repeat=_repeats_for(size))
+            print(f"{name}: {results[name]:.4f}s")
+    return results
+
+
+def bench_bot_cycle(cycles=50, history=1000):
+    """
+    Time one simulated live_signal_bot.main iteration: fetch the latest two
+    candles, merge them into the history, recompute S/R and check for entries.
+    """
+    candles_df = generate_lhl_candles(history + cycles + 2)
+    exchange = FakeExchange(candles_df)
+    exchange._cursor = history
+    candle_buffer = CandleBuffer.from_frame(candles_df.iloc[:history], capacity=history)
+
+    def run_cycles():
+        for _ in range(cycles):
+            latest_candles = exchange.fetch_ohlcv('BENCH', '5m', limit=2)
+            candle_buffer.upsert_ohlcv(latest_candles)
+            historical_candles_df = candle_buffer.to_frame()
+            current_price = float(latest_candles[-1][4])
+            sr_df = live_signal_bot.get_closest_sr_levels(current_price, historical_candles_df, BENCH_CONFIG)
+            live_signal_bot.is_developing_lhl(current_price, sr_df, BENCH_CONFIG['entry_proximity'])
+
+    elapsed = time_call(run_cycles, repeat=1)
+    return {f"bot_cycle[history={history}]": elapsed / cycles}
+
+
+def bench_position_book(open_positions=5000, ticks=2000):
+    """Time PositionBook.on_price per tick with thousands of open positions"""
+    close = generate_lhl_candles(ticks)['Close'].values
+    rng = np.random.default_rng(42)
+    book = PositionBook()
+    # Entries spread from 5% below to 5% above the first price, stops 10% under the entry
+    for entry in close[0] * rng.uniform(0.95, 1.05, open_positions):
+        book.open('BENCH', entry, entry * 0.9)
+
+    def run_ticks():
+        for price in close:
+            # Keep the book at its size: every exit is replaced by an entry at the current price
+            for _ in book.on_price('BENCH', price):
+                book.open('BENCH', price, price * 0.9)
+
+    elapsed = time_call(run_ticks, repeat=1)
+    return {f"position_book_tick[open={open_positions}]": elapsed / ticks}
+
+
+def run_suite(sizes, windows, csv_sizes, max_seconds):
+    """Run every benchmark and return a flat {name: seconds} dict"""
+    results = {}
+    results.update(bench_find_lhl(sizes, windows, max_seconds))
+    results.update(bench_closest_sr())
+    results.update(bench_csv_loader(csv_sizes))
+    results.update(bench_bot_cycle())
+    results.update(bench_position_book())
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results against a baseline.
+
+    Returns:
+        list: (name, baseline_seconds, current_seconds) for every benchmark
+        slower than baseline * (1 + threshold). Benchmarks missing from either
+        side are ignored.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or previous <= 0:
+            continue
+        if current > previous * (1 + threshold):
+            regressions.append((name, previous, current))
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get('results', {})
+    except FileNotFoundError:
+        return None
+
+
+def save_results(path, results):
+    payload = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__
+        },
+        'results': results
+    }
+    output_dir = Path(path).parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite for the LHL Trading Bot')
+    parser.add_argument('--sizes', type=_int_list, default=DEFAULT_SIZES, help='Comma separated candle counts for find_lhl')
+    parser.add_argument('--windows', type=_int_list, default=DEFAULT_WINDOWS, help='Comma separated window sizes')
+    parser.add_argument('--csv-sizes', type=_int_list, default=[100_000, 1_000_000], help='Comma separated CSV row counts')
+    parser.add_argument('--max-seconds', type=float, default=120.0, help='Skip larger sizes once a run takes longer than this')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--output', default=None, help='Where to write this run (default: alongside the baseline)')
+    parser.add_argument('--save-baseline', action='store_true', help='Overwrite the baseline with this run')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown fraction before failing')
+    args = parser.parse_args()
+
+    # Keep the S/R info logging out of the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_suite(args.sizes, args.windows, args.csv_sizes, args.max_seconds)
+
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    output_path = args.output or str(Path(args.baseline).with_name('benchmark_latest.json'))
+    save_results(output_path, results)
+    print(f"Results saved to {output_path}")
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline found at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name, previous, current in regressions:
+            print(f"  {name}: {previous:.4f}s -> {current:.4f}s ({current / previous - 1:+.0%})")
+        return 1
+
+    print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,37 @@
+# bot_config.py
+"""
+Configuration access for the LHL Trading Bot
+- config.ini is parsed on first use and cached, so importing a module
+  never touches the file system
+- get_setting() for single values, get_config() for the parsed file,
+  reload_config() after editing the file at runtime
+"""
+
+import configparser
+import functools
+import os
+
+CONFIG_FILE = 'config.ini'
+
+
+@functools.lru_cache(maxsize=None)
+def get_config(path=CONFIG_FILE):
+    """Parsed config file, cached per path (empty when the file does not exist)"""
+    config = configparser.ConfigParser()
+    if os.path.exists(path):
+        config.read(path)
+    return config
+
+
+def get_setting(section, key, fallback=None, path=CONFIG_FILE):
+    """One value from the config file, `fallback` if the section or key is missing"""
+    return get_config(path).get(section, key, fallback=fallback)
+
+
+def config_exists(path=CONFIG_FILE):
+    return os.path.exists(path)
+
+
+def reload_config():
+    """Drop the cached files so the next access reads them again"""
+    get_config.cache_clear()
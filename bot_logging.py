@@ -0,0 +1,159 @@
+# bot_logging.py
+"""
+Logging setup for the LHL Trading Bot
+- Records are queued by the caller and written by a background listener,
+  so a slow disk never blocks the trading loop
+- EventJournal: compact append-only JSONL journal for trades, signals and
+  S/R changes, written from its own background thread
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from pathlib import Path
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+def setup_logging(log_file='bot.log', level=logging.INFO, console=True):
+    """
+    Route the root logger through a QueueHandler/QueueListener pair.
+
+    The calling thread only enqueues the record; formatting and file/console
+    I/O happen on the listener thread. Safe to call more than once: later
+    calls return the already running listener.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    # The format has no thread/process fields, skip collecting them per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class EventJournal:
+    """
+    Append-only JSONL event journal.
+
+    record() only timestamps the event and puts it on a queue; a daemon thread
+    serializes and appends it to the file. One line per event:
+    {"ts": <epoch seconds>, "event": <type>, ...fields}
+
+    Args:
+        path (str): JSONL file to append to; empty or None disables the file.
+        clock: Source of the event timestamps, time.time by default (a replay
+            passes its virtual clock).
+        keep_events (bool): Also keep every event as a dict in `events`.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path, clock=time.time, keep_events=False):
+        self.path = path
+        self.clock = clock
+        self.events = [] if keep_events else None
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='event-journal', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def record(self, event, **fields):
+        """Queue one event for the journal (no-op when no path is configured and events are not kept)"""
+        if self._thread is None and self.events is None:
+            return
+        ts = self.clock()
+        if self.events is not None:
+            self.events.append({'ts': ts, 'event': event, **fields})
+        if self._thread is not None:
+            self._queue.put((ts, event, fields))
+
+    def _run(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+                lines = []
+                while item is not None and item is not self._STOP:
+                    ts, event, fields = item
+                    lines.append(json.dumps({'ts': ts, 'event': event, **fields},
+                                            separators=(',', ':'), default=_json_default))
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                f.write('\n'.join(lines) + '\n')
+                f.flush()
+                if item is self._STOP:
+                    break
+
+    def close(self):
+        """Write out pending events and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def read_journal(path):
+    """Load every event of a JSONL journal as a list of dicts"""
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
@@ -0,0 +1,191 @@
+# candle_buffer.py
+"""
+Fixed-capacity candle history for the LHL Trading Bot
+- NumPy-backed circular buffer, constant memory per symbol
+- Upserts the forming candle in place, appends closed candles in O(1)
+- Exposes zero-copy contiguous views (and a DataFrame over them) for S/R
+- Optionally stores prices as integer ticks (int32 by default) to halve
+  the memory of long histories
+"""
+
+import numpy as np
+import pandas as pd
+
+from price_ticks import PriceTicks
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLUMNS = OHLCV_COLUMNS[:4]
+
+
+class CandleBuffer:
+    """
+    Circular buffer of OHLCV candles keyed by open time (ms since epoch).
+
+    Every candle is written twice, at slot i and slot i + capacity, so the
+    live window [start, start + size) is always one contiguous slice of the
+    backing arrays. Views and frames returned by this class share memory with
+    the buffer and are only valid until the next write.
+
+    With `tick_size` set, Open/High/Low/Close are stored as integer ticks of
+    `tick_dtype`: prices are rounded to the tick on write, ticks() gives
+    zero-copy views of the tick counts, and column()/to_frame() return
+    float copies instead of views.
+    """
+
+    def __init__(self, capacity=1000, tick_size=None, tick_dtype=np.int32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self.price_ticks = PriceTicks(tick_size, tick_dtype) if tick_size else None
+        price_dtype = self.price_ticks.dtype if self.price_ticks else np.float64
+        self._timestamps = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._prices = np.zeros((len(PRICE_COLUMNS), 2 * self.capacity), dtype=price_dtype)
+        self._volume = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    @classmethod
+    def from_frame(cls, df, capacity=1000, tick_size=None, tick_dtype=np.int32):
+        """Build a buffer from a DataFrame with 'timestamp' and OHLCV columns"""
+        buffer = cls(capacity, tick_size, tick_dtype)
+        if df is not None and not df.empty:
+            timestamps = pd.to_datetime(df['timestamp']).values.astype('datetime64[ms]').astype(np.int64)
+            buffer.extend(timestamps, df[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+        return buffer
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def empty(self):
+        return self._size == 0
+
+    @property
+    def nbytes(self):
+        return self._timestamps.nbytes + self._prices.nbytes + self._volume.nbytes
+
+    @property
+    def tick_size(self):
+        return self.price_ticks.tick_size if self.price_ticks else None
+
+    @property
+    def last_timestamp(self):
+        """Open time (ms) of the newest candle, or None if empty"""
+        if not self._size:
+            return None
+        return int(self._timestamps[self._start + self._size - 1])
+
+    def _write(self, pos, timestamp, values):
+        prices = values[:4]
+        if self.price_ticks:
+            prices = self.price_ticks.to_ticks(prices)
+        self._timestamps[pos] = timestamp
+        self._timestamps[pos + self.capacity] = timestamp
+        self._prices[:, pos] = prices
+        self._prices[:, pos + self.capacity] = prices
+        self._volume[pos] = values[4]
+        self._volume[pos + self.capacity] = values[4]
+
+    def upsert(self, timestamp, open_, high, low, close, volume):
+        """
+        Insert or update one candle.
+
+        A candle with the newest open time overwrites the forming candle in
+        place; a newer one is appended (evicting the oldest when full); an
+        older one updates its slot if still buffered and is ignored otherwise.
+
+        Returns:
+            bool: True if the buffer changed.
+        """
+        timestamp = int(timestamp)
+        values = (open_, high, low, close, volume)
+        end = self._start + self._size
+
+        if self._size and timestamp <= self._timestamps[end - 1]:
+            if timestamp == self._timestamps[end - 1]:
+                self._write((end - 1) % self.capacity, timestamp, values)
+                return True
+            window = self._timestamps[self._start:end]
+            offset = int(np.searchsorted(window, timestamp))
+            if offset < self._size and window[offset] == timestamp:
+                self._write((self._start + offset) % self.capacity, timestamp, values)
+                return True
+            return False
+
+        if self._size < self.capacity:
+            pos = end % self.capacity
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._write(pos, timestamp, values)
+        return True
+
+    def upsert_ohlcv(self, ohlcv_rows):
+        """Upsert raw ccxt fetch_ohlcv rows ([ms, open, high, low, close, volume])"""
+        changed = False
+        for row in ohlcv_rows or []:
+            changed = self.upsert(*row[:6]) or changed
+        return changed
+
+    def extend(self, timestamps, values):
+        """
+        Bulk-load candles sorted by open time, replacing the current contents.
+
+        Args:
+            timestamps (np.ndarray): Open times in ms, shape (n,).
+            values (np.ndarray): OHLCV values, shape (n, 5).
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        prices = values[:, :4].T
+        if self.price_ticks:
+            prices = self.price_ticks.to_ticks(prices)
+        n = len(timestamps)
+        self._start = 0
+        self._size = n
+        self._timestamps[:n] = timestamps
+        self._timestamps[self.capacity:self.capacity + n] = timestamps
+        self._prices[:, :n] = prices
+        self._prices[:, self.capacity:self.capacity + n] = prices
+        self._volume[:n] = values[:, 4]
+        self._volume[self.capacity:self.capacity + n] = values[:, 4]
+
+    def timestamps(self):
+        """Zero-copy view of the open times (ms), oldest first"""
+        return self._timestamps[self._start:self._start + self._size]
+
+    def column(self, name):
+        """One OHLCV column as float prices, oldest first (zero-copy unless prices are stored as ticks)"""
+        window = slice(self._start, self._start + self._size)
+        if name == 'Volume':
+            return self._volume[window]
+        prices = self._prices[PRICE_COLUMNS.index(name), window]
+        return self.price_ticks.from_ticks(prices) if self.price_ticks else prices
+
+    def ticks(self, name):
+        """Zero-copy view of one price column as integer ticks (tick buffers only)"""
+        if not self.price_ticks:
+            raise ValueError("Buffer was created without a tick_size")
+        return self._prices[PRICE_COLUMNS.index(name), self._start:self._start + self._size]
+
+    def last(self):
+        """Newest candle as (timestamp_ms, open, high, low, close, volume), or None"""
+        if not self._size:
+            return None
+        pos = self._start + self._size - 1
+        prices = self._prices[:, pos]
+        if self.price_ticks:
+            prices = self.price_ticks.from_ticks(prices)
+        return (int(self._timestamps[pos]),) + tuple(float(v) for v in prices) + (float(self._volume[pos]),)
+
+    def to_frame(self):
+        """
+        DataFrame over the buffer without copying: 'timestamp' (datetime64[ms])
+        plus OHLCV columns, in the layout produced by fetch_initial_data.
+        Tick buffers convert the price columns to floats (a copy).
+        """
+        data = {'timestamp': self.timestamps().view('datetime64[ms]')}
+        for name in OHLCV_COLUMNS:
+            data[name] = self.column(name)
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,307 @@
+# candle_builder.py
+"""
+Local candle building from the trade stream
+- CandleBuilder aggregates trades into OHLCV bars of any timeframe, updating
+  the forming bar in place in a CandleBuffer and starting a new bar at each
+  boundary; batches of trades are aggregated with NumPy
+- reconcile() merges REST fetch_ohlcv rows: closed bars take the exchange's
+  values, the forming bar keeps the locally seen close and extremes
+- TradeCandleExchange: ccxt-style wrapper for live_signal_bot.main whose
+  fetch_ohlcv serves the locally built bars, fed by a websocket trade stream
+  (ccxt.pro watch_trades) or by REST fetch_trades polling, and reconciled
+  against the exchange's candles every `reconcile_interval` seconds
+"""
+
+import collections
+import logging
+import threading
+import time
+
+import numpy as np
+
+from candle_buffer import CandleBuffer
+
+_UNIT_MS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def timeframe_to_ms(timeframe):
+    """'5m' -> 300000; accepts ccxt timeframe strings (s, m, h, d, w)"""
+    return int(timeframe[:-1]) * _UNIT_MS[timeframe[-1]]
+
+
+class CandleBuilder:
+    """
+    OHLCV bars built from trades.
+
+    Args:
+        timeframe (str): Bar length as a ccxt timeframe ('1m', '5m', '1h', ...).
+        capacity (int): Bars kept (CandleBuffer capacity).
+        tick_size (float): Store prices as integer ticks (see CandleBuffer).
+
+    Trades older than the forming bar are counted in `late_trades` and
+    otherwise dropped; the next reconcile() corrects the closed bar.
+    """
+
+    def __init__(self, timeframe='5m', capacity=1000, tick_size=None):
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.buffer = CandleBuffer(capacity, tick_size)
+        self.late_trades = 0
+        self.last_trade_ms = None
+        # Forming bar as [open_ms, open, high, low, close, volume], None before the first bar
+        self._forming = None
+
+    @property
+    def forming(self):
+        """The forming bar as (open_ms, open, high, low, close, volume), or None"""
+        return None if self._forming is None else tuple(self._forming)
+
+    def add_trade(self, timestamp_ms, price, amount):
+        """Apply one trade; returns the bars it closed (list of OHLCV tuples)"""
+        return self.add_trades([timestamp_ms], [price], [amount])
+
+    def add_trades(self, timestamps_ms, prices, amounts):
+        """
+        Apply a batch of trades (any order); returns the bars closed by it,
+        oldest first, as (open_ms, open, high, low, close, volume) tuples.
+        """
+        timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+        if not timestamps_ms.size:
+            return []
+        prices = np.asarray(prices, dtype=np.float64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if np.any(timestamps_ms[1:] < timestamps_ms[:-1]):
+            order = np.argsort(timestamps_ms, kind='stable')
+            timestamps_ms, prices, amounts = timestamps_ms[order], prices[order], amounts[order]
+
+        bars = timestamps_ms - timestamps_ms % self.timeframe_ms
+        if self._forming is not None:
+            late = bars < self._forming[0]
+            if late.any():
+                self.late_trades += int(late.sum())
+                keep = ~late
+                timestamps_ms, prices, amounts, bars = timestamps_ms[keep], prices[keep], amounts[keep], bars[keep]
+                if not bars.size:
+                    return []
+        self.last_trade_ms = int(timestamps_ms[-1])
+
+        # One segment per bar in the batch
+        starts = np.concatenate(([0], np.flatnonzero(bars[1:] != bars[:-1]) + 1))
+        highs = np.maximum.reduceat(prices, starts)
+        lows = np.minimum.reduceat(prices, starts)
+        volumes = np.add.reduceat(amounts, starts)
+        ends = np.append(starts[1:], len(prices)) - 1
+
+        closed = []
+        for k, start in enumerate(starts):
+            bar = int(bars[start])
+            forming = self._forming
+            if forming is not None and forming[0] == bar:
+                forming[2] = max(forming[2], highs[k])
+                forming[3] = min(forming[3], lows[k])
+                forming[4] = prices[ends[k]]
+                forming[5] += volumes[k]
+            else:
+                if forming is not None:
+                    closed.append(tuple(forming))
+                self._forming = [bar, prices[start], highs[k], lows[k], prices[ends[k]], volumes[k]]
+        for bar in closed:
+            self.buffer.upsert(*bar)
+        self.buffer.upsert(*self._forming)
+        return closed
+
+    def add_ccxt_trades(self, trades):
+        """Apply ccxt trade dicts ('timestamp', 'price', 'amount')"""
+        if not trades:
+            return []
+        return self.add_trades(
+            [trade['timestamp'] for trade in trades], [trade['price'] for trade in trades],
+            [trade['amount'] for trade in trades]
+        )
+
+    def reconcile(self, ohlcv_rows):
+        """
+        Merge exchange candles ([ms, open, high, low, close, volume] rows).
+
+        Bars before the forming one take the exchange's values; the forming
+        bar takes the exchange's open and the wider of both ranges while
+        keeping the local close; bars newer than the local forming one (no
+        trade seen yet) are adopted as they are. Returns the number of bars
+        that differed from the local ones.
+        """
+        corrected = 0
+        for row in ohlcv_rows or []:
+            timestamp, open_, high, low, close, volume = int(row[0]), *map(float, row[1:6])
+            forming = self._forming
+            if forming is not None and timestamp == forming[0]:
+                merged = [timestamp, open_, max(high, forming[2]), min(low, forming[3]), forming[4],
+                          max(volume, forming[5])]
+                corrected += merged != forming
+                self._forming = merged
+                self.buffer.upsert(*merged)
+            elif forming is None or timestamp > forming[0]:
+                if forming is not None:
+                    self.buffer.upsert(*forming)
+                self._forming = [timestamp, open_, high, low, close, volume]
+                self.buffer.upsert(*self._forming)
+                corrected += forming is not None
+            else:
+                local = self._buffered(timestamp)
+                corrected += local is None or not np.allclose(local, (open_, high, low, close, volume))
+                self.buffer.upsert(timestamp, open_, high, low, close, volume)
+        return corrected
+
+    def _buffered(self, timestamp):
+        timestamps = self.buffer.timestamps()
+        index = int(np.searchsorted(timestamps, timestamp))
+        if index == len(timestamps) or timestamps[index] != timestamp:
+            return None
+        return tuple(float(self.buffer.column(name)[index]) for name in ('Open', 'High', 'Low', 'Close', 'Volume'))
+
+    def ohlcv(self, limit=None, since=None):
+        """Buffered bars as fetch_ohlcv rows, oldest first (the forming bar last)"""
+        timestamps = self.buffer.timestamps()
+        first, stop = 0, len(timestamps)
+        if since is not None:
+            first = int(np.searchsorted(timestamps, since))
+            if limit:
+                stop = min(first + limit, stop)
+        elif limit:
+            first = max(stop - limit, 0)
+        columns = [self.buffer.column(name)[first:stop] for name in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        return [[int(ts), *map(float, values)] for ts, *values in zip(timestamps[first:stop], *columns)]
+
+
+class _WebsocketTrades:
+    """Background thread collecting trades from ccxt.pro watch_trades into a queue"""
+
+    def __init__(self, exchange_id, symbol, options=None):
+        import ccxt.pro
+        # Raises ImportError / AttributeError here, before the thread starts, without websocket support
+        self._factory = getattr(ccxt.pro, exchange_id)
+        self.symbol = symbol
+        self.options = options or {}
+        self.queue = collections.deque()
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'trades-{symbol}', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import asyncio
+
+        async def watch():
+            exchange = self._factory(self.options)
+            try:
+                while not self._stop.is_set():
+                    try:
+                        self.queue.extend(await exchange.watch_trades(self.symbol))
+                        self.error = None
+                    except Exception as e:
+                        # ccxt.pro reconnects on the next watch call
+                        self.error = e
+                        await asyncio.sleep(1.0)
+            finally:
+                await exchange.close()
+
+        asyncio.run(watch())
+
+    def drain(self):
+        trades = []
+        while self.queue:
+            trades.append(self.queue.popleft())
+        return trades
+
+    def close(self):
+        self._stop.set()
+
+
+class TradeCandleExchange:
+    """
+    ccxt-style wrapper serving locally built candles to live_signal_bot.main.
+
+    Args:
+        exchange: ccxt client used for history, reconciliation and (without a
+            stream) fetch_trades polling.
+        symbol (str): Market to build.
+        timeframe (str): Bar length.
+        reconcile_interval (float): Seconds between REST reconciliations.
+        stream (bool): Use a ccxt.pro websocket trade stream; falls back to
+            fetch_trades polling when ccxt.pro is not available.
+        capacity (int): Bars kept.
+        clock: Object with time(), the time module by default.
+
+    Requests for history (`since`, or more bars than are built locally) and
+    for other symbols or timeframes go to the exchange; history also seeds
+    the builder.
+    """
+
+    def __init__(self, exchange, symbol, timeframe='5m', reconcile_interval=60.0, stream=True, capacity=1000,
+                 clock=time):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.id = getattr(exchange, 'id', 'exchange')
+        self.builder = CandleBuilder(timeframe, capacity)
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+        self.corrections = 0
+        self._last_reconcile = None
+        self._seen_ids = set()
+        self._stream = None
+        if stream:
+            try:
+                self._stream = _WebsocketTrades(exchange.id, symbol, {
+                    'apiKey': getattr(exchange, 'apiKey', ''), 'secret': getattr(exchange, 'secret', ''),
+                    'password': getattr(exchange, 'password', '')
+                })
+            except (ImportError, AttributeError) as e:
+                logging.warning("No websocket trade stream for %s (%s), polling fetch_trades", symbol, e)
+
+    def __getattr__(self, name):
+        # Everything but candles (markets, orders, ...) goes to the wrapped client
+        return getattr(self.exchange, name)
+
+    def _new_trades(self):
+        if self._stream is not None and self._stream.error is None:
+            trades = self._stream.drain()
+        else:
+            trades = self.exchange.fetch_trades(self.symbol, since=self.builder.last_trade_ms)
+        # fetch_trades(since=...) repeats the trades of the last millisecond; drop the ones already applied
+        last_ms = self.builder.last_trade_ms
+        fresh = [
+            trade for trade in trades
+            if last_ms is None or trade['timestamp'] > last_ms
+            or (trade['timestamp'] == last_ms and trade.get('id') not in self._seen_ids)
+        ]
+        if fresh:
+            newest = max(trade['timestamp'] for trade in fresh)
+            if newest != last_ms:
+                self._seen_ids = set()
+            self._seen_ids.update(trade.get('id') for trade in fresh if trade['timestamp'] == newest)
+        return fresh
+
+    def _reconcile(self, limit=3):
+        rows = self.exchange.fetch_ohlcv(self.symbol, self.builder.timeframe, limit=limit)
+        corrected = self.builder.reconcile(rows)
+        if corrected:
+            logging.debug("Reconciled %d locally built candles of %s", corrected, self.symbol)
+        self.corrections += corrected
+        self._last_reconcile = self.clock.time()
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        if symbol != self.symbol or timeframe != self.builder.timeframe:
+            return self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        if since is not None or not len(self.builder.buffer) or (limit and limit > len(self.builder.buffer)):
+            # History (initial load, catch-up after a restart) comes from the exchange and seeds the builder
+            rows = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            self.corrections += self.builder.reconcile(rows)
+            self._last_reconcile = self.clock.time()
+            return rows
+        self.builder.add_ccxt_trades(self._new_trades())
+        if self.clock.time() - self._last_reconcile >= self.reconcile_interval:
+            self._reconcile()
+        return self.builder.ohlcv(limit)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
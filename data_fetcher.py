@@ -7,36 +7,23 @@ Enhanced data fetcher for LHL Trading Bot
 """
 
 import pandas as pd
-import ccxt
 import logging
 import argparse
 from pathlib import Path
 import os
-import configparser
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('data_fetch.log'),
-        logging.StreamHandler()
-    ]
-)
+from bot_config import get_setting
 
 DEFAULT_COLUMNS = ["Time", "Open", "High", "Low", "Close", "Volume", "Symbol"]
 
-# Load configuration
-_config = configparser.ConfigParser()
-_config.read('config.ini')
-
 def get_exchange_client(exchange_id='bitget'):
     """Initialize CCXT exchange client with credentials from config.ini"""
+    import ccxt  # imported here so CSV-only users never pay for ccxt
     try:
         exchange = getattr(ccxt, exchange_id)({
-            'apiKey': _config.get('BITGET', 'API_KEY', fallback=''),
-            'secret': _config.get('BITGET', 'SECRET_KEY', fallback=''),
-            'password': _config.get('BITGET', 'PASSPHRASE', fallback=''),
+            'apiKey': get_setting('BITGET', 'API_KEY', fallback=''),
+            'secret': get_setting('BITGET', 'SECRET_KEY', fallback=''),
+            'password': get_setting('BITGET', 'PASSPHRASE', fallback=''),
             'options': {'defaultType': 'swap'}
         })
         exchange.load_markets()
@@ -143,7 +130,43 @@ def load_market_data_from_csv(file_path):
         logging.error(f"Error loading market data from CSV: {e}")
         return pd.DataFrame()
 
+def iter_market_data_csv(file_path, chunksize=100_000):
+    """
+    Stream a market data CSV in blocks of `chunksize` rows, with the same
+    column normalization as load_market_data_from_csv, so histories larger
+    than memory can be processed (see find_lhl_support_resistance_chunked).
+
+    Yields:
+        pd.DataFrame: Consecutive chunks with 'Close' and 'timestamp' columns.
+    """
+    column_mapping = {
+        'close': 'Close',
+        'time': 'timestamp',
+        'Time': 'timestamp',
+        'date': 'timestamp',
+        'datetime': 'timestamp'
+    }
+    with pd.read_csv(file_path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = chunk.rename(columns={old: new for old, new in column_mapping.items() if old in chunk.columns})
+            if 'timestamp' not in chunk.columns and len(chunk.columns) > 1:
+                chunk['timestamp'] = chunk.iloc[:, 1]
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+            if 'Close' not in chunk.columns:
+                raise ValueError(f"'Close' column not found in {file_path}")
+            yield chunk
+
 def main():
+    # Configure logging (only when run as a script, importing stays side-effect free)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('data_fetch.log'),
+            logging.StreamHandler()
+        ]
+    )
+
     parser = argparse.ArgumentParser(description='Fetch market data for LHL Trading Bot')
     parser.add_argument('--output', required=True, help='Output CSV file path')
     parser.add_argument('--symbol', default='BTC/USDT', help='Trading symbol')
@@ -0,0 +1,672 @@
+# exchange_simulator.py
+"""
+Local Bitget-compatible exchange simulator for offline load testing
+- HTTP server with the Bitget V1 mix endpoints behind the calls the bot makes:
+  contracts (markets), candles (OHLCV), ticker, positions, set leverage,
+  market orders, and the V1 placeOrder close_long used by close_uni_long_order
+- Prices come from replayed candles (CSV or seeded synthetic data); market
+  orders fill at the close of the current replay candle
+- Position stop-loss / take-profit plans (placeTPSL, modifyTPSLPlan,
+  cancelPlan, currentPlan, historyPlan) trigger on the High/Low of each
+  candle the replay advances over
+- Configurable latency and error injection per request
+- SimulatedBitget: a ccxt-shaped client for the server, so place_uni_long_order
+  and the bot run against it unchanged
+- run_load_test: order-path throughput and tail latency under concurrency
+
+Usage:
+    python exchange_simulator.py serve --csv market_data.csv --port 8700
+    python exchange_simulator.py loadtest --threads 16 --iterations 50
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import ccxt
+import numpy as np
+import pandas as pd
+import requests
+
+from data_fetcher import load_market_data_from_csv
+
+SUCCESS = '00000'
+# Bitget error codes returned by the simulator
+ERROR_BAD_REQUEST = '40017'
+ERROR_SIGNATURE = '40009'
+ERROR_INSUFFICIENT_BALANCE = '40762'
+ERROR_NO_POSITION = '40757'
+ERROR_PLAN_NOT_FOUND = '43025'
+ERROR_INJECTED = '50000'
+
+
+class SimulatedMarket:
+    """
+    Account and matching state of the simulator.
+
+    One linear USDT contract replayed from candles. The account holds a net
+    long position (the bot only trades long); all methods are thread-safe.
+    """
+
+    def __init__(self, candles_df, base='LINK', balance=10_000.0, leverage=20, slippage=0.0, start_index=None):
+        self.base = base
+        self.market_id = f"{base}USDT_UMCBL"
+        self.symbol = f"{base}/USDT:USDT"
+        self.rows = np.column_stack([
+            candles_df['timestamp'].values.astype('datetime64[ms]').astype(np.int64),
+            candles_df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+        ])
+        if not len(self.rows):
+            raise ValueError("The simulator needs at least one candle to replay")
+        self.cursor = min(start_index if start_index is not None else 999, len(self.rows) - 1)
+        self.balance = float(balance)
+        self.leverage = int(leverage)
+        self.slippage = float(slippage)
+        self.position_size = 0.0
+        self.entry_price = 0.0
+        self.orders = 0
+        self.plans = {}
+        self.plan_requests = 0
+        self._lock = threading.Lock()
+
+    def advance(self, candles=1):
+        """Move the replay forward (wrapping at the end of the data) and fire plans; returns the new cursor"""
+        with self._lock:
+            for _ in range(candles):
+                self.cursor = (self.cursor + 1) % len(self.rows)
+                self._trigger_plans()
+            return self.cursor
+
+    def last_price(self):
+        return float(self.rows[self.cursor, 4])
+
+    def candles(self, limit):
+        """Up to `limit` candles ending with the current one, oldest first"""
+        with self._lock:
+            return self.rows[max(self.cursor + 1 - limit, 0):self.cursor + 1].tolist()
+
+    def ticker(self):
+        with self._lock:
+            ts, open_, high, low, close, volume = self.rows[self.cursor]
+        return {
+            'symbol': self.market_id, 'last': str(close), 'bestAsk': str(close), 'bestBid': str(close),
+            'high24h': str(high), 'low24h': str(low), 'baseVolume': str(volume), 'timestamp': str(int(ts))
+        }
+
+    def position(self):
+        with self._lock:
+            return {
+                'symbol': self.market_id, 'marginCoin': 'USDT', 'holdSide': 'long',
+                'total': str(self.position_size), 'available': str(self.position_size),
+                'averageOpenPrice': str(self.entry_price), 'leverage': self.leverage
+            }
+
+    def set_leverage(self, leverage):
+        with self._lock:
+            self.leverage = int(leverage)
+            return {'symbol': self.market_id, 'marginCoin': 'USDT', 'longLeverage': self.leverage}
+
+    def open_long(self, size):
+        """Fill a market buy at the current close (plus slippage); returns (code, data)"""
+        with self._lock:
+            price = float(self.rows[self.cursor, 4]) * (1 + self.slippage)
+            used_margin = self.position_size * self.entry_price / self.leverage
+            if size * price / self.leverage > self.balance - used_margin:
+                return ERROR_INSUFFICIENT_BALANCE, None
+            total = self.position_size + size
+            self.entry_price = (self.position_size * self.entry_price + size * price) / total
+            self.position_size = total
+            return SUCCESS, self._fill('open_long', size, price)
+
+    def close_long(self, size):
+        """Fill a market sell of `size` from the long position; returns (code, data)"""
+        with self._lock:
+            # Sizes arrive as 8-decimal strings, allow for the rounding
+            if self.position_size <= 0 or size > self.position_size + 1e-8:
+                return ERROR_NO_POSITION, None
+            return SUCCESS, self._close(size, float(self.rows[self.cursor, 4]))
+
+    def _close(self, size, price):
+        size = min(size, self.position_size)
+        price *= 1 - self.slippage
+        self.balance += size * (price - self.entry_price)
+        self.position_size = max(self.position_size - size, 0.0)
+        if self.position_size == 0:
+            self.entry_price = 0.0
+            # Like the exchange, the position's remaining plans go with it
+            for plan in self.plans.values():
+                if plan['status'] == 'not_trigger':
+                    plan['status'] = 'cancel'
+        return self._fill('close_long', size, price)
+
+    def place_plan(self, plan_type, trigger_price, size=None):
+        """Position stop-loss (loss_plan) or take-profit (profit_plan) of the long; returns (code, data)"""
+        with self._lock:
+            self.plan_requests += 1
+            if self.position_size <= 0:
+                return ERROR_NO_POSITION, None
+            order_id = uuid.uuid4().hex
+            self.plans[order_id] = {
+                'orderId': order_id, 'symbol': self.market_id, 'planType': plan_type, 'triggerPrice': trigger_price,
+                'size': size, 'status': 'not_trigger', 'executePrice': 0.0
+            }
+            return SUCCESS, {'orderId': order_id, 'clientOid': None}
+
+    def modify_plan(self, order_id, trigger_price):
+        with self._lock:
+            self.plan_requests += 1
+            plan = self.plans.get(order_id)
+            if plan is None or plan['status'] != 'not_trigger':
+                return ERROR_PLAN_NOT_FOUND, None
+            plan['triggerPrice'] = trigger_price
+            return SUCCESS, {'orderId': order_id, 'clientOid': None}
+
+    def cancel_plan(self, order_id):
+        with self._lock:
+            self.plan_requests += 1
+            plan = self.plans.get(order_id)
+            if plan is None or plan['status'] != 'not_trigger':
+                return ERROR_PLAN_NOT_FOUND, None
+            plan['status'] = 'cancel'
+            return SUCCESS, {'orderId': order_id, 'clientOid': None}
+
+    def plan_list(self, live):
+        """Live plans, or the triggered and cancelled ones, in the V1 string layout"""
+        with self._lock:
+            self.plan_requests += 1
+            return [
+                {**plan, 'triggerPrice': str(plan['triggerPrice']), 'executePrice': str(plan['executePrice']),
+                 'size': str(plan['size'] if plan['size'] is not None else self.position_size)}
+                for plan in self.plans.values() if (plan['status'] == 'not_trigger') == live
+            ]
+
+    def _trigger_plans(self):
+        """Fire the plans the current candle reaches, stop-losses first; fills gap to the open"""
+        _, open_, high, low = self.rows[self.cursor, :4]
+        for plan_type in ('loss_plan', 'profit_plan'):
+            for plan in list(self.plans.values()):
+                if plan['status'] != 'not_trigger' or plan['planType'] != plan_type:
+                    continue
+                trigger = plan['triggerPrice']
+                if plan_type == 'loss_plan' and low <= trigger:
+                    price = min(trigger, open_)
+                elif plan_type == 'profit_plan' and high >= trigger:
+                    price = max(trigger, open_)
+                else:
+                    continue
+                size = self.position_size if plan['size'] is None else min(plan['size'], self.position_size)
+                plan['status'] = 'triggered'
+                plan['executePrice'] = float(self._close(size, float(price))['priceAvg'])
+
+    def _fill(self, side, size, price):
+        self.orders += 1
+        return {
+            'orderId': uuid.uuid4().hex, 'clientOid': None, 'symbol': self.market_id, 'side': side,
+            'size': str(size), 'filledQty': str(size), 'priceAvg': str(price), 'state': 'filled',
+            'cTime': str(int(self.rows[self.cursor, 0]))
+        }
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server around a SimulatedMarket.
+
+    Each request sleeps latency_ms +/- jitter_ms, and fails with HTTP 503 with
+    probability error_rate (seeded, so a run is reproducible). With a secret
+    key, POST signatures are checked like the real exchange.
+    """
+
+    daemon_threads = True
+    # Deep accept backlog so bursts of new connections are not dropped and retried
+    request_queue_size = 256
+
+    def __init__(self, address, market, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, secret_key=None, seed=0):
+        super().__init__(address, _SimulatorHandler)
+        self.market = market
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.secret_key = secret_key
+        self._rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def inject(self):
+        """Apply the configured latency; returns True when this request should fail"""
+        with self._rng_lock:
+            delay = self.latency_ms + (self._rng.uniform(-1, 1) * self.jitter_ms if self.jitter_ms else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+    def start(self):
+        """Serve from a daemon thread; returns the thread"""
+        thread = threading.Thread(target=self.serve_forever, name='exchange-simulator', daemon=True)
+        thread.start()
+        return thread
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    """Routes the Bitget V1 mix endpoints to the SimulatedMarket"""
+
+    def log_message(self, format, *args):
+        logging.debug("simulator: " + format, *args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body_str = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+        if self.server.inject():
+            return self._reply(503, {'code': ERROR_INJECTED, 'msg': 'Injected error', 'data': None})
+        try:
+            body = json.loads(body_str) if body_str else {}
+        except ValueError:
+            return self._reply(400, {'code': ERROR_BAD_REQUEST, 'msg': 'Invalid JSON body', 'data': None})
+        if method == 'POST' and not self._signature_ok(url.path, body_str):
+            return self._reply(400, {'code': ERROR_SIGNATURE, 'msg': 'sign signature error', 'data': None})
+
+        route = self.ROUTES.get((method, url.path))
+        if route is None:
+            return self._reply(404, {'code': ERROR_BAD_REQUEST, 'msg': f'Unknown endpoint {url.path}', 'data': None})
+        code, data = route(self, self.server.market, query, body)
+        status = 200 if code == SUCCESS else 400
+        self._reply(status, {'code': code, 'msg': 'success' if code == SUCCESS else 'failed', 'data': data})
+
+    def _signature_ok(self, path, body_str):
+        secret_key = self.server.secret_key
+        if not secret_key:
+            return True
+        message = self.headers.get('ACCESS-TIMESTAMP', '') + 'POST' + path + body_str
+        expected = base64.b64encode(
+            hmac.new(secret_key.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest()
+        ).decode('utf-8')
+        return hmac.compare_digest(expected, self.headers.get('ACCESS-SIGN', ''))
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _contracts(self, market, query, body):
+        return SUCCESS, [{
+            'symbol': market.market_id, 'baseCoin': market.base, 'quoteCoin': 'USDT', 'supportMarginCoins': ['USDT'],
+            'pricePlace': '3', 'priceEndStep': '1', 'volumePlace': '1', 'minTradeNum': '0.1', 'sizeMultiplier': '0.1'
+        }]
+
+    def _candles(self, market, query, body):
+        return SUCCESS, [[str(int(row[0]))] + [str(value) for value in row[1:]]
+                         for row in market.candles(int(query.get('limit', 100)))]
+
+    def _ticker(self, market, query, body):
+        return SUCCESS, market.ticker()
+
+    def _positions(self, market, query, body):
+        return SUCCESS, [market.position()]
+
+    def _set_leverage(self, market, query, body):
+        if 'leverage' not in body:
+            return ERROR_BAD_REQUEST, None
+        return SUCCESS, market.set_leverage(body['leverage'])
+
+    def _place_order(self, market, query, body):
+        try:
+            size = float(body['size'])
+        except (KeyError, TypeError, ValueError):
+            return ERROR_BAD_REQUEST, None
+        if body.get('symbol') != market.market_id or body.get('orderType') != 'market' or size <= 0:
+            return ERROR_BAD_REQUEST, None
+        if body.get('side') == 'open_long':
+            return market.open_long(size)
+        if body.get('side') == 'close_long':
+            return market.close_long(size)
+        return ERROR_BAD_REQUEST, None
+
+    def _place_tpsl(self, market, query, body):
+        try:
+            trigger_price = float(body['triggerPrice'])
+            size = float(body['size']) if body.get('size') else None
+        except (KeyError, TypeError, ValueError):
+            return ERROR_BAD_REQUEST, None
+        if body.get('symbol') != market.market_id or body.get('planType') not in ('loss_plan', 'profit_plan'):
+            return ERROR_BAD_REQUEST, None
+        return market.place_plan(body['planType'], trigger_price, size)
+
+    def _modify_tpsl(self, market, query, body):
+        try:
+            trigger_price = float(body['triggerPrice'])
+        except (KeyError, TypeError, ValueError):
+            return ERROR_BAD_REQUEST, None
+        return market.modify_plan(body.get('orderId'), trigger_price)
+
+    def _cancel_plan(self, market, query, body):
+        return market.cancel_plan(body.get('orderId'))
+
+    def _current_plans(self, market, query, body):
+        return SUCCESS, market.plan_list(live=True)
+
+    def _history_plans(self, market, query, body):
+        return SUCCESS, market.plan_list(live=False)
+
+    def _advance(self, market, query, body):
+        return SUCCESS, {'cursor': market.advance(int(body.get('candles', 1)))}
+
+    ROUTES = {
+        ('GET', '/api/mix/v1/market/contracts'): _contracts,
+        ('GET', '/api/mix/v1/market/candles'): _candles,
+        ('GET', '/api/mix/v1/market/ticker'): _ticker,
+        ('GET', '/api/mix/v1/position/allPosition'): _positions,
+        ('POST', '/api/mix/v1/account/setLeverage'): _set_leverage,
+        ('POST', '/api/mix/v1/order/placeOrder'): _place_order,
+        ('POST', '/api/mix/v1/plan/placeTPSL'): _place_tpsl,
+        ('POST', '/api/mix/v1/plan/modifyTPSLPlan'): _modify_tpsl,
+        ('POST', '/api/mix/v1/plan/cancelPlan'): _cancel_plan,
+        ('GET', '/api/mix/v1/plan/currentPlan'): _current_plans,
+        ('GET', '/api/mix/v1/plan/historyPlan'): _history_plans,
+        ('POST', '/sim/advance'): _advance,
+    }
+
+
+class SimulatedBitget:
+    """
+    ccxt-shaped client for a SimulatorServer: the subset of ccxt.bitget used
+    by order_utils, utils and live_signal_bot. HTTP 5xx and connection
+    failures raise ccxt.NetworkError, timeouts ccxt.RequestTimeout and
+    rejected requests ccxt.ExchangeError (InsufficientFunds for balance).
+    """
+
+    id = 'bitget-simulator'
+    has = {'setLeverage': True, 'fetchPositions': True}
+
+    def __init__(self, base_url, api_key='', secret_key='', passphrase='', timeout=10.0):
+        self.base_url = base_url.rstrip('/')
+        self.apiKey = api_key
+        self.secret = secret_key
+        self.password = passphrase
+        self.timeout = timeout
+        self.markets = None
+        self._session = requests.Session()
+
+    def _request(self, method, path, query=None, body=None):
+        headers = {'Content-Type': 'application/json'}
+        body_str = json.dumps(body) if body is not None else ''
+        if method == 'POST':
+            timestamp = str(int(time.time() * 1000))
+            signature = base64.b64encode(hmac.new(
+                self.secret.encode('utf-8'), (timestamp + method + path + body_str).encode('utf-8'), hashlib.sha256
+            ).digest()).decode('utf-8')
+            headers.update({
+                'ACCESS-KEY': self.apiKey, 'ACCESS-SIGN': signature,
+                'ACCESS-TIMESTAMP': timestamp, 'ACCESS-PASSPHRASE': self.password
+            })
+        try:
+            response = self._session.request(
+                method, self.base_url + path, params=query, data=body_str or None, headers=headers,
+                timeout=self.timeout
+            )
+        except requests.exceptions.Timeout as e:
+            raise ccxt.RequestTimeout(str(e))
+        except requests.exceptions.RequestException as e:
+            raise ccxt.NetworkError(str(e))
+        if response.status_code >= 500:
+            raise ccxt.NetworkError(f"{self.id} {response.status_code} {response.text}")
+        payload = response.json()
+        if payload.get('code') == ERROR_INSUFFICIENT_BALANCE:
+            raise ccxt.InsufficientFunds(f"{self.id} {payload}")
+        if payload.get('code') != SUCCESS:
+            raise ccxt.ExchangeError(f"{self.id} {payload}")
+        return payload['data']
+
+    def load_markets(self, reload=False):
+        if self.markets is None or reload:
+            self.markets = {}
+            for contract in self._request('GET', '/api/mix/v1/market/contracts', {'productType': 'umcbl'}):
+                symbol = f"{contract['baseCoin']}/{contract['quoteCoin']}:{contract['quoteCoin']}"
+                self.markets[symbol] = {
+                    'id': contract['symbol'], 'symbol': symbol, 'base': contract['baseCoin'],
+                    'quote': contract['quoteCoin'], 'type': 'swap', 'contract': True, 'linear': True,
+                    'precision': {'price': 10 ** -int(contract['pricePlace']),
+                                  'amount': 10 ** -int(contract['volumePlace'])},
+                    'limits': {'amount': {'min': float(contract['minTradeNum'])}},
+                    'info': contract
+                }
+        return self.markets
+
+    def market(self, symbol):
+        markets = self.load_markets()
+        if symbol in markets:
+            return markets[symbol]
+        for market in markets.values():
+            if symbol == market['id']:
+                return market
+        raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        rows = self._request('GET', '/api/mix/v1/market/candles', {
+            'symbol': self.market(symbol)['id'], 'granularity': timeframe, 'limit': limit or 100
+        })
+        candles = [[int(row[0])] + [float(value) for value in row[1:]] for row in rows]
+        return [candle for candle in candles if since is None or candle[0] >= since]
+
+    def fetch_ticker(self, symbol):
+        ticker = self._request('GET', '/api/mix/v1/market/ticker', {'symbol': self.market(symbol)['id']})
+        last = float(ticker['last'])
+        return {
+            'symbol': symbol, 'timestamp': int(ticker['timestamp']), 'last': last, 'close': last,
+            'bid': float(ticker['bestBid']), 'ask': float(ticker['bestAsk']), 'high': float(ticker['high24h']),
+            'low': float(ticker['low24h']), 'baseVolume': float(ticker['baseVolume']), 'info': ticker
+        }
+
+    def fetch_positions(self, symbols=None, params={}):
+        positions = []
+        for position in self._request('GET', '/api/mix/v1/position/allPosition', {'productType': 'umcbl'}):
+            market = self.market(position['symbol'])
+            if symbols and market['symbol'] not in symbols:
+                continue
+            # Like ccxt's bitget parser, info carries the plain exchange symbol
+            info = dict(position, symbol=market['base'] + market['quote'])
+            positions.append({
+                'symbol': market['symbol'], 'side': 'long', 'contracts': float(position['total']),
+                'entryPrice': float(position['averageOpenPrice']), 'leverage': position['leverage'], 'info': info
+            })
+        return positions
+
+    def set_leverage(self, leverage, symbol=None, params={}):
+        return self._request('POST', '/api/mix/v1/account/setLeverage', body={
+            'symbol': self.market(symbol)['id'], 'marginCoin': 'USDT', 'leverage': str(leverage)
+        })
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        if type != 'market':
+            raise ccxt.NotSupported(f"{self.id} only simulates market orders")
+        data = self._request('POST', '/api/mix/v1/order/placeOrder', body={
+            'symbol': self.market(symbol)['id'], 'marginCoin': 'USDT', 'size': str(amount),
+            'side': 'open_long' if side == 'buy' else 'close_long', 'orderType': 'market'
+        })
+        filled = float(data['filledQty'])
+        average = float(data['priceAvg'])
+        return {
+            'id': data['orderId'], 'symbol': symbol, 'type': type, 'side': side, 'status': 'closed',
+            'amount': float(amount), 'filled': filled, 'average': average, 'cost': filled * average, 'info': data
+        }
+
+    def create_market_buy_order(self, symbol, amount, params={}):
+        return self.create_order(symbol, 'market', 'buy', amount, params=params)
+
+    def create_market_sell_order(self, symbol, amount, params={}):
+        return self.create_order(symbol, 'market', 'sell', amount, params=params)
+
+    def advance(self, candles=1):
+        """Move the server's candle replay forward (simulator only)"""
+        return self._request('POST', '/sim/advance', body={'candles': candles})['cursor']
+
+
+def start_simulator(candles_df=None, host='127.0.0.1', port=0, **options):
+    """
+    Start a SimulatorServer in a background thread.
+
+    Args:
+        candles_df (pd.DataFrame): Candles to replay ('timestamp', 'Open',
+            'High', 'Low', 'Close', 'Volume'); seeded synthetic candles if None.
+        port (int): Port to listen on, 0 picks a free one.
+        **options: SimulatedMarket options (base, balance, leverage, slippage)
+            and SimulatorServer options (latency_ms, jitter_ms, error_rate,
+            secret_key, seed).
+
+    Returns:
+        SimulatorServer: The running server; call shutdown() when done.
+    """
+    if candles_df is None:
+        from benchmarks import generate_lhl_candles
+        candles_df = generate_lhl_candles(5_000, seed=options.get('seed', 0))
+    market_keys = ('base', 'balance', 'leverage', 'slippage', 'start_index')
+    market = SimulatedMarket(candles_df, **{key: options.pop(key) for key in market_keys if key in options})
+    server = SimulatorServer((host, port), market, **options)
+    server.start()
+    return server
+
+
+def _percentiles(latencies):
+    if not latencies:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    values = np.percentile(np.asarray(latencies) * 1000, [50, 90, 99, 100])
+    return dict(zip(('p50', 'p90', 'p99', 'max'), np.round(values, 3).tolist()))
+
+
+def run_load_test(base_url, threads=8, iterations=20, margin_usdt=10.0, leverage=20, api_credentials=None,
+                  market_id='LINKUSDT_UMCBL', symbol='LINK/USDT:USDT'):
+    """
+    Drive the order paths against a simulator from `threads` concurrent workers.
+
+    Each iteration opens a long with order_utils.place_uni_long_order and
+    closes it with order_utils.close_uni_long_order (the V1 endpoint).
+
+    Returns:
+        dict: Completed round trips, failures, throughput (round trips per
+        second) and open/close/round-trip latency percentiles in ms.
+    """
+    from order_utils import place_uni_long_order, close_uni_long_order
+
+    api_credentials = api_credentials or {'API_KEY': 'sim-key', 'SECRET_KEY': 'sim-secret', 'PASSPHRASE': 'sim'}
+    opens, closes, round_trips = [], [], []
+    failures = []
+    lock = threading.Lock()
+
+    def worker(_):
+        exchange = SimulatedBitget(base_url, api_credentials['API_KEY'], api_credentials['SECRET_KEY'],
+                                   api_credentials['PASSPHRASE'])
+        for _ in range(iterations):
+            state = {'in_position': False, 'position_size': 0.0, 'entry_price': 0.0}
+            start = time.perf_counter()
+            order = place_uni_long_order(exchange, symbol, margin_usdt, leverage, state, base_url=base_url)
+            opened = time.perf_counter()
+            closed_ok = bool(order) and close_uni_long_order(market_id, api_credentials, state, base_url=base_url)
+            end = time.perf_counter()
+            with lock:
+                if not order:
+                    failures.append('open')
+                    continue
+                opens.append(opened - start)
+                if not closed_ok:
+                    failures.append('close')
+                    continue
+                closes.append(end - opened)
+                round_trips.append(end - start)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'threads': threads,
+        'round_trips': len(round_trips),
+        'failed_opens': failures.count('open'),
+        'failed_closes': failures.count('close'),
+        'seconds': round(elapsed, 3),
+        'round_trips_per_second': round(len(round_trips) / elapsed, 2) if elapsed else None,
+        'open_ms': _percentiles(opens),
+        'close_ms': _percentiles(closes),
+        'round_trip_ms': _percentiles(round_trips)
+    }
+
+
+def _load_candles(csv_path):
+    if not csv_path:
+        return None
+    candles = load_market_data_from_csv(csv_path)
+    if candles.empty:
+        raise ValueError(f"No candles loaded from {csv_path}")
+    return candles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Bitget-compatible exchange simulator")
+    parser.add_argument('mode', choices=['serve', 'loadtest'])
+    parser.add_argument('--csv', help="Candles to replay (default: seeded synthetic candles)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8700, help="Port for serve (loadtest picks a free one)")
+    parser.add_argument('--url', help="loadtest against an already running simulator instead of starting one")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--candle-seconds', type=float, default=0.0,
+                        help="Advance the replay by one candle every N seconds (0: only via /sim/advance)")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING if args.mode == 'loadtest' else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    server = None
+    if args.mode == 'serve' or not args.url:
+        server = start_simulator(
+            _load_candles(args.csv), args.host, args.port if args.mode == 'serve' else 0,
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed,
+            secret_key='sim-secret' if args.mode == 'loadtest' else None
+        )
+        logging.info("Simulator listening on %s (%s)", server.base_url, server.market.symbol)
+
+    try:
+        if args.mode == 'serve':
+            while True:
+                if args.candle_seconds > 0:
+                    time.sleep(args.candle_seconds)
+                    server.market.advance()
+                else:
+                    time.sleep(3600)
+        else:
+            results = run_load_test(args.url or server.base_url, args.threads, args.iterations)
+            print(json.dumps(results, indent=2))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# exit_engine.py
+"""
+Vectorized exit resolution for the LHL strategy
+- Resolves the stop-loss / trailing take-profit exit of many entries at once
+- Uses intrabar High/Low instead of the polled Close, so wicks are honoured
+- Works through the history in blocks of bars with NumPy, no per-bar loop
+"""
+
+import numpy as np
+
+EXIT_NONE = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+
+DEFAULT_TAKE_PROFIT_FRACTION = 0.15
+
+
+def resolve_exits(high, low, entry_indices, entry_prices, stop_prices, open_=None,
+                  take_profit_fraction=DEFAULT_TAKE_PROFIT_FRACTION, block_bars=256, max_block_elements=4_000_000):
+    """
+    Find the first bar at which each entry is stopped out or takes profit.
+
+    Rules (same as live_signal_bot.main, evaluated on High/Low):
+    - An entry is filled at the close of bar `entry_indices[k]`; exits are
+      checked from the next bar on.
+    - Stop-loss: the bar's Low reaches the stop price.
+    - Take-profit: once the highest price since entry (entry price included)
+      is above the entry, the trigger is
+      highest - take_profit_fraction * (highest - entry); the bar's Low
+      reaching it (while still above the entry) takes profit.
+    - The highest price used for a bar only includes previous bars, since the
+      order of High and Low within a bar is unknown.
+    - The take-profit trigger sits above the entry and the stop below it, so a
+      falling price reaches the take-profit first when both are in one bar.
+    - With `open_` given, a bar opening beyond a trigger fills at the open.
+
+    Args:
+        high, low (np.ndarray): Candle highs and lows.
+        entry_indices (np.ndarray): Bar index of every entry.
+        entry_prices (np.ndarray): Fill price of every entry.
+        stop_prices (np.ndarray): Stop price of every entry, e.g.
+            live_signal_bot.calculate_stop_loss_price(entry_prices, margin, leverage),
+            which works element-wise on arrays.
+        open_ (np.ndarray, optional): Candle opens for gap fills.
+        take_profit_fraction (float): Share of the gain given back before taking profit.
+        block_bars (int): Bars examined per entry and per vectorized step.
+        max_block_elements (int): Upper bound on entries * block_bars per step.
+
+    Returns:
+        dict: 'exit_index' (int64, -1 if never exited), 'exit_price' (float64,
+        NaN if never exited), 'exit_reason' (int8, EXIT_* codes).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    open_ = None if open_ is None else np.asarray(open_, dtype=np.float64)
+    entry_indices = np.asarray(entry_indices, dtype=np.int64)
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    stop_prices = np.broadcast_to(np.asarray(stop_prices, dtype=np.float64), entry_prices.shape)
+
+    num_bars = len(high)
+    num_entries = len(entry_indices)
+    exit_index = np.full(num_entries, -1, dtype=np.int64)
+    exit_price = np.full(num_entries, np.nan)
+    exit_reason = np.zeros(num_entries, dtype=np.int8)
+
+    entries_per_step = max(1, max_block_elements // block_bars)
+    for chunk_start in range(0, num_entries, entries_per_step):
+        chunk = np.arange(chunk_start, min(chunk_start + entries_per_step, num_entries))
+        _resolve_chunk(high, low, open_, entry_indices, entry_prices, stop_prices, take_profit_fraction,
+                       block_bars, num_bars, chunk, exit_index, exit_price, exit_reason)
+
+    return {'exit_index': exit_index, 'exit_price': exit_price, 'exit_reason': exit_reason}
+
+
+def _resolve_chunk(high, low, open_, entry_indices, entry_prices, stop_prices, take_profit_fraction,
+                   block_bars, num_bars, active, exit_index, exit_price, exit_reason):
+    running_high = entry_prices[active].copy()
+    offsets = np.arange(block_bars)
+    first_bar = 1
+
+    while active.size:
+        entry = entry_prices[active]
+        stop = stop_prices[active]
+        bars = entry_indices[active][:, None] + first_bar + offsets
+        valid = bars < num_bars
+        bars = np.minimum(bars, num_bars - 1)
+
+        block_high = high[bars]
+        block_low = low[bars]
+
+        # Highest price before each bar: entry price, earlier blocks and earlier bars of this block
+        prior_high = np.empty_like(block_high)
+        prior_high[:, 0] = running_high
+        prior_high[:, 1:] = block_high[:, :-1]
+        np.maximum.accumulate(prior_high, axis=1, out=prior_high)
+
+        trigger = prior_high - take_profit_fraction * (prior_high - entry[:, None])
+        tp_fill = trigger
+        stop_fill = np.broadcast_to(stop[:, None], block_low.shape)
+        if open_ is not None:
+            block_open = open_[bars]
+            tp_fill = np.minimum(trigger, block_open)
+            stop_fill = np.minimum(stop_fill, block_open)
+
+        tp_hit = valid & (prior_high > entry[:, None]) & (block_low <= trigger) & (tp_fill > entry[:, None])
+        stop_hit = valid & (block_low <= stop[:, None])
+        hit = tp_hit | stop_hit
+
+        resolved = hit.any(axis=1)
+        if resolved.any():
+            rows = np.nonzero(resolved)[0]
+            cols = hit[rows].argmax(axis=1)
+            targets = active[rows]
+            is_tp = tp_hit[rows, cols]
+            exit_index[targets] = bars[rows, cols]
+            exit_reason[targets] = np.where(is_tp, EXIT_TAKE_PROFIT, EXIT_STOP_LOSS)
+            exit_price[targets] = np.where(is_tp, tp_fill[rows, cols], stop_fill[rows, cols])
+
+        pending = ~resolved & valid[:, -1]
+        running_high = np.maximum(prior_high[pending, -1], block_high[pending, -1])
+        active = active[pending]
+        first_bar += block_bars
@@ -0,0 +1,226 @@
+# exit_orders.py
+"""
+Exchange-side exits for the LHL Trading Bot
+- Places a Bitget V1 position stop-loss plan (placeTPSL, loss_plan) when a
+  position is entered, so the stop fires on the exchange instead of at the
+  next poll
+- Trails the same plan up to the take-profit trigger
+  (highest - fraction * gain) as the highest price since entry rises
+- Amends are coalesced per symbol (only the latest level is sent) and rate
+  limited: at most one per `min_amend_interval` seconds per plan, only for
+  moves of at least `min_amend_step`, and at most `max_amends_per_flush` per
+  flush
+- check() asks the exchange only when the polled low reached the trigger,
+  and at most once per `min_check_interval` seconds
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import math
+import time
+from urllib.parse import urlencode
+
+from exit_engine import DEFAULT_TAKE_PROFIT_FRACTION
+
+BITGET_V1_BASE_URL = "https://api.bitget.com"
+PLAN_TYPE = 'loss_plan'
+
+
+class ExitOrderError(Exception):
+    """A plan request was rejected by the exchange or could not be sent"""
+
+
+class ExitOrders:
+    """
+    Exchange-side stop / trailing take-profit plan per symbol.
+
+    Args:
+        api_credentials (dict): 'API_KEY', 'SECRET_KEY' and 'PASSPHRASE'.
+        base_url (str): API root; a local exchange_simulator.py instance in tests.
+        margin_coin (str): Margin coin of the contracts.
+        min_amend_interval (float): Seconds between two amends of one plan.
+        min_amend_step (float): Smallest trigger move worth an amend, as a
+            fraction of the current trigger.
+        max_amends_per_flush (int): Amends sent per flush() across all symbols.
+        min_check_interval (float): Seconds between two checks of one plan.
+        take_profit_fraction (float): Share of the gain given back before taking profit.
+        tick_size (float): Price tick; triggers are rounded down onto it.
+        clock: Object with time(), the time module by default.
+    """
+
+    def __init__(self, api_credentials, base_url=BITGET_V1_BASE_URL, margin_coin='USDT', min_amend_interval=10.0,
+                 min_amend_step=0.0005, max_amends_per_flush=10, min_check_interval=30.0,
+                 take_profit_fraction=DEFAULT_TAKE_PROFIT_FRACTION, tick_size=None, clock=time, timeout=10.0):
+        import requests
+        self.api_key = api_credentials.get('API_KEY', '')
+        self.secret_key = api_credentials.get('SECRET_KEY', '')
+        self.passphrase = api_credentials.get('PASSPHRASE', '')
+        self.base_url = base_url.rstrip('/')
+        self.margin_coin = margin_coin
+        self.min_amend_interval = min_amend_interval
+        self.min_amend_step = min_amend_step
+        self.max_amends_per_flush = max_amends_per_flush
+        self.min_check_interval = min_check_interval
+        self.take_profit_fraction = take_profit_fraction
+        self.tick_size = tick_size
+        self.clock = clock
+        self.timeout = timeout
+        self.plans = {}
+        self.requests_sent = 0
+        self._session = requests.Session()
+
+    def _request(self, method, path, params):
+        """Signed V1 request; returns the response data or raises ExitOrderError"""
+        import requests
+        timestamp = str(int(time.time() * 1000))
+        if method == 'GET':
+            query = urlencode(sorted(params.items()))
+            message, url, body_str = timestamp + method + path + '?' + query, f"{self.base_url}{path}?{query}", None
+        else:
+            body_str = json.dumps(params)
+            message, url = timestamp + method + path + body_str, self.base_url + path
+        signature = base64.b64encode(
+            hmac.new(self.secret_key.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest()
+        ).decode('utf-8')
+        headers = {
+            'Content-Type': 'application/json', 'ACCESS-KEY': self.api_key, 'ACCESS-SIGN': signature,
+            'ACCESS-TIMESTAMP': timestamp, 'ACCESS-PASSPHRASE': self.passphrase, 'locale': 'en-US'
+        }
+        self.requests_sent += 1
+        try:
+            response = self._session.request(method, url, data=body_str, headers=headers, timeout=self.timeout)
+            payload = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise ExitOrderError(f"{method} {path} failed: {e}")
+        if payload.get('code') != '00000':
+            raise ExitOrderError(f"{method} {path} rejected: {payload.get('code')} {payload.get('msg')}")
+        return payload.get('data')
+
+    def _round(self, price):
+        # Round down onto the tick grid so a long's trigger is never tighter than asked
+        if not self.tick_size:
+            return float(price)
+        return round(math.floor(price / self.tick_size + 1e-9) * self.tick_size, 12)
+
+    def place(self, symbol, entry_price, stop_loss_price, size):
+        """
+        Place the stop-loss plan of a new long position. Returns the plan
+        order id, or None when the exchange rejected it (the bot then keeps
+        checking exits on its own).
+        """
+        trigger = self._round(stop_loss_price)
+        try:
+            data = self._request('POST', '/api/mix/v1/plan/placeTPSL', {
+                'symbol': symbol, 'marginCoin': self.margin_coin, 'planType': PLAN_TYPE,
+                'triggerPrice': str(trigger), 'holdSide': 'long', 'size': f"{size:.8f}".rstrip('0').rstrip('.')
+            })
+        except ExitOrderError as e:
+            logging.error("Could not place the exchange-side stop for %s: %s", symbol, e)
+            return None
+        self.plans[symbol] = {
+            'order_id': data['orderId'], 'entry_price': float(entry_price), 'trigger': trigger,
+            'pending': None, 'last_amend': self.clock.time(), 'last_check': None
+        }
+        logging.info("Exchange-side stop for %s placed at %s (order %s)", symbol, trigger, data['orderId'])
+        return data['orderId']
+
+    def adopt(self, symbol, order_id, entry_price, trigger):
+        """Track a plan placed before a restart (ids and triggers come from the state snapshot)"""
+        self.plans[symbol] = {
+            'order_id': order_id, 'entry_price': float(entry_price), 'trigger': float(trigger),
+            'pending': None, 'last_amend': 0.0, 'last_check': None
+        }
+
+    def trigger_price(self, symbol):
+        """Current trigger on the exchange (None without a plan)"""
+        plan = self.plans.get(symbol)
+        return None if plan is None else plan['trigger']
+
+    def trail(self, symbol, highest_price):
+        """
+        Queue the take-profit trigger for `highest_price` when it raises the
+        plan by at least min_amend_step; the amend is sent by flush().
+        """
+        plan = self.plans.get(symbol)
+        if plan is None or highest_price <= plan['entry_price']:
+            return
+        gain = highest_price - plan['entry_price']
+        level = self._round(highest_price - self.take_profit_fraction * gain)
+        target = plan['pending'] if plan['pending'] is not None else plan['trigger']
+        if level > target and level - plan['trigger'] >= self.min_amend_step * plan['trigger']:
+            plan['pending'] = level
+
+    def flush(self):
+        """Send the due amends, longest-waiting plans first; returns how many were sent"""
+        now = self.clock.time()
+        due = sorted(
+            (plan['last_amend'], symbol) for symbol, plan in self.plans.items()
+            if plan['pending'] is not None and now - plan['last_amend'] >= self.min_amend_interval
+        )
+        sent = 0
+        for _, symbol in due[:self.max_amends_per_flush]:
+            plan = self.plans[symbol]
+            try:
+                self._request('POST', '/api/mix/v1/plan/modifyTPSLPlan', {
+                    'orderId': plan['order_id'], 'symbol': symbol, 'marginCoin': self.margin_coin,
+                    'planType': PLAN_TYPE, 'triggerPrice': str(plan['pending'])
+                })
+            except ExitOrderError as e:
+                # Keep the pending level and retry on a later flush
+                logging.warning("Could not trail the exchange-side exit of %s: %s", symbol, e)
+                plan['last_amend'] = now
+                continue
+            plan['trigger'], plan['pending'], plan['last_amend'] = plan['pending'], None, now
+            sent += 1
+        return sent
+
+    def check(self, symbol, low_price):
+        """
+        Whether the plan fired, given the lowest price seen since the last
+        check. The exchange is only asked when `low_price` reached the
+        trigger. Returns None while the plan is live, otherwise a dict with
+        'action' ('stop_loss' or 'take_profit'), 'price' and 'order_id'.
+        """
+        plan = self.plans.get(symbol)
+        if plan is None or low_price > plan['trigger']:
+            return None
+        now = self.clock.time()
+        if plan['last_check'] is not None and now - plan['last_check'] < self.min_check_interval:
+            return None
+        plan['last_check'] = now
+        try:
+            live = self._request('GET', '/api/mix/v1/plan/currentPlan', {'symbol': symbol, 'isPlan': 'profit_loss'})
+            if any(order['orderId'] == plan['order_id'] for order in live or []):
+                return None
+            history = self._request('GET', '/api/mix/v1/plan/historyPlan', {
+                'symbol': symbol, 'isPlan': 'profit_loss', 'pageSize': '20',
+                'startTime': '0', 'endTime': str(int(time.time() * 1000))
+            })
+        except ExitOrderError as e:
+            logging.warning("Could not check the exchange-side exit of %s: %s", symbol, e)
+            return None
+        del self.plans[symbol]
+        order = next((order for order in history or [] if order['orderId'] == plan['order_id']), None)
+        if order is None or order.get('status') != 'triggered':
+            logging.warning("Exchange-side exit of %s is gone without a fill (%s)", symbol, order)
+            return None
+        price = float(order.get('executePrice') or 0) or float(order['triggerPrice'])
+        action = 'take_profit' if price > plan['entry_price'] else 'stop_loss'
+        return {'action': action, 'price': price, 'order_id': plan['order_id']}
+
+    def cancel(self, symbol):
+        """Cancel the plan after the bot closed the position itself"""
+        plan = self.plans.pop(symbol, None)
+        if plan is None:
+            return False
+        try:
+            self._request('POST', '/api/mix/v1/plan/cancelPlan', {
+                'orderId': plan['order_id'], 'symbol': symbol, 'marginCoin': self.margin_coin, 'planType': PLAN_TYPE
+            })
+        except ExitOrderError as e:
+            logging.warning("Could not cancel the exchange-side exit of %s: %s", symbol, e)
+            return False
+        return True
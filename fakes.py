@@ -0,0 +1,28 @@
+# fakes.py
+"""
+Test doubles shared by the test suite
+- FakeClock: manual clock with time() and sleep(); sleep records the delay
+  and advances the clock
+- RecordingJournal: EventJournal stand-in keeping (event, fields) tuples
+"""
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class RecordingJournal:
+    def __init__(self):
+        self.events = []
+
+    def record(self, event, **fields):
+        self.events.append((event, fields))
@@ -0,0 +1,255 @@
+# indicators.py
+"""
+Incremental indicators on the live candle history
+- ATR (Wilder's smoothing), rolling volume mean / standard deviation and
+  z-score, and realized volatility (standard deviation of log returns)
+- Each closed candle updates the statistics in O(1): running sums of the
+  window's values (shifted by the last mean, against cancellation), re-summed
+  exactly once per window to keep floating-point drift out
+- The forming candle is applied provisionally (recomputed from the closed
+  state on every update) and only committed once a newer candle arrives
+- Per-candle history of the values, for filters on past candles such as
+  minimum-volume swing lows in the S/R calculation
+"""
+
+import math
+
+import numpy as np
+
+HISTORY_COLUMNS = ('atr', 'volume_zscore', 'volatility')
+
+
+class RollingWindow:
+    """Mean and standard deviation of the last `size` values, O(1) per push"""
+
+    __slots__ = ('size', 'values', 'count', 'pos', 'shift', 'total', 'total_sq', '_pushes')
+
+    def __init__(self, size):
+        if size < 2:
+            raise ValueError("Rolling windows need at least 2 values")
+        self.size = size
+        self.values = np.zeros(size)
+        self.count = 0
+        self.pos = 0
+        # Sums are of (value - shift)
+        self.shift = 0.0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def push(self, value):
+        if self._pushes == 0:
+            self.shift = value
+        old = self.values[self.pos] - self.shift if self.full else 0.0
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self._pushes += 1
+        if self._pushes % self.size == 0:
+            window = self.values[:self.count]
+            self.shift = float(window.mean())
+            deviations = window - self.shift
+            self.total, self.total_sq = float(deviations.sum()), float(np.dot(deviations, deviations))
+        else:
+            value -= self.shift
+            self.total += value - old
+            self.total_sq += value * value - old * old
+
+    def stats(self, extra=None):
+        """
+        (mean, standard deviation) of the window, NaN until it is full. With
+        `extra`, as if that value had been pushed (the oldest one dropped).
+        """
+        if extra is None:
+            if not self.full:
+                return math.nan, math.nan
+            total, total_sq = self.total, self.total_sq
+        else:
+            if self.count < self.size - 1:
+                return math.nan, math.nan
+            if self.count == 0:
+                return extra, 0.0
+            old = self.values[self.pos] - self.shift if self.full else 0.0
+            extra -= self.shift
+            total, total_sq = self.total + extra - old, self.total_sq + extra * extra - old * old
+        mean = total / self.size
+        return self.shift + mean, math.sqrt(max(total_sq / self.size - mean * mean, 0.0))
+
+
+class _History:
+    """Indicator values per closed candle, in a ring written twice for contiguous views (as CandleBuffer)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.columns = {name: np.full(2 * capacity, np.nan) for name in HISTORY_COLUMNS}
+        self.start = 0
+        self.size = 0
+
+    def append(self, timestamp, values):
+        if self.size < self.capacity:
+            pos = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            pos = self.start
+            self.start = (self.start + 1) % self.capacity
+        for index in (pos, pos + self.capacity):
+            self.timestamps[index] = timestamp
+            for name in HISTORY_COLUMNS:
+                self.columns[name][index] = values[name]
+
+    def window(self):
+        return slice(self.start, self.start + self.size)
+
+
+class IndicatorPipeline:
+    """
+    ATR, volume statistics and realized volatility maintained candle by candle.
+
+    Args:
+        atr_period (int): ATR length (Wilder's smoothing after a simple-mean seed).
+        volume_window (int): Closed candles in the volume mean and standard
+            deviation; a candle's z-score is measured against the window
+            before it.
+        volatility_window (int): Log returns in the realized volatility.
+        capacity (int): Candles of per-candle history kept (as the CandleBuffer).
+
+    Feed it with update() per candle or sync() from a CandleBuffer; the
+    properties describe the newest candle, the forming one included.
+    """
+
+    def __init__(self, atr_period=14, volume_window=20, volatility_window=20, capacity=1000):
+        self.atr_period = atr_period
+        self._volume = RollingWindow(volume_window)
+        self._returns = RollingWindow(volatility_window)
+        self._history = _History(capacity)
+        self._prev_close = None
+        self._atr = math.nan
+        self._tr_sum = 0.0
+        self._tr_count = 0
+        # Forming candle as (timestamp, high, low, close, volume)
+        self._forming = None
+        self._values = dict.fromkeys(HISTORY_COLUMNS, math.nan)
+
+    @classmethod
+    def from_config(cls, config, **overrides):
+        """Build from the 'indicators' entries of live_signal_bot.load_config()"""
+        settings = config.get('indicators', {})
+        params = {key: settings[key] for key in ('atr_period', 'volume_window', 'volatility_window') if key in settings}
+        return cls(**{**params, **overrides})
+
+    @property
+    def last_timestamp(self):
+        return None if self._forming is None else self._forming[0]
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """
+        Apply one candle: the newest timestamp replaces the forming candle, a
+        newer one commits it first; older candles are ignored. O(1).
+        """
+        timestamp = int(timestamp)
+        if self._forming is not None and timestamp < self._forming[0]:
+            return
+        if self._forming is not None and timestamp > self._forming[0]:
+            self._commit(*self._forming)
+        self._forming = (timestamp, float(high), float(low), float(close), float(volume))
+        self._values = self._compute(*self._forming[1:])
+
+    def sync(self, candle_buffer):
+        """Apply the buffer's candles from the forming one on (all of them the first time)"""
+        timestamps = candle_buffer.timestamps()
+        first = 0 if self._forming is None else int(np.searchsorted(timestamps, self._forming[0]))
+        if first == len(timestamps):
+            return
+        columns = [candle_buffer.column(name)[first:] for name in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        for row in zip(timestamps[first:], *columns):
+            self.update(*row)
+
+    def _compute(self, high, low, close, volume):
+        """Values of a candle following the closed state"""
+        prev_close = self._prev_close
+        true_range = high - low if prev_close is None else max(high, prev_close) - min(low, prev_close)
+        if self._tr_count >= self.atr_period:
+            atr = (self._atr * (self.atr_period - 1) + true_range) / self.atr_period
+        elif self._tr_count == self.atr_period - 1:
+            atr = (self._tr_sum + true_range) / self.atr_period
+        else:
+            atr = math.nan
+        volume_mean, volume_std = self._volume.stats()
+        volume_zscore = (volume - volume_mean) / volume_std if volume_std > 0 else math.nan
+        if prev_close is not None and prev_close > 0 and close > 0:
+            volatility = self._returns.stats(math.log(close / prev_close))[1]
+        else:
+            volatility = self._returns.stats()[1]
+        return {'atr': atr, 'volume_zscore': volume_zscore, 'volatility': volatility, 'true_range': true_range}
+
+    def _commit(self, timestamp, high, low, close, volume):
+        values = self._compute(high, low, close, volume)
+        if self._tr_count < self.atr_period:
+            self._tr_sum += values['true_range']
+        self._tr_count += 1
+        self._atr = values['atr']
+        if self._prev_close is not None and self._prev_close > 0 and close > 0:
+            self._returns.push(math.log(close / self._prev_close))
+        self._volume.push(volume)
+        self._prev_close = close
+        self._history.append(timestamp, values)
+
+    @property
+    def atr(self):
+        return self._values['atr']
+
+    @property
+    def volume_zscore(self):
+        return self._values['volume_zscore']
+
+    @property
+    def volatility(self):
+        """Standard deviation of the log returns per candle"""
+        return self._values['volatility']
+
+    @property
+    def volume_mean(self):
+        return self._volume.stats()[0]
+
+    def atr_percent(self, price):
+        """ATR as a fraction of `price` (NaN until the ATR is seeded)"""
+        return self.atr / price if price else math.nan
+
+    def scaled_tolerance(self, price, multiplier, fallback):
+        """multiplier * ATR / price, or `fallback` while the ATR is not seeded or scaling is off"""
+        if multiplier <= 0:
+            return fallback
+        tolerance = multiplier * self.atr_percent(price)
+        return fallback if math.isnan(tolerance) else tolerance
+
+    def history(self, name, timestamps=None):
+        """
+        Per-candle values of `name` ('atr', 'volume_zscore' or 'volatility'),
+        oldest first, the forming candle last. With `timestamps`, aligned to
+        them (NaN for candles without a value).
+        """
+        window = self._history.window()
+        values = self._history.columns[name][window]
+        known = self._history.timestamps[window]
+        if self._forming is not None:
+            # Forming candle last, `capacity` candles in all (as the CandleBuffer)
+            values = np.append(values, self._values[name])[-self._history.capacity:]
+            known = np.append(known, self._forming[0])[-self._history.capacity:]
+        if timestamps is None:
+            return values
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        index = np.clip(np.searchsorted(known, timestamps), 0, max(len(known) - 1, 0))
+        aligned = np.full(len(timestamps), np.nan)
+        if len(known):
+            found = known[index] == timestamps
+            aligned[found] = values[index[found]]
+        return aligned
+
+    def swing_mask(self, timestamps, min_volume_zscore):
+        """Candles that may confirm a swing: volume z-score at least `min_volume_zscore` (or unknown)"""
+        return ~(self.history('volume_zscore', timestamps) < min_volume_zscore)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import ccxt
 import configparser
@@ -8,15 +9,22 @@ import traceback
 from datetime import datetime
 from data_fetcher import load_market_data_from_csv
 from support_resistance import find_lhl_support_resistance
-
-# Configure logging with more detailed format
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s\n%(pathname)s:%(lineno)d',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
+from sr_levels import SUPPORT, RESISTANCE, TYPE_NAMES, as_sr_levels
+from candle_buffer import CandleBuffer
+from bot_logging import setup_logging, EventJournal
+from poll_scheduler import PollScheduler
+from price_ticks import fetch_tick_size
+from sr_publisher import SharedSRFeed, FeedExchange
+from candle_builder import TradeCandleExchange
+from indicators import IndicatorPipeline
+from strategy_variants import VariantRunner, load_variants
+from sr_worker import SRWorker
+from sr_registry import SRRegistry, STATE_NAMES
+from memory_monitor import MemoryMonitor
+from exit_orders import ExitOrders
+from retry_policy import RetryPolicy, CircuitOpenError
+from state_snapshot import (
+    save_snapshot, load_snapshot, restore_candle_buffer, restore_sr_levels, fetch_missed_candles
 )
 
 def load_config():
@@ -43,7 +51,7 @@ def load_config():
                 if not config.has_option(section, key):
                     raise ValueError(f"Missing required key {key} in section [{section}]")
         
-        return {
+        settings = {
             'api_key': config.get('BITGET', 'API_KEY'),
             'secret_key': config.get('BITGET', 'SECRET_KEY'),
             'passphrase': config.get('BITGET', 'PASSPHRASE'),
@@ -52,8 +60,70 @@ def load_config():
             'leverage': int(config.get('TRADING', 'LEVERAGE')),
             'sr_price_tolerance': float(config.get('TRADING', 'SR_PRICE_TOLERANCE_PERCENT')),
             'entry_proximity': float(config.get('TRADING', 'ENTRY_PROXIMITY_PERCENT')),
-            'historical_data_csv': config.get('TRADING', 'HISTORICAL_DATA_CSV')
+            'historical_data_csv': config.get('TRADING', 'HISTORICAL_DATA_CSV'),
+            'event_journal_file': config.get('LOGGING', 'EVENT_JOURNAL_FILE', fallback='bot_events.jsonl'),
+            'use_price_ticks': config.getboolean('SR', 'USE_PRICE_TICKS', fallback=False),
+            'sr_worker': {
+                'enabled': config.getboolean('SR', 'WORKER_PROCESS', fallback=False),
+                'deadline': float(config.get('SR', 'WORKER_DEADLINE_SECONDS', fallback='0.5')),
+                'restart_after': float(config.get('SR', 'WORKER_RESTART_SECONDS', fallback='60'))
+            },
+            'sr_registry': {
+                'enabled': config.getboolean('SR', 'REGISTRY', fallback=False),
+                'file': config.get('SR', 'REGISTRY_FILE', fallback='sr_registry.csv'),
+                'capacity': int(config.get('SR', 'REGISTRY_CAPACITY', fallback='500'))
+            },
+            'snapshot_file': config.get('STATE', 'SNAPSHOT_FILE', fallback='bot_state.npz'),
+            'snapshot_interval': float(config.get('STATE', 'SNAPSHOT_INTERVAL_SECONDS', fallback='60')),
+            'shared_feed': config.get('FEED', 'SHARED_NAME', fallback=''),
+            'indicators': {
+                'atr_period': int(config.get('INDICATORS', 'ATR_PERIOD', fallback='14')),
+                'volume_window': int(config.get('INDICATORS', 'VOLUME_WINDOW', fallback='20')),
+                'volatility_window': int(config.get('INDICATORS', 'VOLATILITY_WINDOW', fallback='20')),
+                'atr_tolerance_multiplier': float(config.get('INDICATORS', 'ATR_TOLERANCE_MULTIPLIER', fallback='0')),
+                'atr_entry_multiplier': float(config.get('INDICATORS', 'ATR_ENTRY_MULTIPLIER', fallback='0')),
+                'min_swing_volume_zscore': float(
+                    config.get('INDICATORS', 'MIN_SWING_VOLUME_ZSCORE', fallback='') or 'nan'
+                )
+            },
+            'trade_candles': {
+                'enabled': config.getboolean('STREAM', 'TRADE_CANDLES', fallback=False),
+                'websocket': config.getboolean('STREAM', 'WEBSOCKET', fallback=True),
+                'reconcile_interval': float(config.get('STREAM', 'RECONCILE_SECONDS', fallback='60'))
+            },
+            'retry': {
+                'max_attempts': int(config.get('RETRY', 'MAX_ATTEMPTS', fallback='3')),
+                'base_delay': float(config.get('RETRY', 'BASE_DELAY_SECONDS', fallback='1')),
+                'max_delay': float(config.get('RETRY', 'MAX_DELAY_SECONDS', fallback='30')),
+                'deadline': float(config.get('RETRY', 'DEADLINE_SECONDS', fallback='20')),
+                'failure_threshold': int(config.get('RETRY', 'CIRCUIT_FAILURE_THRESHOLD', fallback='5')),
+                'reset_timeout': float(config.get('RETRY', 'CIRCUIT_RESET_SECONDS', fallback='60'))
+            },
+            'exit_orders': {
+                'enabled': config.getboolean('EXITS', 'EXCHANGE_ORDERS', fallback=False),
+                'base_url': config.get('EXITS', 'BASE_URL', fallback='https://api.bitget.com'),
+                'min_amend_interval': float(config.get('EXITS', 'MIN_AMEND_SECONDS', fallback='10')),
+                'min_amend_step': float(config.get('EXITS', 'MIN_AMEND_STEP_PERCENT', fallback='0.0005'))
+            },
+            'scheduler': {
+                'fast_interval': float(config.get('SCHEDULER', 'POLL_FAST_SECONDS', fallback='5')),
+                'normal_interval': float(config.get('SCHEDULER', 'POLL_NORMAL_SECONDS', fallback='30')),
+                'slow_interval': float(config.get('SCHEDULER', 'POLL_SLOW_SECONDS', fallback='60')),
+                'far_multiplier': float(config.get('SCHEDULER', 'FAR_PROXIMITY_MULTIPLIER', fallback='5')),
+                'candle_close_offset': float(config.get('SCHEDULER', 'CANDLE_CLOSE_OFFSET_SECONDS', fallback='1')),
+                'error_backoff_max': float(config.get('SCHEDULER', 'ERROR_BACKOFF_MAX_SECONDS', fallback='120'))
+            },
+            'memory': {
+                'enabled': config.getboolean('MEMORY', 'TRACE', fallback=False),
+                'interval': float(config.get('MEMORY', 'REPORT_INTERVAL_MINUTES', fallback='60')) * 60,
+                'top': int(config.get('MEMORY', 'TOP_ALLOCATIONS', fallback='10')),
+                'frames': int(config.get('MEMORY', 'TRACE_FRAMES', fallback='1')),
+                'budget_mb': float(config.get('MEMORY', 'BUDGET_MB', fallback='0'))
+            }
         }
+        # Variants fall back to the main strategy's margin and leverage parsed above
+        settings['variants'] = load_variants(config, settings)
+        return settings
     except Exception as e:
         logging.error(f"Error loading config: {str(e)}\n{traceback.format_exc()}")
         raise
@@ -84,133 +154,165 @@ def fetch_initial_data(exchange, symbol, limit=1000):
         logging.error(f"Error fetching initial data: {e}")
         return pd.DataFrame()
 
-def calculate_stop_loss_price(entry_price, margin_usdt, leverage):
-    """Calculate stop loss price that would result in 1.5 USDT loss"""
-    target_loss_usdt = 1.5
-    position_size = (margin_usdt * leverage) / entry_price
+def calculate_stop_loss_price(entry_price, margin_usdt, leverage, target_loss_usdt=1.5, position_size=None):
+    """
+    Calculate stop loss price that would result in a `target_loss_usdt` loss (1.5 USDT by default).
+    The position size follows from margin and leverage unless the filled `position_size` is given.
+    """
+    if position_size is None:
+        position_size = (margin_usdt * leverage) / entry_price
     price_move_for_loss = target_loss_usdt / position_size
     return entry_price - price_move_for_loss
 
-def is_developing_lhl(current_price, sr_df, entry_proximity_percent):
-    """Check if there's a developing LHL pattern near current price"""
-    if sr_df is None or sr_df.empty:
+def take_profit_trigger(entry_price, highest_price, fraction=0.15):
+    """Trailing take-profit level: give back `fraction` of the gain from the highest price"""
+    gain_distance = highest_price - entry_price
+    return highest_price - (fraction * gain_distance)
+
+def watched_levels(strategy_state, sr_levels):
+    """Prices the scheduler should watch: stop/take-profit in a position, supports otherwise"""
+    if strategy_state['in_position']:
+        levels = [strategy_state['stop_loss_price']]
+        if strategy_state['highest_price_since_entry'] > strategy_state['entry_price']:
+            levels.append(take_profit_trigger(strategy_state['entry_price'], strategy_state['highest_price_since_entry']))
+        return levels
+    sr_levels = as_sr_levels(sr_levels)
+    return sr_levels.price[sr_levels.type_code == SUPPORT].tolist()
+
+def is_developing_lhl(current_price, sr_levels, entry_proximity_percent):
+    """
+    Check if there's a developing LHL pattern near current price.
+
+    Accepts SRLevels or a DataFrame with 'Type' and 'Price' columns; the
+    first support (in level order) that price approaches from above wins.
+    """
+    sr_levels = as_sr_levels(sr_levels)
+    if sr_levels.empty:
         return False, None
-    
-    # Get all support levels
-    supports = sr_df[sr_df['Type'] == 'Support']
-    if supports.empty:
+
+    support_prices = sr_levels.price
+    # Only trigger if price is approaching from above (NaN prices never match)
+    near = (
+        (sr_levels.type_code == SUPPORT) &
+        (current_price > support_prices) &
+        (np.abs(current_price - support_prices) <= support_prices * entry_proximity_percent)
+    )
+    match = np.flatnonzero(near)
+    if not match.size:
         return False, None
+    return True, float(support_prices[match[0]])
 
-    # Look through all support levels
-    for _, support_row in supports.iterrows():
-        try:
-            support_price = float(support_row['Price'])
-            allowed_distance = support_price * entry_proximity_percent
-            
-            # Only trigger if price is approaching from above
-            if current_price > support_price and abs(current_price - support_price) <= allowed_distance:
-                return True, support_price
-        except (ValueError, TypeError):
-            continue
-            
-    return False, None
+def _format_levels(levels):
+    """Render 'S1=1.2345, S2=...' from the tier labels and prices"""
+    return ', '.join(f"{label}={price:.4f}" for label, price in zip(levels.labels(), levels.price))
+
+def _nearest_recent(levels, indices, current_price, max_levels=10):
+    """The `max_levels` most recent of `indices`, ordered by distance to the current price"""
+    recent = indices[np.argsort(-levels.timestamp[indices].astype(np.int64), kind='stable')][:max_levels]
+    return recent[np.argsort(np.abs(levels.price[recent] - current_price), kind='stable')]
 
-def get_closest_sr_levels(current_price, historical_candles_df, config):
-    """Calculate S/R levels focusing on the 10 most recent support levels and selecting the nearest as S1"""
+def get_closest_sr_levels(current_price, historical_candles_df, config, as_frame=True):
+    """
+    Calculate S/R levels focusing on the 10 most recent support levels and selecting the nearest as S1.
+
+    Levels are re-tiered by distance to the current price (nearest = S1/R1)
+    and returned resistances first, then supports, each nearest first, with a
+    'distance' column. With as_frame=False an SRLevels instance is returned
+    instead of a DataFrame.
+    """
     # Use more candles to catch more potential support levels
     recent_data = historical_candles_df.tail(1000)  # Use last 1000 candles for better context
+    swing_filter = config.get('swing_filter')
+    if swing_filter is not None:
+        swing_filter = swing_filter[-len(recent_data):]
     
-    logging.debug(f"Calculating S/R levels for current price: {current_price:.4f}")
+    logging.debug("Calculating S/R levels for current price: %.4f", current_price)
     
     # Calculate S/R levels
-    sr_df = find_lhl_support_resistance(
+    levels = find_lhl_support_resistance(
         recent_data,
         tolerance_percent=config['sr_price_tolerance'],
         window_size=20,
-        sr_count=20  # Get more levels to ensure we have enough supports
+        sr_count=20,  # Get more levels to ensure we have enough supports
+        as_frame=False,
+        tick_size=config.get('tick_size'),
+        swing_filter=swing_filter
     )
     
-    if sr_df.empty:
+    if levels.empty:
         logging.debug("No S/R levels found")
-        return pd.DataFrame(columns=['Type', 'Tier', 'Price', 'Timestamp', 'distance'])
+        if as_frame:
+            return pd.DataFrame(columns=['Type', 'Tier', 'Price', 'Timestamp', 'distance'])
+        return levels
     
-    # Split into supports and resistances
-    supports = sr_df[sr_df['Type'] == 'Support'].copy()
-    resistances = sr_df[sr_df['Type'] == 'Resistance'].copy()
+    # Take the 10 most recent levels of each type and sort them by distance to the current price
+    supports = _nearest_recent(levels, np.flatnonzero(levels.type_code == SUPPORT), current_price)
+    resistances = _nearest_recent(levels, np.flatnonzero(levels.type_code == RESISTANCE), current_price)
     
-    # Process support levels
-    if not supports.empty:
-        # Sort supports by timestamp (most recent first) and take the last 10
-        supports = supports.sort_values('Timestamp', ascending=False).head(10)
-        
-        # Calculate distance to current price
-        supports['distance'] = abs(supports['Price'] - current_price)
-        
-        # Sort by distance to get the nearest support
-        supports = supports.sort_values('distance')
-        
-        # Assign new tiers based on distance (nearest = S1)
-        supports['Tier'] = [f'S{i+1}' for i in range(len(supports))]
-        
-        # Log support level details
-        support_details = []
-        for _, row in supports.iterrows():
-            support_details.append(f"{row['Tier']}={row['Price']:.4f}")
-        logging.info(f"Support levels found: {', '.join(support_details)}")
-        
-        # Check if price is near the nearest support (S1)
-        if not supports.empty:
-            s1 = supports.iloc[0]
-            support_proximity = abs(current_price - s1['Price']) / s1['Price']
-            if support_proximity <= config['sr_price_tolerance']:
-                logging.info(f"Price {current_price:.4f} is near support {s1['Price']:.4f} ({s1['Tier']})")
+    # Combine levels (resistances first) and assign new tiers based on distance (nearest = S1/R1)
+    order = np.concatenate((resistances, supports))
+    levels = levels.take(order)
+    levels.tier = np.concatenate((np.arange(1, len(resistances) + 1), np.arange(1, len(supports) + 1))).astype(np.int16)
+    levels.distance = np.abs(levels.price - current_price)
     
-    # Process resistance levels
-    if not resistances.empty:
-        # Sort resistances by timestamp (most recent first) and take the last 10
-        resistances = resistances.sort_values('Timestamp', ascending=False).head(10)
-        
-        # Calculate distance to current price
-        resistances['distance'] = abs(resistances['Price'] - current_price)
-        
-        # Sort by distance to get the nearest resistance
-        resistances = resistances.sort_values('distance')
-        
-        # Assign new tiers based on distance (nearest = R1)
-        resistances['Tier'] = [f'R{i+1}' for i in range(len(resistances))]
-        
-        # Log resistance level details
-        resistance_details = []
-        for _, row in resistances.iterrows():
-            resistance_details.append(f"{row['Tier']}={row['Price']:.4f}")
-        if resistance_details:
-            logging.info(f"Resistance levels found: {', '.join(resistance_details)}")
+    # Log level details and check if price is near the nearest support (S1)
+    if len(supports):
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("Support levels found: %s", _format_levels(levels.supports()))
+        s1_price = levels.tier_price(SUPPORT, 1)
+        support_proximity = abs(current_price - s1_price) / s1_price
+        if support_proximity <= config['sr_price_tolerance']:
+            logging.info("Price %.4f is near support %.4f (S1)", current_price, s1_price)
+    if len(resistances) and logging.getLogger().isEnabledFor(logging.INFO):
+        logging.info("Resistance levels found: %s", _format_levels(levels.resistances()))
     
-    # Combine levels and maintain proper ordering
-    sr_df = pd.concat([supports, resistances])
-    
-    # Final sorting and cleanup
-    if not sr_df.empty:
-        sr_df = sr_df.sort_values(['Type', 'distance'])
-        sr_df = sr_df.reset_index(drop=True)
-    
-    return sr_df
+    return levels.to_frame() if as_frame else levels
 
-def fetch_with_retry(exchange, symbol, retries=3, delay=2):
-    """Fetch data with retry mechanism"""
-    for attempt in range(retries):
-        try:
-            candles = exchange.fetch_ohlcv(symbol, '5m', limit=2)
-            if candles:
-                return candles
-        except Exception as e:
-            if attempt < retries - 1:  # If not the last attempt
-                logging.warning(f"Fetch attempt {attempt + 1} failed: {str(e)}. Retrying in {delay} seconds...")
-                time.sleep(delay)
-                continue
-            else:
-                raise  # Re-raise the last exception if all retries failed
-    return None
+def indicator_config(config, indicators, current_price, candle_buffer):
+    """
+    The config of one cycle: S/R and entry tolerances scaled by the ATR and a
+    'swing_filter' dropping low-volume swing lows, when [INDICATORS] asks for them.
+    """
+    settings = config.get('indicators') or {}
+    tolerance_multiplier = settings.get('atr_tolerance_multiplier', 0)
+    entry_multiplier = settings.get('atr_entry_multiplier', 0)
+    min_zscore = settings.get('min_swing_volume_zscore', float('nan'))
+    if tolerance_multiplier <= 0 and entry_multiplier <= 0 and np.isnan(min_zscore):
+        return config
+    cycle_config = dict(config)
+    cycle_config['sr_price_tolerance'] = indicators.scaled_tolerance(
+        current_price, tolerance_multiplier, config['sr_price_tolerance']
+    )
+    cycle_config['entry_proximity'] = indicators.scaled_tolerance(
+        current_price, entry_multiplier, config['entry_proximity']
+    )
+    if not np.isnan(min_zscore):
+        cycle_config['swing_filter'] = indicators.swing_mask(candle_buffer.timestamps(), min_zscore)
+    return cycle_config
+
+class NoCandlesError(ccxt.NetworkError):
+    """fetch_ohlcv answered with no candles; transient, so the retry policy retries it"""
+
+def fetch_with_retry(exchange, symbol, policy=None, sleep=time.sleep):
+    """
+    Fetch the latest two candles, retrying transient errors under `policy`
+    (see retry_policy.py). An empty result counts as a transient error, so it
+    shares the policy's attempts, backoff and deadline; None if the policy
+    gave up on empty results.
+    """
+    policy = policy or RetryPolicy(sleep=sleep)
+
+    def fetch_candles():
+        candles = exchange.fetch_ohlcv(symbol, '5m', limit=2)
+        if not candles:
+            raise NoCandlesError(f"no candles for {symbol}")
+        return candles
+
+    try:
+        return policy.call('fetch_ohlcv', fetch_candles)
+    except NoCandlesError:
+        logging.warning("fetch_ohlcv returned no candles for %s, giving up for this cycle", symbol)
+        return None
 
 def safe_get_float_from_df(df, index, column):
     """Safely extract a float value from a DataFrame"""
@@ -222,30 +324,213 @@ def safe_get_float_from_df(df, index, column):
     except (IndexError, ValueError, TypeError):
         return None
 
-def main():
+def _tier_price(sr_levels, tier):
+    """Price of the given tier (e.g. 'S1') or 'N/A' if it is not present"""
+    sr_levels = as_sr_levels(sr_levels)
+    price = sr_levels.tier_price(SUPPORT if tier.startswith('S') else RESISTANCE, int(tier[1:]))
+    return price if price is not None else 'N/A'
+
+def _tier_ids(sr_levels, level_ids):
+    """Registry ids of S1 and R1 (None when a side has no level)"""
+    ids = []
+    for type_code in (SUPPORT, RESISTANCE):
+        match = np.flatnonzero((sr_levels.type_code == type_code) & (sr_levels.tier == 1))
+        ids.append(int(level_ids[match[0]]) if match.size else None)
+    return tuple(ids)
+
+def new_strategy_state():
+    """Flat position state, kept in a dict so it can be snapshotted and restored"""
+    return {
+        'in_position': False,
+        'entry_price': None,
+        'highest_price_since_entry': None,
+        'resistance_target': None,
+        'stop_loss_price': None,
+        'position_size': None,
+        'exit_order_id': None,
+        'exit_trigger': None
+    }
+
+def close_opened_position(symbol, price, strategy_state, exit_orders, close_position):
+    """
+    Close the position the order path opened before a polled exit resets the
+    state, cancelling its exchange-side plan if one is still live. A signal-only
+    position (no size recorded) has nothing to close.
+
+    Returns:
+        bool: False if the close failed and the position is still open.
+    """
+    if not strategy_state.get('position_size'):
+        return True
+    if exit_orders is not None:
+        exit_orders.cancel(symbol)
+    if close_position(symbol, price, strategy_state['position_size']):
+        return True
+    logging.error("Could not close the %s position of %s at %s, retrying next cycle",
+                  symbol, strategy_state['position_size'], price)
+    return False
+
+def main(config=None, exchange=None, clock=time, journal=None, sr_source=None, open_position=None,
+         close_position=None):
+    """
+    Run the trading bot until interrupted.
+
+    Every dependency can be injected, so the same loop runs against a replay
+    (see market_replay.py); the defaults are the live ones.
+
+    Args:
+        config (dict): As returned by load_config(); read from config.ini if None.
+        exchange: ccxt-style client; a Bitget client is created if None.
+        clock: Object with time() and sleep(seconds), the time module by default.
+        journal (EventJournal): Event sink; built from the config if None.
+        sr_source: Callable (current_price, candles_df, config) -> SRLevels;
+            get_closest_sr_levels by default, the published levels when
+            subscribed to a shared feed (see sr_publisher.py).
+        open_position: Order path, callable (symbol, price, margin_usdt,
+            leverage) -> (fill_price, size) of the opened position, or None
+            if no position was opened. The bot itself only signals entries;
+            exchange-side exit plans ([EXITS] EXCHANGE_ORDERS) are placed
+            only for positions this callable reports as opened.
+        close_position: Callable (symbol, price, size) -> bool closing an
+            opened position at market, True once it is closed. Required with
+            open_position: polled exits close through it whenever the
+            exchange-side plan is missing.
+    """
+    setup_logging('bot.log')
+    owns_journal = journal is None
+    journal = journal or EventJournal(None)
+    strategy_state = new_strategy_state()
+    candle_buffer = None
+    sr_levels = None
+    variants = None
+    variant_states = None
+    sr_worker = None
+    sr_registry = None
+    memory = None
     try:
         logging.info("Starting LHL Pattern Trading Bot...")
         
         # Load configuration
-        config = load_config()
-        logging.info(f"Configuration loaded successfully for symbol {config['symbol']}")
+        config = config or load_config()
+        logging.info("Configuration loaded successfully for symbol %s", config['symbol'])
+        if owns_journal:
+            journal = EventJournal(config['event_journal_file'])
+        
+        # Subscribe to a publisher's shared candle and S/R feed instead of polling the exchange
+        if exchange is None and config.get('shared_feed'):
+            exchange = FeedExchange(SharedSRFeed.attach(config['shared_feed']))
+            sr_source = sr_source or exchange.published_levels
+            logging.info("Reading candles and S/R levels from shared feed '%s'", config['shared_feed'])
+        worker_config = config.get('sr_worker') or {}
+        use_sr_worker = sr_source is None and worker_config.get('enabled')
+        if sr_source is None:
+            def sr_source(current_price, historical_candles_df, config):
+                return get_closest_sr_levels(current_price, historical_candles_df, config, as_frame=False)
         
         # Initialize exchange
-        exchange = setup_exchange(config['api_key'], config['secret_key'], config['passphrase'])
+        exchange = exchange or setup_exchange(config['api_key'], config['secret_key'], config['passphrase'])
         if not exchange:
             raise Exception("Failed to initialize exchange")
         
-        # Initialize bot state
-        historical_candles_df = fetch_initial_data(exchange, config['symbol'])
-        if historical_candles_df.empty:
-            raise Exception("Failed to fetch initial historical data")
+        # Build the candles locally from the trade stream instead of waiting for the exchange's candles
+        trade_candles = config.get('trade_candles', {})
+        if trade_candles.get('enabled') and not isinstance(exchange, FeedExchange):
+            exchange = TradeCandleExchange(
+                exchange, config['symbol'], '5m', reconcile_interval=trade_candles['reconcile_interval'],
+                stream=trade_candles['websocket'], clock=clock
+            )
+            logging.info("Building %s candles from trades (reconciled every %ss)",
+                         config['symbol'], trade_candles['reconcile_interval'])
         
-        # Bot state variables
-        is_in_position = False
-        last_entry_price = None
-        highest_price_since_entry = None
-        current_lhl_resistance_target = None
-        calculated_stop_loss_price = None
+        # Optional integer-tick prices from the market's price precision
+        config['tick_size'] = None
+        if config['use_price_ticks']:
+            try:
+                config['tick_size'] = fetch_tick_size(exchange, config['symbol'])
+                logging.info("Using integer price ticks of %s", config['tick_size'])
+            except Exception as e:
+                logging.warning("Could not read the price tick of %s, using float prices: %s", config['symbol'], e)
+        
+        # Warm start: restore state, candles and S/R from the last snapshot
+        snapshot = load_snapshot(config['snapshot_file'])
+        if snapshot and snapshot['symbol'] == config['symbol']:
+            strategy_state.update(snapshot['strategy_state'])
+            variant_states = snapshot.get('variant_states')
+            candle_buffer = restore_candle_buffer(snapshot, capacity=1000, tick_size=config['tick_size'])
+            if fetch_missed_candles(exchange, config['symbol'], candle_buffer, now_ms=int(clock.time() * 1000)):
+                sr_levels = restore_sr_levels(snapshot, as_frame=False)
+                logging.info(
+                    "Restored snapshot from %s (%d candles, in position: %s)",
+                    time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot['saved_at'])),
+                    len(candle_buffer), strategy_state['in_position']
+                )
+            else:
+                logging.info("Snapshot candles too old, refetching history (position state kept)")
+                candle_buffer = None
+        
+        # Cold start: fetch the full history
+        if candle_buffer is None:
+            historical_candles_df = fetch_initial_data(exchange, config['symbol'])
+            if historical_candles_df.empty:
+                raise Exception("Failed to fetch initial historical data")
+            
+            # Fixed-size candle history, updated in place every cycle
+            candle_buffer = CandleBuffer.from_frame(historical_candles_df, capacity=1000, tick_size=config['tick_size'])
+        
+        # S/R in a worker process with a deadline, so price and exit checks never wait on it
+        if use_sr_worker:
+            sr_worker = SRWorker(
+                candle_buffer, deadline=worker_config['deadline'], restart_after=worker_config['restart_after'],
+                initial_levels=sr_levels
+            )
+            sr_source = lambda current_price, historical_candles_df, config: sr_worker.levels(current_price, config)
+            logging.info("Computing S/R in a worker process (deadline %.2fs)", worker_config['deadline'])
+        
+        # Rolling ATR / volume / volatility, updated per candle instead of recomputed per cycle
+        indicators = IndicatorPipeline.from_config(config, capacity=candle_buffer.capacity)
+        indicators.sync(candle_buffer)
+        
+        # Strategy variants evaluated on the same candles and S/R levels (paper positions)
+        variants = VariantRunner(config.get('variants') or [], config['symbol'], journal, variant_states)
+        if len(variants):
+            logging.info("Evaluating %d strategy variants: %s", len(variants), ', '.join(variants.states))
+        
+        # Exchange-side stop / trailing take-profit plans instead of polled exits
+        exit_orders = None
+        exit_config = config.get('exit_orders') or {}
+        if exit_config.get('enabled') and (open_position is None or close_position is None):
+            logging.warning("[EXITS] EXCHANGE_ORDERS needs an order path (main(open_position=..., close_position=...)); "
+                            "the bot only signals entries, so exits stay polled")
+        elif exit_config.get('enabled'):
+            exit_orders = ExitOrders(
+                {'API_KEY': config['api_key'], 'SECRET_KEY': config['secret_key'], 'PASSPHRASE': config['passphrase']},
+                base_url=exit_config['base_url'], min_amend_interval=exit_config['min_amend_interval'],
+                min_amend_step=exit_config['min_amend_step'], tick_size=config['tick_size'], clock=clock
+            )
+            if strategy_state['in_position'] and strategy_state['exit_order_id']:
+                exit_orders.adopt(config['symbol'], strategy_state['exit_order_id'],
+                                  strategy_state['entry_price'], strategy_state['exit_trigger'])
+        
+        if sr_levels is not None and not sr_levels.empty:
+            main.prev_s1 = _tier_price(sr_levels, 'S1')
+            main.prev_r1 = _tier_price(sr_levels, 'R1')
+        
+        # Stable level ids with touch / break statistics, so re-estimated S1 / R1 prices are not reported as changes
+        registry_config = config.get('sr_registry') or {}
+        prev_sr_ids = None
+        if registry_config.get('enabled'):
+            sr_registry = SRRegistry.load(
+                registry_config['file'], tolerance=config['sr_price_tolerance'], capacity=registry_config['capacity'],
+                symbol=config['symbol']
+            )
+        last_snapshot_time = clock.time()
+        scheduler = PollScheduler.from_config(config)
+        retry_policy = RetryPolicy.from_config(config, sleep=clock.sleep, clock=clock.time)
+        
+        # tracemalloc reports and the memory budget; started last so setup allocations are the baseline
+        if (config.get('memory') or {}).get('enabled'):
+            memory = MemoryMonitor.from_config(config, journal, clock=clock.time)
+            memory.start()
         
         logging.info("Bot initialized successfully, entering main loop...")
         
@@ -253,128 +538,238 @@ def main():
         while True:
             try:
                 # 1. Fetch latest candle with retry mechanism
-                latest_candles = fetch_with_retry(exchange, config['symbol'])
+                latest_candles = fetch_with_retry(exchange, config['symbol'], retry_policy)
                 if not latest_candles:
                     logging.error("Failed to fetch data after retries, waiting for next cycle...")
-                    time.sleep(30)
+                    clock.sleep(scheduler.error_delay())
                     continue
                 
-                latest_df = pd.DataFrame(latest_candles, columns=['timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
-                latest_df['timestamp'] = pd.to_datetime(latest_df['timestamp'], unit='ms')
-                
-                # 2. Update historical data
-                historical_candles_df = pd.concat([historical_candles_df, latest_df])\
-                    .drop_duplicates(subset=['timestamp'])\
-                    .sort_values('timestamp')
-                
-                # Keep only the last 1000 candles to maintain performance
-                historical_candles_df = historical_candles_df.tail(1000).reset_index(drop=True)
+                # 2. Update historical data (forming candle in place, closed candles appended)
+                candle_buffer.upsert_ohlcv(latest_candles)
+                indicators.sync(candle_buffer)
+                historical_candles_df = candle_buffer.to_frame()
                 
                 # 3. Get current price and calculate S/R levels
-                current_price = float(latest_df.iloc[-1]['Close'])
-                sr_df = get_closest_sr_levels(current_price, historical_candles_df, config)
+                current_price = float(latest_candles[-1][4])
+                cycle_config = indicator_config(config, indicators, current_price, candle_buffer)
+                sr_levels = sr_source(current_price, historical_candles_df, cycle_config)
+                state_changed = False
+                if sr_registry is not None:
+                    sr_levels = as_sr_levels(sr_levels)
+                    sr_registry.update(candle_buffer)
+                    level_ids = sr_registry.observe(sr_levels, int(clock.time() * 1000))
+                    for level_id in sr_registry.added + sr_registry.broken:
+                        level = sr_registry.get(level_id)
+                        journal.record(
+                            'sr_level', symbol=config['symbol'], id=level_id, type=TYPE_NAMES[level['type_code']],
+                            price=level['price'], state=STATE_NAMES[level['state']], touches=level['touches']
+                        )
+                    sr_registry.flush()
                 
                 # 4. Signal Detection & Management
-                if not is_in_position:
+                if not strategy_state['in_position']:
                     # Check for entry signal
                     has_lhl_pattern, support_price = is_developing_lhl(
                         current_price, 
-                        sr_df, 
-                        config['entry_proximity']
+                        sr_levels, 
+                        cycle_config['entry_proximity']
                     )
                     
                     if has_lhl_pattern:
-                        is_in_position = True
-                        last_entry_price = current_price
-                        highest_price_since_entry = current_price
+                        strategy_state['in_position'] = True
+                        strategy_state['entry_price'] = current_price
+                        strategy_state['highest_price_since_entry'] = current_price
                         
                         # Set resistance target to R1 from current S/R calculation
-                        r1_level = sr_df[sr_df['Tier'] == 'R1']
-                        if not r1_level.empty:
-                            current_lhl_resistance_target = float(r1_level.iloc[0]['Price'])
+                        strategy_state['resistance_target'] = sr_levels.tier_price(RESISTANCE, 1)
                         
-                        calculated_stop_loss_price = calculate_stop_loss_price(
-                            last_entry_price,
+                        strategy_state['stop_loss_price'] = calculate_stop_loss_price(
+                            current_price,
                             config['trade_margin_usdt'],
                             config['leverage']
                         )
+                        if exit_orders:
+                            # Only a position the order path actually opened gets an exchange-side plan
+                            opened = open_position(
+                                config['symbol'], current_price, config['trade_margin_usdt'], config['leverage']
+                            )
+                            if opened:
+                                # Stops and trailing follow the actual fill, not the signal price
+                                fill_price, size = opened
+                                strategy_state['entry_price'] = fill_price
+                                strategy_state['highest_price_since_entry'] = fill_price
+                                strategy_state['position_size'] = size
+                                strategy_state['stop_loss_price'] = calculate_stop_loss_price(
+                                    fill_price, config['trade_margin_usdt'], config['leverage'], position_size=size
+                                )
+                                strategy_state['exit_order_id'] = exit_orders.place(
+                                    config['symbol'], fill_price, strategy_state['stop_loss_price'], size
+                                )
+                                strategy_state['exit_trigger'] = exit_orders.trigger_price(config['symbol'])
+                            else:
+                                logging.warning("No position opened for the entry signal, exits stay polled")
+                        state_changed = True
                         
                         logging.info(
-                            f"ENTRY SIGNAL: Price={current_price}, Support={support_price}, "
-                            f"Stop Loss={calculated_stop_loss_price}, Target={current_lhl_resistance_target}"
+                            "ENTRY SIGNAL: Price=%s, Support=%s, Stop Loss=%s, Target=%s",
+                            current_price, support_price, strategy_state['stop_loss_price'],
+                            strategy_state['resistance_target']
+                        )
+                        journal.record(
+                            'signal', symbol=config['symbol'], side='long', price=current_price,
+                            support=support_price, stop_loss=strategy_state['stop_loss_price'],
+                            target=strategy_state['resistance_target']
                         )
+                        journal.record('trade', symbol=config['symbol'], action='entry',
+                                       price=strategy_state['entry_price'])
                 
                 else:  # In position
+                    entry_price = strategy_state['entry_price']
+                    
                     # Update highest price since entry
-                    highest_price_since_entry = max(highest_price_since_entry, current_price)
+                    highest_price_since_entry = max(strategy_state['highest_price_since_entry'], current_price)
+                    strategy_state['highest_price_since_entry'] = highest_price_since_entry
                     
-                    # Check stop loss
-                    if current_price <= calculated_stop_loss_price:
-                        logging.info(
-                            f"STOP LOSS: Entry={last_entry_price}, Exit={current_price}, "
-                            f"Loss={calculated_stop_loss_price - last_entry_price}"
-                        )
-                        is_in_position = False
-                        last_entry_price = None
-                        highest_price_since_entry = None
-                        current_lhl_resistance_target = None
-                        calculated_stop_loss_price = None
+                    # With a live exchange-side plan the exchange exits; only ask it when the low reached the trigger
+                    if exit_orders and exit_orders.trigger_price(config['symbol']) is not None:
+                        exchange_exit = exit_orders.check(config['symbol'], min(candle[3] for candle in latest_candles))
+                        if exchange_exit:
+                            logging.info(
+                                "EXCHANGE %s: Entry=%s, Exit=%s, Highest=%s",
+                                exchange_exit['action'].upper().replace('_', ' '), entry_price,
+                                exchange_exit['price'], highest_price_since_entry
+                            )
+                            journal.record(
+                                'trade', symbol=config['symbol'], action=exchange_exit['action'],
+                                entry=entry_price, price=exchange_exit['price'], highest=highest_price_since_entry,
+                                order_id=exchange_exit['order_id']
+                            )
+                            strategy_state.update(new_strategy_state())
+                        else:
+                            exit_orders.trail(config['symbol'], highest_price_since_entry)
+                            exit_orders.flush()
+                            strategy_state['exit_trigger'] = exit_orders.trigger_price(config['symbol'])
+                            if strategy_state['exit_trigger'] is None:
+                                # The plan disappeared without a fill; fall back to polled exits
+                                strategy_state['exit_order_id'] = None
+                        state_changed = exchange_exit is not None
+                    
+                    # Check stop loss (an opened position is closed first, polled exits have no plan behind them)
+                    elif current_price <= strategy_state['stop_loss_price']:
+                        if close_opened_position(config['symbol'], current_price, strategy_state, exit_orders,
+                                                 close_position):
+                            logging.info(
+                                "STOP LOSS: Entry=%s, Exit=%s, Loss=%s",
+                                entry_price, current_price, strategy_state['stop_loss_price'] - entry_price
+                            )
+                            journal.record(
+                                'trade', symbol=config['symbol'], action='stop_loss',
+                                entry=entry_price, price=current_price
+                            )
+                            strategy_state.update(new_strategy_state())
+                            state_changed = True
                     
                     # Check take profit (if we're still in position and above stop loss)
-                    elif current_price > last_entry_price:
-                        gain_distance = highest_price_since_entry - last_entry_price
-                        take_profit_trigger = highest_price_since_entry - (0.15 * gain_distance)
-                        
-                        if current_price <= take_profit_trigger:
+                    elif current_price > entry_price:
+                        if current_price <= take_profit_trigger(entry_price, highest_price_since_entry) and close_opened_position(
+                                config['symbol'], current_price, strategy_state, exit_orders, close_position):
                             logging.info(
-                                f"TAKE PROFIT: Entry={last_entry_price}, Exit={current_price}, "
-                                f"Highest={highest_price_since_entry}, Profit={current_price - last_entry_price}"
+                                "TAKE PROFIT: Entry=%s, Exit=%s, Highest=%s, Profit=%s",
+                                entry_price, current_price, highest_price_since_entry,
+                                current_price - entry_price
+                            )
+                            journal.record(
+                                'trade', symbol=config['symbol'], action='take_profit',
+                                entry=entry_price, price=current_price, highest=highest_price_since_entry
                             )
-                            is_in_position = False
-                            last_entry_price = None
-                            highest_price_since_entry = None
-                            current_lhl_resistance_target = None
-                            calculated_stop_loss_price = None
+                            strategy_state.update(new_strategy_state())
+                            state_changed = True
+                
+                # Variants reuse this cycle's price and levels; only their own checks run
+                if len(variants) and variants.on_price(current_price, sr_levels, cycle_config['entry_proximity']):
+                    state_changed = True
                 
                 # Get current S/R levels
-                current_s1 = sr_df[sr_df['Tier'] == 'S1'].iloc[0]['Price'] if not sr_df.empty else 'N/A'
-                current_r1 = sr_df[sr_df['Tier'] == 'R1'].iloc[0]['Price'] if not sr_df.empty else 'N/A'
+                current_s1 = _tier_price(sr_levels, 'S1')
+                current_r1 = _tier_price(sr_levels, 'R1')
                 
                 # Store previous S/R levels for comparison
                 if not hasattr(main, 'prev_s1'):
                     main.prev_s1 = current_s1
                     main.prev_r1 = current_r1
                 
-                # Log current state with S/R level changes
-                if current_s1 != main.prev_s1 or current_r1 != main.prev_r1:
+                # Log current state with S/R level changes (by level id when the registry is on)
+                position_label = 'Yes' if strategy_state['in_position'] else 'No'
+                if sr_registry is not None:
+                    current_sr_ids = _tier_ids(sr_levels, level_ids)
+                    sr_changed = prev_sr_ids is not None and current_sr_ids != prev_sr_ids
+                    prev_sr_ids = current_sr_ids
+                else:
+                    sr_changed = current_s1 != main.prev_s1 or current_r1 != main.prev_r1
+                if sr_changed:
                     logging.info(
-                        f"S/R UPDATE - Current Price: {current_price}, "
-                        f"Position: {'Yes' if is_in_position else 'No'}, "
-                        f"S1: {main.prev_s1}->{current_s1}, "
-                        f"R1: {main.prev_r1}->{current_r1}"
+                        "S/R UPDATE - Current Price: %s, Position: %s, S1: %s->%s, R1: %s->%s",
+                        current_price, position_label,
+                        main.prev_s1, current_s1, main.prev_r1, current_r1
+                    )
+                    journal.record(
+                        'sr_change', symbol=config['symbol'], price=current_price,
+                        s1_from=main.prev_s1, s1_to=current_s1, r1_from=main.prev_r1, r1_to=current_r1
                     )
-                    main.prev_s1 = current_s1
-                    main.prev_r1 = current_r1
                 else:
                     logging.info(
-                        f"Current Price: {current_price}, "
-                        f"Position: {'Yes' if is_in_position else 'No'}, "
-                        f"S1: {current_s1}, R1: {current_r1}"
+                        "Current Price: %s, Position: %s, S1: %s, R1: %s",
+                        current_price, position_label, current_s1, current_r1
                     )
+                main.prev_s1 = current_s1
+                main.prev_r1 = current_r1
                 
-                # Sleep for 30 seconds
-                time.sleep(30)
+                # Snapshot right after a position change, otherwise periodically
+                if config['snapshot_file'] and (
+                        state_changed or clock.time() - last_snapshot_time >= config['snapshot_interval']):
+                    save_snapshot(config['snapshot_file'], config['symbol'], strategy_state, candle_buffer, sr_levels,
+                                  variants.states)
+                    last_snapshot_time = clock.time()
                 
+                if memory is not None:
+                    memory.check()
+                
+                # Sleep until the next candle close or proximity-based poll, whichever is first
+                clock.sleep(scheduler.next_delay(
+                    clock.time(), current_price, watched_levels(strategy_state, sr_levels) + variants.watched_levels(),
+                    cycle_config['entry_proximity']
+                ))
+                
+            except CircuitOpenError as e:
+                # The exchange keeps failing: wait for the circuit's probe instead of hammering it
+                logging.warning("%s", e)
+                clock.sleep(max(scheduler.error_delay(), e.retry_after))
             except Exception as e:
-                logging.error(f"Error in main loop: {str(e)}\n{traceback.format_exc()}")
-                time.sleep(30)  # Still sleep on error to prevent rapid retries
+                logging.exception("Error in main loop: %s", e)
+                clock.sleep(scheduler.error_delay())  # Back off on repeated errors to prevent rapid retries
     
     except KeyboardInterrupt:
         logging.info("Bot shutdown requested by user...")
     except Exception as e:
-        logging.error(f"Critical error: {str(e)}\n{traceback.format_exc()}")
+        logging.exception("Critical error: %s", e)
     finally:
+        if config and config['snapshot_file'] and candle_buffer is not None:
+            try:
+                save_snapshot(config['snapshot_file'], config['symbol'], strategy_state, candle_buffer, sr_levels,
+                              variants.states if variants else None)
+            except Exception as e:
+                logging.error("Failed to write shutdown snapshot: %s", e)
         logging.info("Bot shutting down...")
+        if isinstance(exchange, TradeCandleExchange):
+            exchange.close()
+        if sr_worker is not None:
+            sr_worker.close()
+        if sr_registry is not None:
+            sr_registry.close()
+        if memory is not None:
+            memory.stop()
+        if owns_journal:
+            journal.close()
 
 if __name__ == "__main__":
     main()
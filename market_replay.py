@@ -0,0 +1,238 @@
+# market_replay.py
+"""
+Accelerated market replay for the full bot loop
+- ReplayClock: virtual clock handed to live_signal_bot.main; sleep() advances
+  virtual time and, at a finite speed, really sleeps delay / speed
+- ReplayExchange: ccxt-style data source serving candles up to the virtual
+  time, with the forming candle built along an open-low-high-close path
+- run_replay: runs the unmodified live_signal_bot.main loop over a CSV or a
+  candle DataFrame and records per-cycle latency and every decision
+
+Usage:
+    python market_replay.py --csv market_data.csv --speed 1000
+    python market_replay.py --speed 0 --output replay_cycles.csv
+"""
+
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+import live_signal_bot
+from bot_logging import EventJournal, setup_logging
+from data_fetcher import load_market_data_from_csv
+from state_snapshot import TIMEFRAME_MS
+
+
+class ReplayFinished(BaseException):
+    """
+    Raised when the replay runs out of candles. Derives from BaseException,
+    like KeyboardInterrupt, so the bot's per-cycle error handling does not
+    swallow it and main() shuts down normally.
+    """
+
+
+class ReplayClock:
+    """
+    Virtual clock for live_signal_bot.main.
+
+    Args:
+        start (float): Virtual epoch seconds at the start of the replay.
+        speed (float): Replay speed; 1 sleeps in real time, 1000 a thousand
+            times faster, 0 (or None) never sleeps.
+        end (float): Virtual time at which sleep() raises ReplayFinished.
+
+    Processing time is not added to the virtual clock, so a replay gives the
+    same decisions at any speed.
+    """
+
+    def __init__(self, start, speed=0.0, end=None):
+        self.now = float(start)
+        self.speed = speed or 0.0
+        self.end = end
+        self.cycles = []
+        self._cycle_start = None
+        self._cycle_price = None
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """Record the cycle that just ended, then advance virtual time by `seconds`"""
+        if self._cycle_start is not None:
+            self.cycles.append({
+                'time': self.now,
+                'price': self._cycle_price,
+                'latency_ms': (time.perf_counter() - self._cycle_start) * 1000,
+                'sleep': seconds
+            })
+            self._cycle_start = None
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+        self.now += seconds
+        if self.end is not None and self.now >= self.end:
+            raise ReplayFinished()
+
+    def start_cycle(self, price):
+        """Called by the exchange when it serves the latest candle; the cycle is timed from here"""
+        self._cycle_start = time.perf_counter()
+        self._cycle_price = price
+
+
+class ReplayExchange:
+    """
+    ccxt-style exchange serving recorded candles as of the clock's time.
+
+    Closed candles are returned as recorded. The forming candle moves from
+    open to low to high to close (open-high-low-close for bearish candles) in
+    thirds of the timeframe, with the volume prorated, so intrabar polls see
+    plausible prices.
+    """
+
+    id = 'replay'
+    precisionMode = 4
+
+    def __init__(self, candles_df, clock, symbol, timeframe_ms=TIMEFRAME_MS, tick_size=None):
+        self.clock = clock
+        self.symbol = symbol
+        self.timeframe_ms = timeframe_ms
+        self.tick_size = tick_size
+        self.timestamps = candles_df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+        self.values = candles_df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+
+    def load_markets(self, reload=False):
+        return {self.symbol: self.market(self.symbol)}
+
+    def market(self, symbol):
+        return {'symbol': symbol, 'id': symbol, 'precision': {'price': self.tick_size}}
+
+    def _forming(self, index, now_ms):
+        """The candle at `index` as seen `now_ms` into its timeframe"""
+        open_, high, low, close, volume = self.values[index]
+        progress = min(max((now_ms - self.timestamps[index]) / self.timeframe_ms, 0.0), 1.0)
+        first, second = (high, low) if close < open_ else (low, high)
+        path = np.array([open_, first, second, close])
+        position = progress * 3
+        step = min(int(position), 2)
+        price = path[step] + (path[step + 1] - path[step]) * (position - step)
+        seen = np.append(path[:step + 1], price)
+        return [int(self.timestamps[index]), open_, float(seen.max()), float(seen.min()), float(price),
+                volume * progress]
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        now_ms = int(self.clock.time() * 1000)
+        current = int(np.searchsorted(self.timestamps, now_ms, side='right')) - 1
+        if current < 0:
+            return []
+        if current == len(self.timestamps) - 1 and now_ms >= self.timestamps[current] + self.timeframe_ms:
+            raise ReplayFinished()
+        if since is not None:
+            first = int(np.searchsorted(self.timestamps, since, side='left'))
+            stop = min(current + 1, first + limit) if limit else current + 1
+        else:
+            stop = current + 1
+            first = max(stop - limit, 0) if limit else 0
+        rows = [[int(ts)] + values.tolist() for ts, values in zip(self.timestamps[first:stop], self.values[first:stop])]
+        if rows and stop == current + 1:
+            rows[-1] = self._forming(current, now_ms)
+            self.clock.start_cycle(rows[-1][4])
+        return rows
+
+
+def _replay_config(config=None):
+    config = dict(config or live_signal_bot.load_config())
+    # Never read or overwrite the live snapshot and journal
+    config['snapshot_file'] = ''
+    config['event_journal_file'] = ''
+    # Simulated entries must not place or amend exit plans on the real exchange
+    config['exit_orders'] = {**(config.get('exit_orders') or {}), 'enabled': False}
+    # Keep the S/R registry in memory instead of rewriting the live registry file
+    config['sr_registry'] = {**(config.get('sr_registry') or {}), 'file': ''}
+    return config
+
+
+def run_replay(candles, speed=0.0, history=500, config=None, tick_size=None):
+    """
+    Run live_signal_bot.main over recorded candles.
+
+    Args:
+        candles (str or pd.DataFrame): CSV path (market_data.csv layout) or
+            DataFrame with 'timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'.
+        speed (float): Replay speed (1 to 10000), 0 for as fast as possible.
+        history (int): Candles before the replay start, served as the bot's
+            initial history (it asks for up to 1000).
+        config (dict): Bot config (load_config() layout); config.ini if None.
+        tick_size (float): Price tick reported by the replay market.
+
+    Returns:
+        dict: 'cycles' (pd.DataFrame with virtual time, price, latency_ms and
+        sleep per loop iteration), 'events' (journal events: signals, trades,
+        S/R changes) and 'stats' (cycle count, latency percentiles, wall time).
+    """
+    candles_df = load_market_data_from_csv(candles) if isinstance(candles, str) else candles
+    if len(candles_df) <= history:
+        raise ValueError(f"Need more than {history} candles to replay, got {len(candles_df)}")
+    config = _replay_config(config)
+
+    timestamps = candles_df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+    start = timestamps[history] / 1000 + config['scheduler'].get('candle_close_offset', 1.0)
+    clock = ReplayClock(start, speed)
+    exchange = ReplayExchange(candles_df, clock, config['symbol'], tick_size=tick_size)
+    journal = EventJournal(None, clock=clock.time, keep_events=True)
+
+    # main keeps the last S1/R1 on the function object between iterations
+    for attr in ('prev_s1', 'prev_r1'):
+        if hasattr(live_signal_bot.main, attr):
+            delattr(live_signal_bot.main, attr)
+
+    # Console-only logging unless the caller set it up already (main() would log to bot.log)
+    setup_logging(None, level=logging.WARNING)
+    started = time.perf_counter()
+    try:
+        live_signal_bot.main(config=config, exchange=exchange, clock=clock, journal=journal)
+    except ReplayFinished:
+        pass
+    wall_seconds = time.perf_counter() - started
+
+    cycles = pd.DataFrame(clock.cycles, columns=['time', 'price', 'latency_ms', 'sleep'])
+    cycles['time'] = pd.to_datetime(cycles['time'], unit='s')
+    latency = cycles['latency_ms'].to_numpy()
+    stats = {
+        'cycles': len(cycles),
+        'virtual_hours': round((clock.now - start) / 3600, 2),
+        'wall_seconds': round(wall_seconds, 3),
+        'latency_ms': dict(zip(('p50', 'p90', 'p99', 'max'), np.round(
+            np.percentile(latency, [50, 90, 99, 100]), 3).tolist())) if len(latency) else {},
+        'events': {name: sum(e['event'] == name for e in journal.events) for name in ('signal', 'trade', 'sr_change')}
+    }
+    return {'cycles': cycles, 'events': journal.events, 'stats': stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded candles through the live bot loop')
+    parser.add_argument('--csv', default='market_data.csv', help='Candles to replay')
+    parser.add_argument('--speed', type=float, default=0.0, help='Replay speed (1-10000), 0 for as fast as possible')
+    parser.add_argument('--history', type=int, default=500, help='Candles used as the initial history')
+    parser.add_argument('--output', default=None, help='Write the per-cycle records to this CSV')
+    parser.add_argument('--events', default=None, help='Write the recorded decisions to this JSONL file')
+    parser.add_argument('--verbose', action='store_true', help='Show the bot log (slows the replay)')
+    args = parser.parse_args()
+
+    setup_logging(None, level=logging.INFO if args.verbose else logging.WARNING)
+    result = run_replay(args.csv, args.speed, args.history)
+    print(json.dumps(result['stats'], indent=2))
+    if args.output:
+        result['cycles'].to_csv(args.output, index=False)
+        print(f"Cycle records saved to {args.output}")
+    if args.events:
+        with open(args.events, 'w', encoding='utf-8') as f:
+            for event in result['events']:
+                f.write(json.dumps(event, default=str) + '\n')
+        print(f"Decisions saved to {args.events}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# memory_monitor.py
+"""
+Memory instrumentation for long-running bots
+- Takes a tracemalloc snapshot every `interval` seconds and reports the
+  allocation sites that grew most since the previous snapshot, so slow
+  growth (DataFrame churn, cached strings) shows up long before the OOM killer
+- Checks the process against a per-symbol memory budget (one bot process per
+  symbol) and logs a warning when it is exceeded
+- Every report is a 'memory' event in the bot's event journal, next to its
+  trades and S/R changes
+- Resident set size comes from psutil when installed (optional), otherwise
+  /proc/self/statm; without either the budget applies to traced memory
+"""
+
+import logging
+import os
+import time
+import tracemalloc
+
+MB = 1024 * 1024
+
+# Allocations of the instrumentation itself, left out of the reports
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>',
+                  '<unknown>')
+
+
+def rss_bytes():
+    """Resident set size of this process in bytes, or None if it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryMonitor:
+    """
+    Periodic tracemalloc reports and a memory budget for one bot.
+
+    Args:
+        symbol (str): Symbol of the bot, for the journal and warnings.
+        journal: EventJournal (or any object with record(event, **fields)).
+        interval (float): Seconds between snapshots.
+        top (int): Number of allocation sites per report.
+        budget_mb (float): Memory budget in MB; 0 disables the check.
+        frames (int): Stack frames tracemalloc keeps per allocation; more
+            frames locate callers better but cost more memory.
+        clock: time.time by default.
+    """
+
+    def __init__(self, symbol, journal, interval=3600.0, top=10, budget_mb=0.0, frames=1, clock=time.time):
+        self.symbol = symbol
+        self.journal = journal
+        self.interval = interval
+        self.top = top
+        self.budget_mb = budget_mb
+        self.frames = frames
+        self.clock = clock
+        self.reports = 0
+        self.over_budget = 0
+        self._started_tracing = False
+        self._snapshot = None
+        self._last_check = None
+        self._first_traced = None
+
+    @classmethod
+    def from_config(cls, config, journal, clock=time.time):
+        """Build from the 'memory' entries of live_signal_bot.load_config()"""
+        settings = {key: value for key, value in config.get('memory', {}).items() if key != 'enabled'}
+        return cls(config['symbol'], journal, clock=clock, **settings)
+
+    def start(self):
+        """Start tracing (unless already on) and take the baseline snapshot"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._snapshot = self._take_snapshot()
+        self._first_traced = tracemalloc.get_traced_memory()[0]
+        self._last_check = self.clock()
+        logging.info("Memory tracing on: report every %.0fs, budget %s", self.interval,
+                     f"{self.budget_mb:.0f} MB" if self.budget_mb > 0 else "none")
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def check(self):
+        """Report if `interval` seconds have passed since the last report; returns the report or None"""
+        if self._snapshot is None or self.clock() - self._last_check < self.interval:
+            return None
+        return self.report()
+
+    def report(self):
+        """
+        Snapshot now, journal and return the report: traced, peak and resident
+        memory in MB, growth since the previous report and since start, the
+        budget state and the `top` sites by growth.
+        """
+        snapshot = self._take_snapshot()
+        key = 'traceback' if self.frames > 1 else 'lineno'
+        stats = snapshot.compare_to(self._snapshot, key)
+        stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+        traced, peak = tracemalloc.get_traced_memory()
+        rss = rss_bytes()
+        used_mb = (rss if rss is not None else traced) / MB
+        report = {
+            'traced_mb': round(traced / MB, 3),
+            'peak_mb': round(peak / MB, 3),
+            'rss_mb': None if rss is None else round(rss / MB, 3),
+            'growth_mb': round(sum(stat.size_diff for stat in stats) / MB, 3),
+            'growth_since_start_mb': round((traced - self._first_traced) / MB, 3),
+            'budget_mb': self.budget_mb,
+            'over_budget': self.budget_mb > 0 and used_mb > self.budget_mb,
+            'top': [
+                {
+                    'site': ' <- '.join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback),
+                    'size_kb': round(stat.size / 1024, 1),
+                    'diff_kb': round(stat.size_diff / 1024, 1),
+                    'count_diff': stat.count_diff
+                }
+                for stat in stats[:self.top] if stat.size_diff > 0
+            ]
+        }
+        self._snapshot = snapshot
+        self._last_check = self.clock()
+        self.reports += 1
+
+        self.journal.record('memory', symbol=self.symbol, **report)
+        logging.info("Memory: traced %.1f MB (%+.2f MB), RSS %s", report['traced_mb'], report['growth_mb'],
+                     'n/a' if rss is None else f"{report['rss_mb']:.1f} MB")
+        if report['top'] and logging.getLogger().isEnabledFor(logging.DEBUG):
+            for site in report['top']:
+                logging.debug("Memory growth %+.1f KB (%+d blocks) at %s",
+                              site['diff_kb'], site['count_diff'], site['site'])
+        if report['over_budget']:
+            self.over_budget += 1
+            top_site = report['top'][0]['site'] if report['top'] else 'n/a'
+            logging.warning("%s uses %.1f MB, over its %.0f MB memory budget (largest growth at %s)",
+                            self.symbol, used_mb, self.budget_mb, top_site)
+        return report
@@ -1,12 +1,12 @@
-import ccxt
 import time
 import logging
-import requests
 import hashlib
 import hmac
 import base64
 import json
 
+from retry_policy import RetryPolicy
+
 def _generate_signature(timestamp, method, endpoint, body, secret_key):
     """Generate Bitget API signature - fixed for both GET and POST."""
     if not secret_key:
@@ -32,14 +32,21 @@ def _generate_signature(timestamp, method, endpoint, body, secret_key):
          logging.error(f"Error generating API signature: {e}", exc_info=True)
          raise # Re-raise exception to halt the operation
 
-def place_uni_long_order(exchange, symbol_ccxt, margin_usdt, leverage, strategy_state, base_url="https://api.bitget.com"):
-    """Places a market long order based on margin and leverage, and updates state."""
+def place_uni_long_order(exchange, symbol_ccxt, margin_usdt, leverage, strategy_state, base_url="https://api.bitget.com",
+                         policy=None):
+    """
+    Places a market long order based on margin and leverage, and updates state.
+    Network errors on the exchange calls are retried under `policy` (a
+    retry_policy.RetryPolicy; a fresh default one if None).
+    """
+    import ccxt
+    policy = policy or RetryPolicy(base_delay=2.0)
     leverage_set = False # Flag to track if leverage is confirmed or set
 
     # --- Check Current Leverage before Setting ---
     try:
         logging.info(f"Fetching current position/leverage info for {symbol_ccxt}...")
-        positions = exchange.fetch_positions(symbols=[symbol_ccxt]) 
+        positions = policy.call('fetch_positions', exchange.fetch_positions, symbols=[symbol_ccxt])
         current_leverage = None
 
         if positions: 
@@ -82,30 +89,17 @@ def place_uni_long_order(exchange, symbol_ccxt, margin_usdt, leverage, strategy_
     # --- Set Leverage with Retry (Only if needed) ---
     if not leverage_set: 
         logging.info("Attempting to set leverage via API call...")
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                logging.info(f"Attempt {attempt + 1}/{max_retries}: Setting leverage to {leverage}x for {symbol_ccxt}...")
-                exchange.set_leverage(leverage, symbol_ccxt) 
-                logging.info(f"Leverage set to {leverage}x successfully.")
-                leverage_set = True
-                break # Exit retry loop on success
-            except (ccxt.NetworkError, ccxt.RequestTimeout) as e: 
-                logging.warning(f"Leverage setting attempt {attempt + 1} failed due to network error: {e}")
-                if attempt < max_retries - 1:
-                    logging.info("Waiting 5 seconds before retrying leverage setting...")
-                    time.sleep(5)
-                else:
-                    logging.error(f"Failed to set leverage after {max_retries} attempts. Order placement aborted.")
-                    # Keep leverage_set as False
-            except ccxt.ExchangeError as e: 
-                logging.error(f"Exchange error setting leverage: {e}. Order placement aborted.")
-                leverage_set = False # Ensure it's false
-                break # Don't retry on non-network exchange errors
-            except Exception as e: 
-                logging.error(f"Unexpected error setting leverage: {e}. Order placement aborted.", exc_info=True)
-                leverage_set = False # Ensure it's false
-                break # Exit loop on unexpected error
+        try:
+            # Network errors are retried with backoff, exchange rejections are not
+            policy.call('set_leverage', exchange.set_leverage, leverage, symbol_ccxt)
+            logging.info(f"Leverage set to {leverage}x successfully.")
+            leverage_set = True
+        except (ccxt.NetworkError, ccxt.RequestTimeout) as e:
+            logging.error(f"Failed to set leverage after retries: {e}. Order placement aborted.")
+        except ccxt.ExchangeError as e: 
+            logging.error(f"Exchange error setting leverage: {e}. Order placement aborted.")
+        except Exception as e: 
+            logging.error(f"Unexpected error setting leverage: {e}. Order placement aborted.", exc_info=True)
 
     # Check if leverage was successfully confirmed or set
     if not leverage_set:
@@ -115,7 +109,7 @@ def place_uni_long_order(exchange, symbol_ccxt, margin_usdt, leverage, strategy_
     # --- Calculate Order Size (If leverage is confirmed/set) --- 
     try: 
         logging.info(f"Attempting to place market long order for {symbol_ccxt} with {margin_usdt} USDT margin...")
-        ticker = exchange.fetch_ticker(symbol_ccxt)
+        ticker = policy.call('fetch_ticker', exchange.fetch_ticker, symbol_ccxt)
         last_price = ticker.get('last')
         if not last_price or last_price <= 0:
             logging.error(f"Could not fetch valid last price ({last_price}) for {symbol_ccxt} to calculate order size.")
@@ -180,6 +174,7 @@ def place_uni_long_order(exchange, symbol_ccxt, margin_usdt, leverage, strategy_
 
 def close_uni_long_order(symbol_bitget, api_credentials, strategy_state, margin_coin="USDT", base_url="https://api.bitget.com"):
     """Closes the existing long position using a direct V1 API call."""
+    import requests
     if not strategy_state['in_position'] or strategy_state['position_size'] <= 0:
         logging.warning("Close order requested but not in a position or size is zero.")
         return None
@@ -0,0 +1,85 @@
+# poll_scheduler.py
+"""
+Polling scheduler for the LHL Trading Bot
+- Wakes right after each candle boundary so closed candles are processed
+  as soon as the exchange publishes them
+- Polls faster when price is close to a level that matters (supports when
+  flat, stop-loss/take-profit triggers when in a position), slower when far
+- Exponential backoff after errors instead of a fixed sleep
+"""
+
+import math
+
+
+class PollScheduler:
+    """
+    Decides how long the main loop sleeps between polls.
+
+    Args:
+        timeframe_seconds (int): Candle duration (300 for 5m candles).
+        fast_interval (float): Poll interval when price is within `proximity` of a watched level.
+        normal_interval (float): Poll interval in between.
+        slow_interval (float): Poll interval when price is further than
+            `far_multiplier * proximity` from every watched level.
+        far_multiplier (float): Distance, in multiples of the proximity, considered far.
+        candle_close_offset (float): Seconds to wait after a boundary before polling,
+            giving the exchange time to publish the closed candle.
+        error_backoff_base (float): First delay after an error.
+        error_backoff_max (float): Upper bound for the error delay.
+        min_delay (float): Never sleep less than this.
+    """
+
+    def __init__(self, timeframe_seconds=300, fast_interval=5.0, normal_interval=30.0, slow_interval=60.0,
+                 far_multiplier=5.0, candle_close_offset=1.0, error_backoff_base=2.0, error_backoff_max=120.0,
+                 min_delay=0.5):
+        self.timeframe_seconds = timeframe_seconds
+        self.fast_interval = fast_interval
+        self.normal_interval = normal_interval
+        self.slow_interval = slow_interval
+        self.far_multiplier = far_multiplier
+        self.candle_close_offset = candle_close_offset
+        self.error_backoff_base = error_backoff_base
+        self.error_backoff_max = error_backoff_max
+        self.min_delay = min_delay
+        self._consecutive_errors = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """Build from the 'scheduler' entries of live_signal_bot.load_config()"""
+        return cls(**config.get('scheduler', {}))
+
+    def seconds_to_candle_close(self, now):
+        """Seconds from `now` (epoch seconds) until the next boundary plus the close offset"""
+        next_boundary = (math.floor(now / self.timeframe_seconds) + 1) * self.timeframe_seconds
+        until = next_boundary + self.candle_close_offset - now
+        # Still inside the offset window of the boundary we just crossed
+        if until > self.timeframe_seconds:
+            until -= self.timeframe_seconds
+        return until
+
+    def interval_for(self, current_price, watch_levels, proximity):
+        """Poll interval for the current distance to the nearest watched level"""
+        levels = [level for level in watch_levels if level is not None and level > 0]
+        if not levels or not current_price or proximity <= 0:
+            return self.normal_interval
+        distance = min(abs(current_price - level) for level in levels) / current_price
+        if distance <= proximity:
+            return self.fast_interval
+        if distance >= proximity * self.far_multiplier:
+            return self.slow_interval
+        return self.normal_interval
+
+    def next_delay(self, now, current_price=None, watch_levels=(), proximity=0.0):
+        """
+        Seconds to sleep after a successful cycle: the proximity-based
+        interval, cut short so the loop wakes just after the next candle close.
+        """
+        self._consecutive_errors = 0
+        interval = self.interval_for(current_price, watch_levels, proximity)
+        return max(self.min_delay, min(interval, self.seconds_to_candle_close(now)))
+
+    def error_delay(self):
+        """Seconds to sleep after a failed cycle (doubles with every consecutive error)"""
+        delay = min(self.error_backoff_max, self.error_backoff_base * (2 ** self._consecutive_errors))
+        self._consecutive_errors += 1
+        return delay
@@ -0,0 +1,270 @@
+# portfolio_backtest.py
+"""
+Portfolio backtest of the LHL strategy across many symbols with shared capital
+- Signal generation runs per symbol in a process pool: every closed candle
+  gets the live bot's S/R levels (get_closest_sr_levels) and entry check
+  (is_developing_lhl), and each entry's stop-loss / trailing take-profit exit
+  is resolved on High/Low with exit_engine.resolve_exits
+- The per-symbol entry and exit events are merged by timestamp into one
+  capital and margin accounting loop: an entry is taken only while the
+  shared free margin covers it
+- Produces the trade list and a portfolio equity / drawdown curve marked to
+  market on the candle closes
+
+Usage:
+    python portfolio_backtest.py data/BTCUSDT.csv data/ETHUSDT.csv ... --capital 1000 --workers 8
+"""
+
+import argparse
+import heapq
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from exit_engine import resolve_exits, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT
+
+DEFAULT_FEE_RATE = 0.0006
+REASONS = {EXIT_STOP_LOSS: 'stop_loss', EXIT_TAKE_PROFIT: 'take_profit'}
+
+# Exits sort before entries at the same timestamp, so freed margin is reusable at once
+_EXIT, _ENTRY = 0, 1
+
+
+def _timestamps_ms(candles_df):
+    return candles_df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+
+
+def generate_signals(symbol, candles_df, config, history=1000, sr_interval=1):
+    """
+    Worker: the trades the live bot would make on one symbol, unconstrained by capital.
+
+    Every closed candle from `history` on is checked at its close, one
+    position at a time, as in live_signal_bot.main. S/R levels are
+    recomputed every `sr_interval` candles from the last `history` candles.
+
+    Returns:
+        dict: 'symbol', 'timestamp' and 'close' (the candles, for marking to
+        market) and 'trades', a list of (entry_index, entry_price,
+        stop_price, exit_index, exit_price, exit_reason) with exit_index -1
+        for a position still open at the end.
+    """
+    # Loaded in the worker so the parent does not pay for the bot's imports
+    from live_signal_bot import get_closest_sr_levels, is_developing_lhl, calculate_stop_loss_price
+
+    logging.getLogger().setLevel(logging.WARNING)
+    candles_df = candles_df.reset_index(drop=True)
+    close = candles_df['Close'].to_numpy(dtype=np.float64)
+    high = candles_df['High'].to_numpy(dtype=np.float64)
+    low = candles_df['Low'].to_numpy(dtype=np.float64)
+    open_ = candles_df['Open'].to_numpy(dtype=np.float64)
+    trades = []
+    levels, since_levels = None, sr_interval
+    i = history - 1
+    while i < len(close):
+        if since_levels >= sr_interval:
+            window = candles_df.iloc[max(i - history + 1, 0):i + 1]
+            levels = get_closest_sr_levels(close[i], window, config, as_frame=False)
+            since_levels = 0
+        since_levels += 1
+        has_pattern, _ = is_developing_lhl(close[i], levels, config['entry_proximity'])
+        if not has_pattern:
+            i += 1
+            continue
+        stop = float(calculate_stop_loss_price(close[i], config['trade_margin_usdt'], config['leverage']))
+        result = resolve_exits(high, low, [i], [close[i]], [stop], open_=open_)
+        exit_index = int(result['exit_index'][0])
+        trades.append((i, close[i], stop, exit_index, float(result['exit_price'][0]), int(result['exit_reason'][0])))
+        if exit_index < 0:
+            break
+        # Flat again after the exit candle; the next check is at the following close
+        i, since_levels = exit_index + 1, sr_interval
+    return {'symbol': symbol, 'timestamp': _timestamps_ms(candles_df), 'close': close, 'trades': trades}
+
+
+def _events(signals):
+    """Entry and exit events of one symbol as (timestamp_ms, kind, symbol, trade_number) tuples, in time order"""
+    timestamps = signals['timestamp']
+    events = []
+    for number, (entry_index, _, _, exit_index, _, _) in enumerate(signals['trades']):
+        events.append((int(timestamps[entry_index]), _ENTRY, signals['symbol'], number))
+        if exit_index >= 0:
+            events.append((int(timestamps[exit_index]), _EXIT, signals['symbol'], number))
+    return events
+
+
+def account(signals_by_symbol, capital, margin, leverage, fee_rate=DEFAULT_FEE_RATE):
+    """
+    Shared capital and margin accounting over the merged event streams.
+
+    Each entry locks `margin` and opens margin * leverage of notional; it is
+    skipped when the free margin (cash minus locked margin) cannot cover it.
+    Fees of `fee_rate` are charged on the notional at entry and exit.
+
+    Returns:
+        tuple: (trade rows, one dict per signal, and the realized cash
+        changes as (timestamp_ms, amount) pairs)
+    """
+    cash, locked = float(capital), 0.0
+    open_trades = {}
+    rows, cash_flows = [], []
+    streams = [_events(signals) for signals in signals_by_symbol.values()]
+    for timestamp, kind, symbol, number in heapq.merge(*streams):
+        signals = signals_by_symbol[symbol]
+        entry_index, entry_price, stop_price, exit_index, exit_price, reason = signals['trades'][number]
+        if kind == _ENTRY:
+            row = {
+                'symbol': symbol, 'entry_time': timestamp, 'entry_price': entry_price, 'stop_price': stop_price,
+                'exit_time': None, 'exit_price': np.nan, 'reason': None, 'size': 0.0, 'pnl': 0.0,
+                'status': 'skipped', '_entry_index': entry_index, '_exit_index': exit_index
+            }
+            rows.append(row)
+            if cash - locked < margin:
+                continue
+            size = margin * leverage / entry_price
+            fee = fee_rate * margin * leverage
+            cash -= fee
+            locked += margin
+            cash_flows.append((timestamp, -fee))
+            row.update(size=size, pnl=-fee, status='open')
+            open_trades[(symbol, number)] = row
+        else:
+            row = open_trades.pop((symbol, number), None)
+            if row is None:
+                continue  # Its entry was skipped
+            gross = row['size'] * (exit_price - row['entry_price'])
+            fee = fee_rate * row['size'] * exit_price
+            cash += gross - fee
+            locked -= margin
+            cash_flows.append((timestamp, gross - fee))
+            row.update(exit_time=timestamp, exit_price=exit_price, reason=REASONS.get(reason), status='closed',
+                       pnl=row['pnl'] + gross - fee)
+    return rows, cash_flows
+
+
+def equity_curve(signals_by_symbol, rows, cash_flows, capital):
+    """Portfolio equity on every candle timestamp: cash plus the open positions marked to the close"""
+    grid = np.unique(np.concatenate([signals['timestamp'] for signals in signals_by_symbol.values()]))
+    realized = np.zeros(len(grid))
+    if cash_flows:
+        flow_times, flows = np.array(cash_flows).T
+        np.add.at(realized, np.searchsorted(grid, flow_times.astype(np.int64)), flows)
+    # Cash changes count from their own candle on
+    equity = float(capital) + np.cumsum(realized)
+    for row in rows:
+        if row['status'] == 'skipped':
+            continue
+        signals = signals_by_symbol[row['symbol']]
+        end = row['_exit_index'] if row['status'] == 'closed' else len(signals['close'])
+        held = slice(row['_entry_index'], end)
+        # Unrealized PnL while held; the exit candle's value is in the realized cash flow
+        unrealized = row['size'] * (signals['close'][held] - row['entry_price'])
+        equity[np.searchsorted(grid, signals['timestamp'][held])] += unrealized
+    peak = np.maximum.accumulate(equity)
+    return pd.DataFrame({
+        'timestamp': grid.astype('datetime64[ms]'), 'equity': equity, 'drawdown': (peak - equity) / peak
+    })
+
+
+def run_portfolio_backtest(candles, config=None, capital=1000.0, workers=None, history=1000, sr_interval=1,
+                           fee_rate=DEFAULT_FEE_RATE):
+    """
+    Backtest the LHL strategy over several symbols sharing one margin account.
+
+    Args:
+        candles (dict): Symbol -> candle DataFrame ('timestamp', 'Open',
+            'High', 'Low', 'Close', 'Volume') or CSV path (market_data.csv layout).
+        config (dict): Bot config (live_signal_bot.load_config() layout);
+            config.ini if None. Uses the S/R tolerance, entry proximity,
+            TRADE_MARGIN_USDT and LEVERAGE.
+        capital (float): Starting capital shared by all symbols.
+        workers (int): Signal-generation processes; defaults to os.cpu_count(),
+            1 runs in-process.
+        history (int): Candles the S/R levels are computed from (the bot's 1000).
+        sr_interval (int): Candles between S/R recalculations.
+        fee_rate (float): Fee per side, as a fraction of the notional.
+
+    Signals are generated per symbol without the capital limit, so an entry
+    skipped for lack of margin does not free that symbol for an earlier
+    re-entry: its later signals are the unconstrained ones.
+
+    Returns:
+        dict: 'trades' (pd.DataFrame, one row per signal with 'status' closed,
+        open or skipped), 'equity' (pd.DataFrame with 'timestamp', 'equity'
+        and 'drawdown') and 'stats'.
+    """
+    from data_fetcher import load_market_data_from_csv
+
+    if config is None:
+        from live_signal_bot import load_config
+        config = load_config()
+    config = {key: config[key] for key in ('sr_price_tolerance', 'entry_proximity', 'trade_margin_usdt', 'leverage')}
+    config['tick_size'] = None
+    workers = workers or os.cpu_count() or 1
+    frames = {
+        symbol: load_market_data_from_csv(source) if isinstance(source, str) else source
+        for symbol, source in candles.items()
+    }
+
+    started = time.perf_counter()
+    if workers > 1 and len(frames) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(frames))) as pool:
+            futures = {
+                symbol: pool.submit(generate_signals, symbol, df, config, history, sr_interval)
+                for symbol, df in frames.items()
+            }
+            signals_by_symbol = {symbol: future.result() for symbol, future in futures.items()}
+    else:
+        signals_by_symbol = {
+            symbol: generate_signals(symbol, df, config, history, sr_interval) for symbol, df in frames.items()
+        }
+    signal_seconds = time.perf_counter() - started
+
+    rows, cash_flows = account(signals_by_symbol, capital, config['trade_margin_usdt'], config['leverage'], fee_rate)
+    equity = equity_curve(signals_by_symbol, rows, cash_flows, capital)
+    trades = pd.DataFrame(rows, columns=[
+        'symbol', 'entry_time', 'entry_price', 'stop_price', 'exit_time', 'exit_price', 'reason', 'size', 'pnl',
+        'status'
+    ])
+    for column in ('entry_time', 'exit_time'):
+        trades[column] = pd.to_datetime(trades[column], unit='ms')
+    closed = trades[trades['status'] == 'closed']
+    stats = {
+        'symbols': len(frames),
+        'signals': len(trades),
+        'trades': int((trades['status'] != 'skipped').sum()),
+        'skipped': int((trades['status'] == 'skipped').sum()),
+        'win_rate': float((closed['pnl'] > 0).mean()) if len(closed) else 0.0,
+        'final_equity': float(equity['equity'].iloc[-1]) if len(equity) else float(capital),
+        'return_percent': (float(equity['equity'].iloc[-1]) / capital - 1) * 100 if len(equity) else 0.0,
+        'max_drawdown_percent': float(equity['drawdown'].max()) * 100 if len(equity) else 0.0,
+        'signal_seconds': round(signal_seconds, 3),
+        'wall_seconds': round(time.perf_counter() - started, 3)
+    }
+    return {'trades': trades, 'equity': equity, 'stats': stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the LHL strategy over several symbols with shared capital")
+    parser.add_argument('csv', nargs='+', help="Candle CSV per symbol (market_data.csv layout), named SYMBOL.csv")
+    parser.add_argument('--capital', type=float, default=1000.0, help="Starting capital shared by all symbols")
+    parser.add_argument('--workers', type=int, default=None, help="Signal-generation processes (default: all cores)")
+    parser.add_argument('--sr-interval', type=int, default=1, help="Candles between S/R recalculations")
+    parser.add_argument('--fee-rate', type=float, default=DEFAULT_FEE_RATE, help="Fee per side, fraction of notional")
+    parser.add_argument('--output', default='portfolio', help="Prefix of the trades and equity CSV files")
+    args = parser.parse_args()
+
+    candles = {os.path.splitext(os.path.basename(path))[0]: path for path in args.csv}
+    result = run_portfolio_backtest(candles, capital=args.capital, workers=args.workers,
+                                    sr_interval=args.sr_interval, fee_rate=args.fee_rate)
+    result['trades'].to_csv(f"{args.output}_trades.csv", index=False)
+    result['equity'].to_csv(f"{args.output}_equity.csv", index=False)
+    for key, value in result['stats'].items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
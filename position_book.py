@@ -0,0 +1,277 @@
+# position_book.py
+"""
+Position book for many concurrent LHL entries
+- Tracks any number of open long positions per symbol, each with its own
+  stop-loss and trailing take-profit (same rules as live_signal_bot.main)
+- Stop-losses sit in a per-symbol max-heap and positions not yet in profit
+  in a min-heap on their entry price, so a tick pops exactly the positions
+  it stops out or puts in profit
+- Positions in profit that share a highest price since entry form a group
+  sorted by entry price; a tick takes profit on a contiguous range of each
+  group found by bisection, and a new high merges the groups below it
+- on_price() costs O(log n) per group plus O(log n) per position it touches,
+  instead of a pass over every open position
+"""
+
+import bisect
+import heapq
+import itertools
+import math
+
+from exit_engine import DEFAULT_TAKE_PROFIT_FRACTION
+
+STOP_LOSS = 'stop_loss'
+TAKE_PROFIT = 'take_profit'
+
+
+class _HighGroup:
+    """Positions of one symbol with the same highest price since entry, as sorted (entry_price, id) pairs"""
+
+    __slots__ = ('high', 'entries', 'parent')
+
+    def __init__(self, high, entries):
+        self.high = high
+        self.entries = entries
+        self.parent = None
+
+    def root(self):
+        # Merged groups point at the group that absorbed them (union-find with path halving)
+        group = self
+        while group.parent is not None:
+            if group.parent.parent is not None:
+                group.parent = group.parent.parent
+            group = group.parent
+        return group
+
+
+class _SymbolBook:
+    __slots__ = ('stops', 'unarmed', 'highs', 'groups', 'open_count', 'stale')
+
+    def __init__(self):
+        self.stops = []    # max-heap of (-stop_loss_price, id)
+        self.unarmed = []  # min-heap of (entry_price, id), positions never above their entry
+        self.highs = []    # group highs, ascending
+        self.groups = []   # _HighGroup per entry of `highs`
+        self.open_count = 0
+        self.stale = 0     # heap or group references to closed positions
+
+
+class PositionBook:
+    """
+    Open long positions across symbols with heap-indexed exit triggers.
+
+    Args:
+        take_profit_fraction (float): Share of the gain from the entry to the
+            highest price given back before taking profit.
+
+    Rules per tick (as in live_signal_bot.main): the highest price since entry
+    is updated first; a price at or below the stop is a stop-loss; otherwise,
+    above the entry, a price at or below
+    highest - take_profit_fraction * (highest - entry) takes profit.
+    """
+
+    def __init__(self, take_profit_fraction=DEFAULT_TAKE_PROFIT_FRACTION):
+        self.take_profit_fraction = take_profit_fraction
+        self.positions = {}
+        self._books = {}
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def open_count(self, symbol):
+        book = self._books.get(symbol)
+        return book.open_count if book else 0
+
+    def open(self, symbol, entry_price, stop_loss_price, **fields):
+        """
+        Add a position and return its id. Extra keyword fields (size, order id,
+        support level, ...) are kept on the position and returned with its exit.
+        """
+        position_id = next(self._ids)
+        entry_price = float(entry_price)
+        stop_loss_price = float(stop_loss_price)
+        book = self._books.setdefault(symbol, _SymbolBook())
+        heapq.heappush(book.unarmed, (entry_price, position_id))
+        heapq.heappush(book.stops, (-stop_loss_price, position_id))
+        book.open_count += 1
+        self.positions[position_id] = {
+            'id': position_id, 'symbol': symbol, 'entry_price': entry_price,
+            'stop_loss_price': stop_loss_price, '_group': None, **fields
+        }
+        return position_id
+
+    def close(self, position_id):
+        """Remove a position closed outside the book (e.g. manually); returns it, or None if unknown"""
+        position = self.positions.pop(position_id, None)
+        if position is None:
+            return None
+        book = self._books[position['symbol']]
+        book.open_count -= 1
+        # Both its stop and its unarmed or group entry are now stale
+        book.stale += 2
+        self._compact_if_needed(book)
+        return self._public(position)
+
+    def highest_price(self, position_id):
+        """Highest price seen since the position was opened (its entry price included)"""
+        return self._highest(self.positions[position_id])
+
+    def get(self, position_id):
+        position = self.positions.get(position_id)
+        return None if position is None else self._public(position)
+
+    def on_price(self, symbol, price):
+        """
+        Apply a price update and return the positions it closes, stop-losses
+        first, each as the position dict plus 'reason' (STOP_LOSS or
+        TAKE_PROFIT), 'exit_price' and 'highest_price'.
+        """
+        book = self._books.get(symbol)
+        if book is None or not book.open_count:
+            return []
+        price = float(price)
+        self._raise_high(book, price)
+        self._arm(book, price)
+        exits = []
+
+        while book.stops and -book.stops[0][0] >= price:
+            _, position_id = heapq.heappop(book.stops)
+            position = self.positions.pop(position_id, None)
+            if position is None:
+                book.stale -= 1
+                continue
+            # Its unarmed or group entry is left behind as a stale reference
+            book.stale += 1
+            exits.append(self._exit(position, STOP_LOSS, price))
+
+        # A group takes profit on the entries in [(price - (1 - f) * high) / f, price)
+        fraction = self.take_profit_fraction
+        emptied = False
+        for group in book.groups:
+            low_entry = (price - (1.0 - fraction) * group.high) / fraction if fraction > 0 else -math.inf
+            start = bisect.bisect_left(group.entries, (low_entry,))
+            stop = bisect.bisect_left(group.entries, (price,))
+            if start >= stop:
+                continue
+            for _, position_id in group.entries[start:stop]:
+                position = self.positions.pop(position_id, None)
+                if position is None:
+                    book.stale -= 1
+                    continue
+                # Its stop stays in the heap as a stale reference
+                book.stale += 1
+                exits.append(self._exit(position, TAKE_PROFIT, price))
+            del group.entries[start:stop]
+            emptied = emptied or not group.entries
+        if emptied:
+            self._drop_empty_groups(book)
+
+        book.open_count -= len(exits)
+        if exits:
+            self._compact_if_needed(book)
+        return exits
+
+    def watched_levels(self, symbol):
+        """
+        The next stop-loss and take-profit prices of the symbol, for the poll
+        scheduler: the highest stop and, among positions already in profit,
+        the highest take-profit trigger.
+        """
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+        levels = []
+        while book.stops and book.stops[0][1] not in self.positions:
+            heapq.heappop(book.stops)
+            book.stale -= 1
+        if book.stops:
+            levels.append(-book.stops[0][0])
+        triggers = []
+        for group in book.groups:
+            for entry_price, position_id in reversed(group.entries):
+                if position_id in self.positions:
+                    triggers.append(group.high - self.take_profit_fraction * (group.high - entry_price))
+                    break
+        if triggers:
+            levels.append(max(triggers))
+        return levels
+
+    @staticmethod
+    def _raise_high(book, price):
+        """Merge every group whose highest price is below `price` into one group at `price`"""
+        count = bisect.bisect_left(book.highs, price)
+        if not count:
+            return
+        merged = book.groups[:count]
+        # Keep the largest group's list and merge the others into it
+        target = max(merged, key=lambda group: len(group.entries))
+        others = [group for group in merged if group is not target]
+        if others:
+            target.entries.extend(itertools.chain.from_iterable(group.entries for group in others))
+            target.entries.sort()
+            for group in others:
+                group.parent = target
+                group.entries = []
+        target.high = price
+        del book.highs[:count]
+        del book.groups[:count]
+        book.highs.insert(0, price)
+        book.groups.insert(0, target)
+
+    def _arm(self, book, price):
+        """Move positions whose entry is below `price` (first time in profit) into the group at `price`"""
+        armed = []
+        while book.unarmed and book.unarmed[0][0] < price:
+            entry = heapq.heappop(book.unarmed)
+            if entry[1] in self.positions:
+                armed.append(entry)
+            else:
+                book.stale -= 1
+        if not armed:
+            return
+        if book.highs and book.highs[0] == price:
+            group = book.groups[0]
+            group.entries.extend(armed)
+            group.entries.sort()
+        else:
+            # After _raise_high every group is at or above `price`
+            group = _HighGroup(price, armed)
+            book.highs.insert(0, price)
+            book.groups.insert(0, group)
+        for _, position_id in armed:
+            self.positions[position_id]['_group'] = group
+
+    @staticmethod
+    def _drop_empty_groups(book):
+        keep = [i for i, group in enumerate(book.groups) if group.entries]
+        book.highs = [book.highs[i] for i in keep]
+        book.groups = [book.groups[i] for i in keep]
+
+    def _compact_if_needed(self, book):
+        """Rebuild the heaps and groups once references to closed positions outnumber open positions"""
+        if book.stale < 64 or book.stale <= book.open_count:
+            return
+        book.unarmed = [entry for entry in book.unarmed if entry[1] in self.positions]
+        heapq.heapify(book.unarmed)
+        for group in book.groups:
+            group.entries = [entry for entry in group.entries if entry[1] in self.positions]
+        self._drop_empty_groups(book)
+        live = itertools.chain(book.unarmed, *(group.entries for group in book.groups))
+        book.stops = [(-self.positions[position_id]['stop_loss_price'], position_id) for _, position_id in live]
+        heapq.heapify(book.stops)
+        book.stale = 0
+
+    def _exit(self, position, reason, price):
+        result = self._public(position)
+        result.update(reason=reason, exit_price=price, highest_price=self._highest(position))
+        return result
+
+    @staticmethod
+    def _highest(position):
+        group = position['_group']
+        return position['entry_price'] if group is None else group.root().high
+
+    @staticmethod
+    def _public(position):
+        return {key: value for key, value in position.items() if key != '_group'}
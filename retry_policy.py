@@ -0,0 +1,182 @@
+# retry_policy.py
+"""
+Retry policy shared by every exchange call of the LHL Trading Bot
+- Exponential backoff with jitter instead of fixed sleeps
+- Only transient errors are retried: ccxt.NetworkError and its subclasses
+  (timeouts, rate limits, maintenance), requests connection errors and
+  timeouts; exchange rejections (bad symbol, insufficient funds, ...) are
+  raised at once
+- An optional deadline bounds the total time a call may take
+- A circuit breaker per endpoint stops calling an API that keeps failing
+  and lets a single probe through after `reset_timeout` seconds
+"""
+
+import logging
+import random
+import sys
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+    def __init__(self, endpoint, retry_after):
+        super().__init__(f"Circuit for {endpoint} is open, retry in {retry_after:.1f}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def is_retryable(error):
+    """Whether `error` is transient (worth retrying) rather than a rejection"""
+    # ccxt and requests are only inspected when already imported, i.e. when they raised
+    ccxt = sys.modules.get('ccxt')
+    if ccxt is not None and isinstance(error, ccxt.BaseError):
+        return isinstance(error, ccxt.NetworkError)
+    requests = sys.modules.get('requests')
+    if requests is not None and isinstance(error, requests.exceptions.RequestException):
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def backoff_delay(attempt, base_delay, max_delay, multiplier=2.0, jitter=0.5, rng=random):
+    """
+    Delay before retry number `attempt` (0 for the first retry):
+    base_delay * multiplier ** attempt, capped at max_delay, of which a
+    random share of up to `jitter` is taken off so clients do not retry in step.
+    """
+    delay = min(max_delay, base_delay * multiplier ** attempt)
+    return delay * (1.0 - jitter * rng.random())
+
+
+class CircuitBreaker:
+    """
+    Closed while calls succeed; opens after `failure_threshold` consecutive
+    transient failures; after `reset_timeout` seconds lets one probe call
+    through (half-open), which closes it on success and re-opens it on failure.
+    """
+
+    def __init__(self, endpoint, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if self.clock() - self.opened_at >= self.reset_timeout else 'open'
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through"""
+        if self.opened_at is None:
+            return
+        waited = self.clock() - self.opened_at
+        if waited < self.reset_timeout or self._probing:
+            raise CircuitOpenError(self.endpoint, max(self.reset_timeout - waited, 0.0))
+        self._probing = True
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logging.info("Circuit for %s closed", self.endpoint)
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def end_probe(self):
+        """Let the next probe through if this one ended without a verdict (e.g. KeyboardInterrupt)"""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if not self._probing:
+                logging.warning("Circuit for %s opened after %d failures", self.endpoint, self.failures)
+            self.opened_at = self.clock()
+            self._probing = False
+
+
+class RetryPolicy:
+    """
+    Calls a function with retries, backoff and a circuit breaker per endpoint.
+
+    Args:
+        max_attempts (int): Calls per invocation, the first one included.
+        base_delay (float): Delay before the first retry (seconds).
+        max_delay (float): Upper bound of a single delay.
+        multiplier (float): Growth of the delay per retry.
+        jitter (float): Largest share of a delay taken off at random (0 to 1).
+        deadline (float): Seconds an invocation may take in total, None for no limit.
+        failure_threshold (int): Consecutive transient failures that open an endpoint's circuit.
+        reset_timeout (float): Seconds an open circuit waits before a probe call.
+        sleep, clock: time.sleep and time.monotonic by default; a replay passes its virtual clock.
+        seed (int): Seed of the jitter, for reproducible runs.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, multiplier=2.0, jitter=0.5, deadline=None,
+                 failure_threshold=5, reset_timeout=30.0, sleep=time.sleep, clock=time.monotonic, seed=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.sleep = sleep
+        self.clock = clock
+        self.breakers = {}
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_config(cls, config, **overrides):
+        """Build from the 'retry' entries of live_signal_bot.load_config()"""
+        return cls(**{**config.get('retry', {}), **overrides})
+
+    def breaker(self, endpoint):
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(
+                endpoint, self.failure_threshold, self.reset_timeout, self.clock
+            )
+        return breaker
+
+    def call(self, endpoint, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs), retrying transient errors.
+
+        Raises the last error once the attempts or the deadline are used up,
+        non-transient errors at once, and CircuitOpenError while the
+        endpoint's circuit is open.
+        """
+        breaker = self.breaker(endpoint)
+        started = self.clock()
+        attempt = 0
+        while True:
+            breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The API answered, so it is up
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                attempt += 1
+                delay = backoff_delay(attempt - 1, self.base_delay, self.max_delay, self.multiplier, self.jitter,
+                                      self._rng)
+                out_of_time = self.deadline is not None and self.clock() - started + delay > self.deadline
+                if attempt >= self.max_attempts or out_of_time or breaker.state != 'closed':
+                    raise
+                logging.warning("%s failed (attempt %d/%d): %s. Retrying in %.1fs",
+                                endpoint, attempt, self.max_attempts, e, delay)
+                self.sleep(delay)
+                continue
+            finally:
+                # A BaseException from the probe records no verdict and must not keep the circuit open forever
+                breaker.end_probe()
+            breaker.record_success()
+            return result
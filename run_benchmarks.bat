@@ -0,0 +1,20 @@
+@echo off
+echo Running benchmark suite...
+
+echo.
+echo Pass --save-baseline to record a new baseline (benchmark_baseline.json).
+echo Without it the run is compared against the baseline and fails on regressions.
+echo.
+
+python benchmarks.py %*
+
+if errorlevel 1 (
+    echo.
+    echo ERROR: Benchmark regression detected or benchmark failed. See output above.
+    pause
+    exit /b 1
+)
+
+echo.
+echo Press any key to exit...
+pause > nul
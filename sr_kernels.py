@@ -0,0 +1,141 @@
+# sr_kernels.py
+"""
+Kernels behind find_lhl_support_resistance
+- Extrema detection (same result as scipy.signal.argrelextrema, mode='clip')
+- L-H-L triple scan over the extrema
+- Price grouping of patterns and selection of each group's representative
+
+Two interchangeable backends produce identical output:
+- 'numpy': vectorized NumPy/SciPy, always available
+- 'numba': JIT-compiled loops (sr_kernels_numba.py), used when numba is installed
+Select with [SR] BACKEND = auto | numpy | numba in config.ini.
+SciPy and numba are imported on first use, not with this module.
+"""
+
+import importlib.util
+import logging
+
+import numpy as np
+
+BACKENDS = ('auto', 'numpy', 'numba')
+
+
+# --- NumPy backend ---
+
+def _extrema_masks_numpy(close, order):
+    """
+    Boolean masks of local minima / maxima, where a point is an extremum if
+    it is <= (>=) every point within `order` bars on both sides. The window is
+    truncated at the ends of the series, and a NaN anywhere in the window
+    disqualifies the point, exactly like argrelextrema with np.less_equal /
+    np.greater_equal.
+    """
+    from scipy.ndimage import minimum_filter1d, maximum_filter1d
+
+    size = 2 * order + 1
+    nan = np.isnan(close)
+    if not nan.any():
+        is_min = close <= minimum_filter1d(close, size, mode='nearest')
+        is_max = close >= maximum_filter1d(close, size, mode='nearest')
+        return is_min, is_max
+
+    # The running min/max filters do not handle NaN, mask them out explicitly
+    is_min = close <= minimum_filter1d(np.where(nan, np.inf, close), size, mode='nearest')
+    is_max = close >= maximum_filter1d(np.where(nan, -np.inf, close), size, mode='nearest')
+    near_nan = maximum_filter1d(nan.view(np.uint8), size, mode='nearest').astype(bool)
+    is_min &= ~near_nan
+    is_max &= ~near_nan
+    return is_min, is_max
+
+
+def _lhl_triples_numpy(close, is_min, is_max, tolerance_percent):
+    """
+    Scan consecutive extrema (an index that is both a minimum and a maximum
+    appears twice) for low-high-low triples whose lows are within tolerance.
+
+    Returns:
+        tuple: (idx0, idx1, idx2) candle indices of every valid triple.
+    """
+    extrema = np.sort(np.concatenate((np.flatnonzero(is_min), np.flatnonzero(is_max))))
+    if len(extrema) < 3:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    idx0, idx1, idx2 = extrema[:-2], extrema[1:-1], extrema[2:]
+    close0, close1, close2 = close[idx0], close[idx1], close[idx2]
+    valid = is_min[idx0] & is_max[idx1] & is_min[idx2]
+    valid &= (close1 > close0) & (close1 > close2)
+    valid &= np.abs(close0 - close2) <= np.maximum(close0, close2) * tolerance_percent
+    return idx0[valid], idx1[valid], idx2[valid]
+
+
+def _group_representatives_numpy(sorted_prices, sorted_distance, sorted_recency, tolerance_percent):
+    """
+    Split price-sorted patterns into groups (a new group starts when the gap
+    to the previous price exceeds previous * tolerance * 2) and pick, per
+    group, the pattern closest to the current price, most recent first.
+
+    Returns:
+        tuple: (positions of the representatives in the sorted arrays,
+        number of patterns in each group), both in ascending price order.
+    """
+    count = len(sorted_prices)
+    if count == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.ones(count, dtype=bool)
+    starts[1:] = np.abs(sorted_prices[1:] - sorted_prices[:-1]) > sorted_prices[:-1] * tolerance_percent * 2
+    group_ids = np.cumsum(starts) - 1
+    order = np.lexsort((-sorted_recency, sorted_distance, group_ids))
+    first_in_group = np.ones(count, dtype=bool)
+    first_in_group[1:] = group_ids[order][1:] != group_ids[order][:-1]
+    representatives = order[first_in_group]
+    sizes = np.diff(np.append(np.flatnonzero(starts), count))
+    return representatives, sizes
+
+
+class _Backend:
+    def __init__(self, name, extrema_masks, lhl_triples, group_representatives):
+        self.name = name
+        self.extrema_masks = extrema_masks
+        self.lhl_triples = lhl_triples
+        self.group_representatives = group_representatives
+
+
+NUMPY_BACKEND = _Backend('numpy', _extrema_masks_numpy, _lhl_triples_numpy, _group_representatives_numpy)
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+_numba_backend = None
+
+
+def _load_numba_backend():
+    """Import and wrap the numba kernels on first use (None when numba is not installed)"""
+    global _numba_backend
+    if _numba_backend is None and NUMBA_AVAILABLE:
+        import sr_kernels_numba as kernels
+        _numba_backend = _Backend('numba', kernels._extrema_masks_numba, kernels._lhl_triples_numba,
+                                  kernels._group_representatives_numba)
+    return _numba_backend
+
+
+def __getattr__(name):
+    # NUMBA_BACKEND stays importable without importing numba with this module
+    if name == 'NUMBA_BACKEND':
+        return _load_numba_backend()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_backend(name='auto'):
+    """
+    Resolve a backend name to its kernels.
+
+    'auto' picks numba when it is installed and numpy otherwise; asking for
+    'numba' without numba installed logs a warning and falls back to numpy.
+    """
+    name = (name or 'auto').strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown S/R backend '{name}', expected one of {BACKENDS}")
+    if name == 'numpy':
+        return NUMPY_BACKEND
+    if not NUMBA_AVAILABLE:
+        if name == 'numba':
+            logging.warning("S/R backend 'numba' requested but numba is not installed, using numpy")
+        return NUMPY_BACKEND
+    return _load_numba_backend()
@@ -0,0 +1,87 @@
+# sr_kernels_numba.py
+"""
+JIT-compiled numba versions of the sr_kernels NumPy kernels. Imported by
+sr_kernels.get_backend only when the numba backend is selected, so numba's
+import and compile cost is never paid by the NumPy backend.
+"""
+
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True)
+def _extrema_masks_numba(close, order):
+    n = close.shape[0]
+    is_min = np.zeros(n, dtype=np.bool_)
+    is_max = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        value = close[i]
+        lo = max(0, i - order)
+        hi = min(n - 1, i + order)
+        minimum = True
+        maximum = True
+        for j in range(lo, hi + 1):
+            other = close[j]
+            if not value <= other:
+                minimum = False
+            if not value >= other:
+                maximum = False
+            if not minimum and not maximum:
+                break
+        is_min[i] = minimum
+        is_max[i] = maximum
+    return is_min, is_max
+
+@numba.njit(cache=True)
+def _lhl_triples_numba_kernel(close, is_min, is_max, tolerance_percent):
+    n = close.shape[0]
+    extrema = np.empty(2 * n, dtype=np.int64)
+    count = 0
+    for i in range(n):
+        if is_min[i]:
+            extrema[count] = i
+            count += 1
+        if is_max[i]:
+            extrema[count] = i
+            count += 1
+    out0 = np.empty(count, dtype=np.int64)
+    out1 = np.empty(count, dtype=np.int64)
+    out2 = np.empty(count, dtype=np.int64)
+    found = 0
+    for k in range(count - 2):
+        i0 = extrema[k]
+        i1 = extrema[k + 1]
+        i2 = extrema[k + 2]
+        if not (is_min[i0] and is_max[i1] and is_min[i2]):
+            continue
+        c0 = close[i0]
+        c1 = close[i1]
+        c2 = close[i2]
+        if c1 > c0 and c1 > c2 and abs(c0 - c2) <= max(c0, c2) * tolerance_percent:
+            out0[found] = i0
+            out1[found] = i1
+            out2[found] = i2
+            found += 1
+    return out0[:found], out1[:found], out2[:found]
+
+@numba.njit(cache=True)
+def _group_representatives_numba(sorted_prices, sorted_distance, sorted_recency, tolerance_percent):
+    count = sorted_prices.shape[0]
+    representatives = np.empty(count, dtype=np.int64)
+    sizes = np.empty(count, dtype=np.int64)
+    groups = 0
+    for i in range(count):
+        if i == 0 or abs(sorted_prices[i] - sorted_prices[i - 1]) > sorted_prices[i - 1] * tolerance_percent * 2:
+            representatives[groups] = i
+            sizes[groups] = 1
+            groups += 1
+            continue
+        sizes[groups - 1] += 1
+        best = representatives[groups - 1]
+        if (sorted_distance[i] < sorted_distance[best] or
+                (sorted_distance[i] == sorted_distance[best] and sorted_recency[i] > sorted_recency[best])):
+            representatives[groups - 1] = i
+    return representatives[:groups], sizes[:groups]
+
+def _lhl_triples_numba(close, is_min, is_max, tolerance_percent):
+    return _lhl_triples_numba_kernel(close, is_min, is_max, float(tolerance_percent))
@@ -0,0 +1,133 @@
+# sr_levels.py
+"""
+Compact S/R result type for the LHL Trading Bot
+- SRLevels keeps the levels in typed NumPy arrays (struct of arrays)
+  instead of a small DataFrame, so selecting, re-tiering and looking up
+  levels costs microseconds
+- to_frame() / from_frame() convert to and from the 'Type', 'Tier',
+  'Price', 'Timestamp' (+ 'distance') DataFrame layout used for CSV export
+- pandas is only imported by the DataFrame conversions
+"""
+
+import numpy as np
+
+SUPPORT = 0
+RESISTANCE = 1
+TYPE_NAMES = ('Support', 'Resistance')
+TIER_PREFIXES = ('S', 'R')
+
+FRAME_COLUMNS = ['Type', 'Tier', 'Price', 'Timestamp']
+
+
+def _as_datetime64(timestamps):
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == 'M':
+        return timestamps.astype('datetime64[ns]')
+    import pandas as pd
+    return pd.to_datetime(timestamps).values
+
+
+class SRLevels:
+    """
+    Support/resistance levels as parallel arrays, one element per level.
+
+    Attributes:
+        type_code (np.ndarray[int8]): SUPPORT or RESISTANCE.
+        tier (np.ndarray[int16]): Tier number within its type (1 for S1/R1).
+        price (np.ndarray[float64]): Level price.
+        timestamp (np.ndarray[datetime64[ns]]): Time of the pattern that formed the level.
+        strength (np.ndarray[int32]): Number of LHL patterns merged into the level.
+        distance (np.ndarray[float64] or None): Distance to the current price, when known.
+    """
+
+    __slots__ = ('type_code', 'tier', 'price', 'timestamp', 'strength', 'distance')
+
+    def __init__(self, type_code, tier, price, timestamp, strength=None, distance=None):
+        self.type_code = np.asarray(type_code, dtype=np.int8)
+        self.tier = np.asarray(tier, dtype=np.int16)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.timestamp = _as_datetime64(timestamp)
+        if strength is None:
+            strength = np.ones(len(self.price), dtype=np.int32)
+        self.strength = np.asarray(strength, dtype=np.int32)
+        self.distance = None if distance is None else np.asarray(distance, dtype=np.float64)
+
+    @classmethod
+    def empty_levels(cls):
+        """A result without any level"""
+        return cls(np.empty(0), np.empty(0), np.empty(0), np.empty(0, dtype='datetime64[ns]'))
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build from a DataFrame in the to_frame() layout. Only 'Type' and
+        'Price' are required; non-numeric prices become NaN.
+        """
+        if df is None or df.empty:
+            return cls.empty_levels()
+        import pandas as pd
+        type_code = np.where(df['Type'].to_numpy() == TYPE_NAMES[RESISTANCE], RESISTANCE, SUPPORT)
+        price = pd.to_numeric(df['Price'], errors='coerce').to_numpy(dtype=np.float64)
+        if 'Tier' in df.columns:
+            tier = [int(str(label)[1:]) for label in df['Tier']]
+        else:
+            tier = np.zeros(len(price))
+        if 'Timestamp' in df.columns:
+            timestamp = pd.to_datetime(df['Timestamp']).values
+        else:
+            timestamp = np.full(len(price), np.datetime64('NaT', 'ns'))
+        strength = df['Strength'].to_numpy() if 'Strength' in df.columns else None
+        distance = df['distance'].to_numpy(dtype=np.float64) if 'distance' in df.columns else None
+        return cls(type_code, tier, price, timestamp, strength, distance)
+
+    def __len__(self):
+        return len(self.price)
+
+    def __repr__(self):
+        return f"SRLevels({', '.join(f'{label}={price:.4f}' for label, price in zip(self.labels(), self.price))})"
+
+    @property
+    def empty(self):
+        return len(self.price) == 0
+
+    def take(self, indices):
+        """New SRLevels with the levels at `indices` (an index array or boolean mask), in that order"""
+        return SRLevels(
+            self.type_code[indices], self.tier[indices], self.price[indices], self.timestamp[indices],
+            self.strength[indices], None if self.distance is None else self.distance[indices]
+        )
+
+    def supports(self):
+        return self.take(self.type_code == SUPPORT)
+
+    def resistances(self):
+        return self.take(self.type_code == RESISTANCE)
+
+    def labels(self):
+        """Tier labels such as 'S1' or 'R3'"""
+        return [f"{TIER_PREFIXES[code]}{tier}" for code, tier in zip(self.type_code, self.tier)]
+
+    def tier_price(self, type_code, tier=1):
+        """Price of the given tier (e.g. SUPPORT, 1 for S1), or None if it is not present"""
+        match = np.flatnonzero((self.type_code == type_code) & (self.tier == tier))
+        return float(self.price[match[0]]) if match.size else None
+
+    def to_frame(self):
+        """DataFrame with 'Type', 'Tier', 'Price', 'Timestamp' (and 'distance' when set)"""
+        import pandas as pd
+        data = {
+            'Type': [TYPE_NAMES[code] for code in self.type_code],
+            'Tier': self.labels(),
+            'Price': self.price,
+            'Timestamp': self.timestamp
+        }
+        if self.distance is not None:
+            data['distance'] = self.distance
+        return pd.DataFrame(data, columns=FRAME_COLUMNS + (['distance'] if self.distance is not None else []))
+
+
+def as_sr_levels(levels):
+    """Accept SRLevels, a DataFrame in the to_frame() layout or None"""
+    if isinstance(levels, SRLevels):
+        return levels
+    return SRLevels.from_frame(levels)
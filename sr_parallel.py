@@ -0,0 +1,127 @@
+# sr_parallel.py
+"""
+Multi-core LHL pattern scan for very long price histories
+- The close series is placed in shared memory once and split into partitions
+- Each worker process computes the extrema of its partition (with a
+  `window_size` halo on both sides) and the LHL triples inside it
+- The parent stitches the triples that span partition boundaries from the
+  first and last extrema of each partition
+
+The result is identical to sr_kernels lhl_triples over the whole series, so
+the grouping and tiering in build_sr_levels runs once on the merged patterns.
+Used by scan_lhl_patterns when [SR] WORKERS > 1.
+"""
+
+import os
+
+import numpy as np
+
+from sr_kernels import get_backend
+
+# Below this many candles per partition the process start-up outweighs the gain
+MIN_PARTITION_SIZE = 250_000
+
+# Extrema kept from each end of a partition to stitch boundary triples
+EDGE_POINTS = 2
+
+
+def _scan_partition(shm_name, length, start, stop, window_size, tolerance_percent, backend):
+    """
+    Worker: extrema and LHL triples for candles [start, stop) of the shared series.
+
+    Returns:
+        tuple: (idx0, idx1, idx2) global indices of the triples inside the
+        partition, and (edge_index, edge_min, edge_max) for its first and last
+        EDGE_POINTS extrema.
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        close = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+        halo_start = max(start - window_size, 0)
+        halo_stop = min(stop + window_size, length)
+        kernels = get_backend(backend)
+        is_min, is_max = kernels.extrema_masks(close[halo_start:halo_stop].copy(), window_size)
+        inner = slice(start - halo_start, stop - halo_start)
+        is_min, is_max = is_min[inner], is_max[inner]
+        part_close = close[start:stop].copy()
+    finally:
+        shm.close()
+
+    idx0, idx1, idx2 = kernels.lhl_triples(part_close, is_min, is_max, tolerance_percent)
+    points = np.flatnonzero(is_min | is_max)
+    if len(points) > 2 * EDGE_POINTS:
+        points = np.concatenate((points[:EDGE_POINTS], points[-EDGE_POINTS:]))
+    triples = (idx0 + start, idx1 + start, idx2 + start)
+    return triples, (points + start, is_min[points], is_max[points])
+
+
+def partition_bounds(length, partitions):
+    """Split [0, length) into `partitions` contiguous (start, stop) ranges of near-equal size"""
+    edges = np.linspace(0, length, partitions + 1).astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def lhl_triples_parallel(close, window_size, tolerance_percent, backend='auto', workers=None, partitions=None):
+    """
+    Extrema detection and LHL scan of `close` in a process pool.
+
+    Args:
+        close (np.ndarray): Close prices (float64, NaN allowed).
+        window_size (int): Extrema window on each side.
+        tolerance_percent (float): Percentage tolerance for the two lows.
+        backend (str): Kernel backend name, resolved in each worker.
+        workers (int): Worker processes; defaults to os.cpu_count().
+        partitions (int): Number of partitions; defaults to `workers`, fewer
+            when partitions would be smaller than MIN_PARTITION_SIZE.
+
+    Returns:
+        tuple: (idx0, idx1, idx2) candle indices of every valid triple, in
+        chronological order, as returned by the single-process kernels.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    length = len(close)
+    workers = workers or os.cpu_count() or 1
+    if partitions is None:
+        partitions = min(workers, max(length // MIN_PARTITION_SIZE, 1))
+    bounds = partition_bounds(length, max(int(partitions), 1))
+    if len(bounds) <= 1:
+        kernels = get_backend(backend)
+        is_min, is_max = kernels.extrema_masks(close, window_size)
+        return kernels.lhl_triples(close, is_min, is_max, tolerance_percent)
+
+    # Loaded here so importing the S/R modules does not pay for them
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=close.nbytes)
+    try:
+        np.ndarray(close.shape, dtype=np.float64, buffer=shm.buf)[:] = close
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+            futures = [
+                pool.submit(_scan_partition, shm.name, length, start, stop, window_size, tolerance_percent, backend)
+                for start, stop in bounds
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Triples spanning partitions: consecutive extrema across the edge points.
+    # A partition with few extrema contributes all of them, so edge runs are
+    # contiguous in the global extrema sequence wherever they cross a boundary.
+    edge_index = np.concatenate([edges[0] for _, edges in results])
+    edge_min = np.concatenate([edges[1] for _, edges in results])
+    edge_max = np.concatenate([edges[2] for _, edges in results])
+    kernels = get_backend(backend)
+    e0, e1, e2 = kernels.lhl_triples(close[edge_index], edge_min, edge_max, tolerance_percent)
+    starts = np.array([start for start, _ in bounds])
+    partition_of = np.searchsorted(starts, edge_index, side='right') - 1
+    spanning = partition_of[e0] != partition_of[e2]
+
+    idx0 = np.concatenate([triples[0] for triples, _ in results] + [edge_index[e0[spanning]]])
+    idx1 = np.concatenate([triples[1] for triples, _ in results] + [edge_index[e1[spanning]]])
+    idx2 = np.concatenate([triples[2] for triples, _ in results] + [edge_index[e2[spanning]]])
+    order = np.argsort(idx2, kind='stable')
+    return idx0[order].astype(np.int64), idx1[order].astype(np.int64), idx2[order].astype(np.int64)
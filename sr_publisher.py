@@ -0,0 +1,333 @@
+# sr_publisher.py
+"""
+Shared-memory candle and S/R feed for several strategy processes
+- One publisher process owns the exchange feed and the S/R computation and
+  writes the candle history plus the current levels into a
+  multiprocessing.shared_memory segment after every cycle
+- Writes are guarded by a seqlock (a version counter that is odd while a
+  write is in progress), so subscribers read without locks and retry if
+  they raced a write
+- FeedExchange lets live_signal_bot read candles and levels from the
+  segment instead of the exchange, so N strategies cost one feed and one
+  S/R computation
+
+Usage:
+    python sr_publisher.py            (publisher, segment name from [FEED] SHARED_NAME)
+    SHARED_NAME = lhl_feed under [FEED] in config.ini makes live_signal_bot a subscriber
+"""
+
+import argparse
+import logging
+import time
+from multiprocessing import shared_memory
+
+import ccxt
+import numpy as np
+
+from retry_policy import RetryPolicy
+from sr_levels import SRLevels
+
+# Header slots (int64)
+_SEQ, _CAPACITY, _MAX_LEVELS, _NUM_CANDLES, _NUM_LEVELS, _PUBLISHED_MS, _LAST_PRICE = range(7)
+_HEADER_SLOTS = 8
+# Reads retried this many times while a write is in progress
+MAX_READ_ATTEMPTS = 1000
+
+
+def _segment_size(capacity, max_levels):
+    return 8 * (_HEADER_SLOTS + 6 * capacity + 6 * max_levels)
+
+
+def _attach(name):
+    """Attach to an existing segment without letting this process's resource tracker unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: attaching registers the segment with the resource tracker
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class SharedSRFeed:
+    """
+    Fixed-layout shared-memory segment with the candle history and S/R levels.
+
+    Layout (all 8-byte values): an int64 header (version counter, capacity,
+    level slots, candle count, level count, publish time, last price), then
+    the candle arrays (open time in ms, OHLCV) and the level arrays (type,
+    tier, price, timestamp in ns, strength, distance). Use create() in the
+    publisher and attach() in subscribers.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        capacity, max_levels = int(self.header[_CAPACITY]), int(self.header[_MAX_LEVELS])
+        self.capacity, self.max_levels = capacity, max_levels
+
+        offset = 8 * _HEADER_SLOTS
+        def array(shape, dtype):
+            nonlocal offset
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            offset += view.nbytes
+            return view
+
+        self.timestamps = array((capacity,), np.int64)
+        self.ohlcv = array((5, capacity), np.float64)
+        self.level_type = array((max_levels,), np.int64)
+        self.level_tier = array((max_levels,), np.int64)
+        self.level_price = array((max_levels,), np.float64)
+        self.level_timestamp = array((max_levels,), np.int64)
+        self.level_strength = array((max_levels,), np.int64)
+        self.level_distance = array((max_levels,), np.float64)
+
+    @classmethod
+    def create(cls, name, capacity=1000, max_levels=64):
+        """Create the segment (replacing a stale one left by a crashed publisher)"""
+        size = _segment_size(capacity, max_levels)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        header[_MAX_LEVELS] = max_levels
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open a segment created by a publisher"""
+        return cls(_attach(name), owner=False)
+
+    @property
+    def version(self):
+        """Even when stable; bumped by 2 per publish"""
+        return int(self.header[_SEQ])
+
+    def publish(self, candle_buffer, levels, last_price=None):
+        """
+        Write the candle history and levels (publisher only).
+
+        Args:
+            candle_buffer (CandleBuffer): Candle history; the newest `capacity` candles are published.
+            levels (SRLevels): Current levels; at most `max_levels` are kept.
+            last_price (float): Current price, the newest close if None.
+        """
+        timestamps = candle_buffer.timestamps()[-self.capacity:]
+        n = len(timestamps)
+        columns = [candle_buffer.column(name)[-self.capacity:] for name in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        levels = levels if levels is not None else SRLevels.empty_levels()
+        count = min(len(levels), self.max_levels)
+        if last_price is None:
+            last_price = columns[3][-1] if n else np.nan
+
+        header = self.header
+        header[_SEQ] += 1  # odd: write in progress
+        self.timestamps[:n] = timestamps
+        for row, values in enumerate(columns):
+            self.ohlcv[row, :n] = values
+        self.level_type[:count] = levels.type_code[:count]
+        self.level_tier[:count] = levels.tier[:count]
+        self.level_price[:count] = levels.price[:count]
+        self.level_timestamp[:count] = levels.timestamp[:count].astype('datetime64[ns]').astype(np.int64)
+        self.level_strength[:count] = levels.strength[:count]
+        self.level_distance[:count] = levels.distance[:count] if levels.distance is not None else np.nan
+        header[_NUM_CANDLES] = n
+        header[_NUM_LEVELS] = count
+        header[_PUBLISHED_MS] = int(time.time() * 1000)
+        header[_LAST_PRICE] = np.float64(last_price).view(np.int64)
+        header[_SEQ] += 1  # even: consistent again
+
+    def read(self, limit=None):
+        """
+        Consistent copy of the published data (subscribers).
+
+        Retries while the publisher is writing; the copy is a few tens of KB
+        at most, so a read costs microseconds and never blocks the publisher.
+
+        Args:
+            limit (int): Only copy the newest `limit` candles.
+
+        Returns:
+            dict: 'version', 'published_at' (epoch seconds), 'last_price',
+            'candles' (list of [ms, open, high, low, close, volume]) and
+            'levels' (SRLevels), or None before the first publish.
+        """
+        header = self.header
+        for _ in range(MAX_READ_ATTEMPTS):
+            version = int(header[_SEQ])
+            if version & 1:
+                continue
+            n, count = int(header[_NUM_CANDLES]), int(header[_NUM_LEVELS])
+            first = max(n - limit, 0) if limit else 0
+            published_ms = int(header[_PUBLISHED_MS])
+            last_price = float(header[_LAST_PRICE:_LAST_PRICE + 1].view(np.float64)[0])
+            timestamps = self.timestamps[first:n].copy()
+            ohlcv = self.ohlcv[:, first:n].copy()
+            level_arrays = [array[:count].copy() for array in (
+                self.level_type, self.level_tier, self.level_price, self.level_timestamp,
+                self.level_strength, self.level_distance
+            )]
+            if int(header[_SEQ]) != version:
+                continue
+            if version == 0:
+                return None
+            type_code, tier, price, timestamp, strength, distance = level_arrays
+            levels = SRLevels(type_code, tier, price, timestamp.view('datetime64[ns]'), strength,
+                              None if np.isnan(distance).all() else distance)
+            candles = np.column_stack((timestamps, ohlcv.T)).tolist()
+            return {
+                'version': version,
+                'published_at': published_ms / 1000,
+                'last_price': last_price,
+                'candles': [[int(row[0])] + row[1:] for row in candles],
+                'levels': levels
+            }
+        raise ccxt.NetworkError("Shared S/R feed stayed busy, the publisher may have died mid-write")
+
+    def views(self):
+        """
+        Zero-copy views of the published arrays, plus the version they belong to.
+
+        The views change under the reader when the publisher writes: use them,
+        then check that `version` is still the returned one (retry if not).
+
+        Returns:
+            tuple: (version, dict of 'timestamps', 'ohlcv', 'level_type',
+            'level_tier', 'level_price', 'level_timestamp', 'level_strength'
+            and 'level_distance' views trimmed to the published counts).
+        """
+        version = int(self.header[_SEQ])
+        n, count = int(self.header[_NUM_CANDLES]), int(self.header[_NUM_LEVELS])
+        return version, {
+            'timestamps': self.timestamps[:n],
+            'ohlcv': self.ohlcv[:, :n],
+            'level_type': self.level_type[:count],
+            'level_tier': self.level_tier[:count],
+            'level_price': self.level_price[:count],
+            'level_timestamp': self.level_timestamp[:count],
+            'level_strength': self.level_strength[:count],
+            'level_distance': self.level_distance[:count]
+        }
+
+    def close(self):
+        """Detach; the publisher also removes the segment"""
+        self.header = self.timestamps = self.ohlcv = None
+        self.level_type = self.level_tier = self.level_price = None
+        self.level_timestamp = self.level_strength = self.level_distance = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class FeedExchange:
+    """
+    ccxt-style stand-in that serves a SharedSRFeed to live_signal_bot.main.
+
+    fetch_ohlcv reads candles from the segment, and published_levels is the
+    sr_source for main, so subscribers neither call the exchange for data
+    nor recompute S/R. A feed older than `max_age` seconds raises
+    ccxt.NetworkError, which puts the bot loop into its error backoff.
+    """
+
+    id = 'shared-feed'
+
+    def __init__(self, feed, max_age=600.0):
+        self.feed = feed
+        self.max_age = max_age
+        self._latest = None
+
+    def _read(self, limit=None):
+        data = self.feed.read(limit)
+        if data is None:
+            raise ccxt.NetworkError("Shared S/R feed has not been published yet")
+        if self.max_age and time.time() - data['published_at'] > self.max_age:
+            raise ccxt.NetworkError(f"Shared S/R feed is stale ({time.time() - data['published_at']:.0f}s old)")
+        self._latest = data
+        return data
+
+    def load_markets(self, reload=False):
+        return {}
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        if since is None:
+            return self._read(limit)['candles']
+        candles = [candle for candle in self._read()['candles'] if candle[0] >= since]
+        return candles[:limit] if limit else candles
+
+    def published_levels(self, current_price, historical_candles_df, config):
+        """sr_source for live_signal_bot.main: the levels of the latest read (re-read if none yet)"""
+        data = self._latest or self._read()
+        return data['levels']
+
+
+def run_publisher(config, name, capacity=1000, clock=time):
+    """
+    Feed loop of the publisher: fetch candles, compute S/R once and publish.
+
+    Uses the same fetch, candle buffer and S/R calls as live_signal_bot.main,
+    without any trading logic.
+    """
+    import live_signal_bot
+    from candle_buffer import CandleBuffer
+    from poll_scheduler import PollScheduler
+
+    exchange = live_signal_bot.setup_exchange(config['api_key'], config['secret_key'], config['passphrase'])
+    if not exchange:
+        raise Exception("Failed to initialize exchange")
+    history = live_signal_bot.fetch_initial_data(exchange, config['symbol'], limit=capacity)
+    if history.empty:
+        raise Exception("Failed to fetch initial historical data")
+    candle_buffer = CandleBuffer.from_frame(history, capacity=capacity)
+    scheduler = PollScheduler.from_config(config)
+    retry_policy = RetryPolicy.from_config(config, sleep=clock.sleep, clock=clock.time)
+    feed = SharedSRFeed.create(name, capacity)
+    logging.info("Publishing %s candles and S/R levels to shared memory '%s'", config['symbol'], name)
+    try:
+        while True:
+            try:
+                latest_candles = live_signal_bot.fetch_with_retry(exchange, config['symbol'], retry_policy)
+                candle_buffer.upsert_ohlcv(latest_candles)
+                current_price = float(latest_candles[-1][4])
+                levels = live_signal_bot.get_closest_sr_levels(
+                    current_price, candle_buffer.to_frame(), config, as_frame=False
+                )
+                feed.publish(candle_buffer, levels, current_price)
+                clock.sleep(scheduler.next_delay(clock.time(), current_price, levels.price.tolist(),
+                                                 config['entry_proximity']))
+            except Exception as e:
+                logging.exception("Error in publisher loop: %s", e)
+                clock.sleep(scheduler.error_delay())
+    finally:
+        feed.close()
+
+
+def main():
+    import live_signal_bot
+    from bot_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description='Publish candles and S/R levels to shared memory')
+    parser.add_argument('--name', default=None, help='Segment name (default: [FEED] SHARED_NAME or lhl_feed)')
+    parser.add_argument('--capacity', type=int, default=1000, help='Candles kept in the segment')
+    args = parser.parse_args()
+
+    setup_logging('sr_publisher.log')
+    config = live_signal_bot.load_config()
+    try:
+        run_publisher(config, args.name or config['shared_feed'] or 'lhl_feed', args.capacity)
+    except KeyboardInterrupt:
+        logging.info("Publisher shutdown requested by user...")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+# sr_registry.py
+"""
+Persistent S/R level registry with stable level ids
+- Each cycle's S/R result is matched against the registered levels (same
+  type, price within the tolerance), so a level keeps its id while its
+  price is re-estimated and its tier changes; only genuinely new levels get
+  a new id
+- Touches, last touch time, break state and volume traded at the level are
+  updated incrementally from the closed candles of the candle buffer; every
+  level remembers the last candle folded in, so new levels are backfilled
+  from their pattern time and known ones only see the new candles
+- Levels are written to a CSV file as an append-only log of changed rows and
+  compacted (rewritten atomically) on load and close
+"""
+
+import csv
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from sr_levels import SUPPORT, TYPE_NAMES
+
+ACTIVE = 0
+BROKEN = 1
+STALE = 2
+STATE_NAMES = ('active', 'broken', 'stale')
+
+NONE_MS = -1
+FILE_COLUMNS = ['id', 'symbol', 'Type', 'Price', 'state', 'first_seen', 'last_seen', 'touches', 'last_touch', 'broken_at',
+                'volume', 'strength', 'in_band', 'updated_to']
+
+# Column name -> dtype of the registry arrays
+_COLUMNS = {
+    'id': np.int64,
+    'type_code': np.int8,
+    'price': np.float64,
+    'state': np.int8,
+    'first_seen': np.int64,  # ms of the pattern that formed the level
+    'last_seen': np.int64,  # ms of the last S/R result containing it
+    'touches': np.int32,
+    'last_touch': np.int64,
+    'broken_at': np.int64,
+    'volume': np.float64,
+    'strength': np.int32,
+    'in_band': np.bool_,  # whether the last folded-in candle was inside the level's band
+    'updated_to': np.int64  # ms of the last candle folded into the statistics
+}
+
+
+def _to_ms(timestamps):
+    return np.asarray(timestamps).astype('datetime64[ms]').astype(np.int64)
+
+
+class SRRegistry:
+    """
+    Registered S/R levels of one symbol as parallel arrays.
+
+    Args:
+        tolerance (float): Relative price distance within which a new result
+            matches a registered level; also the half-width of the band that
+            counts as a touch.
+        capacity (int): Maximum number of levels kept; the stale and broken
+            levels seen longest ago are dropped first.
+        path (str): CSV file the changes are appended to, or None.
+        symbol (str): Symbol the levels belong to, recorded on every row.
+    """
+
+    def __init__(self, tolerance=0.01, capacity=500, path=None, symbol=''):
+        self.symbol = symbol
+        self.tolerance = tolerance
+        self.capacity = capacity
+        self.path = path
+        self._cols = {name: np.empty(0, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._next_id = 1
+        self._dirty = set()
+        self.added = []
+        self.stale = []
+        self.broken = []
+
+    @classmethod
+    def load(cls, path, tolerance=0.01, capacity=500, symbol=''):
+        """
+        Registry from the CSV log at `path` (the last row of each id wins),
+        compacted. Empty if the file is missing or holds another symbol's
+        levels (the file is then replaced, like a snapshot of another symbol).
+        """
+        registry = cls(tolerance, capacity, path, symbol)
+        if not path or not os.path.exists(path):
+            return registry
+        rows = {}
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                rows[int(row['id'])] = row
+        symbols = {row.get('symbol') or '' for row in rows.values()}
+        if rows and symbols != {symbol}:
+            logging.warning("S/R registry %s holds levels of %s, not %s; starting empty",
+                            path, ', '.join(sorted(symbols)), symbol)
+            rows = {}
+        if rows:
+            records = list(rows.values())
+            registry._cols = {
+                'id': np.array([int(r['id']) for r in records], dtype=np.int64),
+                'type_code': np.array([TYPE_NAMES.index(r['Type']) for r in records], dtype=np.int8),
+                'price': np.array([float(r['Price']) for r in records]),
+                'state': np.array([STATE_NAMES.index(r['state']) for r in records], dtype=np.int8),
+                **{name: np.array([int(r[name]) for r in records], dtype=np.int64)
+                   for name in ('first_seen', 'last_seen', 'last_touch', 'broken_at', 'updated_to')},
+                'touches': np.array([int(r['touches']) for r in records], dtype=np.int32),
+                'volume': np.array([float(r['volume']) for r in records]),
+                'strength': np.array([int(r['strength']) for r in records], dtype=np.int32),
+                'in_band': np.array([r['in_band'] == '1' for r in records], dtype=np.bool_)
+            }
+            registry._next_id = int(registry._cols['id'].max()) + 1
+            registry._evict()
+        registry.compact()
+        logging.info("Loaded %d S/R levels from %s", len(registry), path)
+        return registry
+
+    def __len__(self):
+        return len(self._cols['id'])
+
+    def column(self, name):
+        """Read-only view of one registry column ('id', 'price', 'touches', ...)"""
+        view = self._cols[name].view()
+        view.flags.writeable = False
+        return view
+
+    def get(self, level_id):
+        """One level as a dict, or None if the id is not registered"""
+        match = np.flatnonzero(self._cols['id'] == level_id)
+        if not match.size:
+            return None
+        return {name: values[match[0]].item() for name, values in self._cols.items()}
+
+    def observe(self, levels, now_ms):
+        """
+        Match one S/R result (SRLevels) against the registry.
+
+        Matched levels take the new price and strength and become active
+        again if they were stale (a broken level stays broken); unmatched
+        results are registered under a new id; active levels missing from
+        the result become stale. `added` and `stale` list the ids that
+        changed this way.
+
+        Returns:
+            np.ndarray[int64]: The registry id of each level of `levels`.
+        """
+        cols = self._cols
+        ids = np.empty(len(levels), dtype=np.int64)
+        claimed = np.zeros(len(self), dtype=bool)
+        new = []
+        first_seen = _to_ms(levels.timestamp)
+        for i in range(len(levels)):
+            price = levels.price[i]
+            candidates = np.flatnonzero((cols['type_code'] == levels.type_code[i]) & ~claimed)
+            if candidates.size:
+                distance = np.abs(cols['price'][candidates] - price)
+                best = candidates[np.argmin(distance)]
+                if abs(cols['price'][best] - price) <= self.tolerance * cols['price'][best]:
+                    claimed[best] = True
+                    ids[i] = cols['id'][best]
+                    if (cols['price'][best] != price or cols['strength'][best] != levels.strength[i] or
+                            cols['state'][best] == STALE):
+                        self._dirty.add(int(ids[i]))
+                    cols['price'][best] = price
+                    cols['strength'][best] = levels.strength[i]
+                    cols['last_seen'][best] = now_ms
+                    if cols['state'][best] == STALE:
+                        cols['state'][best] = ACTIVE
+                    continue
+            ids[i] = self._next_id
+            self._next_id += 1
+            new.append((ids[i], levels.type_code[i], price, first_seen[i], levels.strength[i]))
+
+        # Active levels the result no longer contains
+        gone = np.flatnonzero(~claimed & (cols['state'] == ACTIVE))
+        cols['state'][gone] = STALE
+        self.stale = cols['id'][gone].tolist()
+        self._dirty.update(self.stale)
+
+        self.added = [int(level[0]) for level in new]
+        if new:
+            level_id, type_code, price, first, strength = (np.array(values) for values in zip(*new))
+            count = len(new)
+            self._append({
+                'id': level_id, 'type_code': type_code, 'price': price, 'state': np.full(count, ACTIVE),
+                'first_seen': first, 'last_seen': np.full(count, now_ms), 'touches': np.zeros(count),
+                'last_touch': np.full(count, NONE_MS), 'broken_at': np.full(count, NONE_MS),
+                'volume': np.zeros(count), 'strength': strength, 'in_band': np.zeros(count, dtype=bool),
+                'updated_to': first
+            })
+            self._dirty.update(self.added)
+            self._evict()
+        return ids
+
+    def update(self, candle_buffer):
+        """
+        Fold the closed candles of `candle_buffer` (all but the forming last
+        one) into every level's touches, volume and break state. Each level
+        only sees the candles after its `updated_to`. Sets `broken` to the
+        ids broken by these candles.
+        """
+        self.broken = []
+        timestamps = candle_buffer.timestamps()
+        if len(timestamps) < 2 or not len(self):
+            return
+        cols = self._cols
+        last_closed = timestamps[-2]
+        pending = np.flatnonzero(cols['updated_to'] < last_closed)
+        if not pending.size:
+            return
+        live = pending[cols['state'][pending] != BROKEN]
+        cols['updated_to'][pending[cols['state'][pending] == BROKEN]] = last_closed
+        if not live.size:
+            return
+
+        # Candles after the oldest level's last update, levels as rows
+        first = int(np.searchsorted(timestamps, cols['updated_to'][live].min(), side='right'))
+        window = slice(first, len(timestamps) - 1)
+        ts = timestamps[window]
+        high, low, close, volume = (candle_buffer.column(name)[window] for name in ('High', 'Low', 'Close', 'Volume'))
+        price = cols['price'][live][:, None]
+        band = self.tolerance * price
+        valid = ts[None, :] > cols['updated_to'][live][:, None]
+        in_band = valid & (low <= price + band) & (high >= price - band)
+        is_support = (cols['type_code'][live] == SUPPORT)[:, None]
+        breaks = valid & np.where(is_support, close < price - band, close > price + band)
+
+        # Statistics stop at the breaking candle
+        has_break = breaks.any(axis=1)
+        first_break = np.where(has_break, breaks.argmax(axis=1), len(ts))
+        counted = in_band & (np.arange(len(ts))[None, :] < first_break[:, None])
+        # A touch is a candle entering the band; candles before a level's window carry its stored state
+        band_state = np.where(valid, in_band, cols['in_band'][live][:, None])
+        previous = np.concatenate((cols['in_band'][live][:, None], band_state[:, :-1]), axis=1)
+        touches = (counted & ~previous).sum(axis=1)
+        any_touch = counted.any(axis=1)
+        last_touch = ts[len(ts) - 1 - counted[:, ::-1].argmax(axis=1)]
+        added_volume = (counted * volume[None, :]).sum(axis=1)
+
+        changed = (touches > 0) | (added_volume > 0) | has_break
+        cols['touches'][live] += touches.astype(np.int32)
+        cols['last_touch'][live] = np.where(any_touch, last_touch, cols['last_touch'][live])
+        cols['volume'][live] += added_volume
+        cols['in_band'][live] = band_state[:, -1]
+        broken = live[has_break]
+        cols['state'][broken] = BROKEN
+        cols['broken_at'][broken] = ts[first_break[has_break]]
+        cols['updated_to'][live] = last_closed
+        self.broken = cols['id'][broken].tolist()
+        self._dirty.update(cols['id'][live[changed]].tolist())
+
+    def _append(self, columns):
+        for name, dtype in _COLUMNS.items():
+            self._cols[name] = np.concatenate((self._cols[name], np.asarray(columns[name], dtype=dtype)))
+
+    def _evict(self):
+        """Drop the stale / broken levels seen longest ago while over capacity"""
+        excess = len(self) - self.capacity
+        if excess <= 0:
+            return
+        candidates = np.flatnonzero(self._cols['state'] != ACTIVE)
+        dropped = candidates[np.argsort(self._cols['last_seen'][candidates], kind='stable')][:excess]
+        self._dirty.difference_update(self._cols['id'][dropped].tolist())
+        keep = np.ones(len(self), dtype=bool)
+        keep[dropped] = False
+        self._cols = {name: values[keep] for name, values in self._cols.items()}
+
+    def _rows(self, indices):
+        cols = self._cols
+        for i in indices:
+            yield [
+                int(cols['id'][i]), self.symbol, TYPE_NAMES[cols['type_code'][i]], repr(float(cols['price'][i])),
+                STATE_NAMES[cols['state'][i]], int(cols['first_seen'][i]), int(cols['last_seen'][i]),
+                int(cols['touches'][i]), int(cols['last_touch'][i]), int(cols['broken_at'][i]),
+                repr(float(cols['volume'][i])), int(cols['strength'][i]), int(cols['in_band'][i]),
+                int(cols['updated_to'][i])
+            ]
+
+    def flush(self):
+        """Append the levels changed since the last flush to the CSV log; returns the number of rows written"""
+        if not self.path or not self._dirty:
+            self._dirty.clear()
+            return 0
+        indices = np.flatnonzero(np.isin(self._cols['id'], list(self._dirty)))
+        self._dirty.clear()
+        new_file = not os.path.exists(self.path)
+        with open(self.path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(FILE_COLUMNS)
+            writer.writerows(self._rows(indices))
+        return len(indices)
+
+    def compact(self):
+        """Rewrite the CSV log with one row per registered level (temp file + os.replace)"""
+        self._dirty.clear()
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.sr-registry-', suffix='.csv', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(FILE_COLUMNS)
+                writer.writerows(self._rows(range(len(self))))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def close(self):
+        self.compact()
+
+    def to_frame(self):
+        """DataFrame of the registered levels with readable 'Type' and 'state' columns"""
+        import pandas as pd
+        df = pd.DataFrame({name: values for name, values in self._cols.items()})
+        df.insert(1, 'Type', [TYPE_NAMES[code] for code in df.pop('type_code')])
+        df['state'] = [STATE_NAMES[state] for state in df['state']]
+        return df
+
@@ -0,0 +1,186 @@
+# sr_worker.py
+"""
+S/R levels computed in a persistent worker process
+- The worker keeps its own copy of the candle history; each request only
+  carries the candles changed since the previous one (the forming candle and
+  any newly closed ones)
+- One request is in flight at a time and each waits at most `deadline`
+  seconds; a late request keeps running while the caller goes on with the
+  last good levels, and its result is picked up by a later call
+- The bot's price, stop-loss and take-profit checks therefore never wait on
+  pandas or the GIL of the S/R calculation
+- A worker that dies or hangs past `restart_after` seconds is restarted and
+  re-sent the whole history
+"""
+
+import itertools
+import logging
+import multiprocessing
+import time
+
+import numpy as np
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _default_sr_function(current_price, historical_candles_df, config):
+    from live_signal_bot import get_closest_sr_levels
+    return get_closest_sr_levels(current_price, historical_candles_df, config, as_frame=False)
+
+
+def _serve(conn, capacity, tick_size, sr_function):
+    """Worker loop: apply candle updates, answer level requests until told to stop"""
+    from candle_buffer import CandleBuffer
+
+    logging.getLogger().setLevel(logging.WARNING)
+    buffer = CandleBuffer(capacity, tick_size)
+    while True:
+        message = conn.recv()
+        kind = message[0]
+        if kind == 'stop':
+            break
+        if kind == 'load':
+            buffer.extend(message[1], message[2])
+            continue
+        # ('compute', request_id, current_price, timestamps, values, config)
+        _, request_id, current_price, timestamps, values, config = message
+        for timestamp, row in zip(timestamps, values):
+            buffer.upsert(timestamp, *row)
+        try:
+            levels = sr_function(current_price, buffer.to_frame(), config)
+            conn.send(('levels', request_id, levels, None))
+        except Exception as e:
+            conn.send(('levels', request_id, None, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class SRWorker:
+    """
+    S/R levels of one candle history from a worker process, within a deadline.
+
+    Args:
+        candle_buffer (CandleBuffer): The bot's history; read on every
+            request for the candles changed since the last one.
+        deadline (float): Seconds a request may block the caller.
+        restart_after (float): Seconds after which an unanswered request
+            counts as a hung worker, which is then restarted.
+        initial_levels: Levels to serve until the first result (e.g. from a
+            snapshot). Without them the first request waits for its result.
+        sr_function: Picklable function(current_price, candles_df, config)
+            returning the levels; get_closest_sr_levels by default.
+        clock: time.monotonic by default.
+
+    Use levels(current_price, config) wherever live_signal_bot.main takes
+    an sr_source.
+    """
+
+    def __init__(self, candle_buffer, deadline=0.5, restart_after=60.0, initial_levels=None, sr_function=None,
+                 clock=time.monotonic):
+        self.candle_buffer = candle_buffer
+        self.deadline = deadline
+        self.restart_after = restart_after
+        self.sr_function = sr_function or _default_sr_function
+        self.clock = clock
+        self.last_levels = initial_levels
+        self.late_requests = 0
+        self.restarts = 0
+        self._ids = itertools.count(1)
+        self._in_flight = None  # (request_id, sent_at)
+        self._process = None
+        self._conn = None
+        self._start()
+
+    def _start(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child, self.candle_buffer.capacity, self.candle_buffer.tick_size, self.sr_function),
+            name='sr-worker', daemon=True
+        )
+        self._process.start()
+        child.close()
+        self._conn = parent
+        self._in_flight = None
+        self._sent_until = None
+        timestamps = self.candle_buffer.timestamps()
+        if len(timestamps):
+            self._conn.send(('load', timestamps.copy(), self._values(slice(None))))
+            self._sent_until = int(timestamps[-1])
+
+    def _restart(self, reason):
+        logging.warning("Restarting the S/R worker: %s", reason)
+        self.restarts += 1
+        self._stop_process()
+        self._start()
+
+    def _values(self, window):
+        return np.column_stack([self.candle_buffer.column(name)[window] for name in OHLCV_COLUMNS])
+
+    def _changed_candles(self):
+        """Candles from the last one sent on (the forming candle is re-sent as it changes)"""
+        timestamps = self.candle_buffer.timestamps()
+        first = 0 if self._sent_until is None else int(np.searchsorted(timestamps, self._sent_until))
+        window = slice(first, len(timestamps))
+        if len(timestamps):
+            self._sent_until = int(timestamps[-1])
+        return timestamps[window].copy(), self._values(window)
+
+    def _receive(self, timeout):
+        """Collect answers for up to `timeout` seconds; True once the in-flight request is answered"""
+        while self._in_flight is not None:
+            try:
+                if not self._conn.poll(timeout):
+                    return False
+                _, request_id, levels, error = self._conn.recv()
+            except (EOFError, OSError) as e:
+                self._restart(f"connection lost ({e})")
+                return False
+            if request_id != self._in_flight[0]:
+                continue
+            self._in_flight = None
+            if error is not None:
+                logging.error("S/R worker failed: %s", error)
+            else:
+                self.last_levels = levels
+            return True
+        return False
+
+    def levels(self, current_price, config):
+        """
+        Levels for this cycle: a fresh result if the worker answers within the
+        deadline, otherwise the last good levels (the request keeps running).
+        """
+        if not self._process.is_alive():
+            self._restart(f"exited with code {self._process.exitcode}")
+        if self._in_flight is not None:
+            # The previous request was late: take its answer if it has arrived since
+            self._receive(0)
+            if self._in_flight is not None and self.clock() - self._in_flight[1] > self.restart_after:
+                self._restart(f"no answer in {self.restart_after:.0f}s")
+        if self._in_flight is None:
+            request_id = next(self._ids)
+            timestamps, values = self._changed_candles()
+            self._conn.send(('compute', request_id, float(current_price), timestamps, values, config))
+            self._in_flight = (request_id, self.clock())
+        if self.last_levels is None:
+            # Nothing to fall back on yet: wait for the first answer
+            wait = self.restart_after
+        else:
+            wait = max(self.deadline - (self.clock() - self._in_flight[1]), 0.0)
+        if not self._receive(wait):
+            self.late_requests += 1
+            logging.warning("S/R levels late (over %.2fs), using the last good levels", self.deadline)
+        return self.last_levels
+
+    def _stop_process(self):
+        try:
+            self._conn.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self._process.join(1.0)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(1.0)
+        self._conn.close()
+
+    def close(self):
+        self._stop_process()
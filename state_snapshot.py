@@ -0,0 +1,166 @@
+# state_snapshot.py
+"""
+Warm-start snapshots for the LHL Trading Bot
+- Saves strategy state, the candle buffer and the last S/R levels to one
+  .npz file, written atomically (temp file + os.replace)
+- Restores them on startup so only the candles missed while the bot was
+  down have to be fetched
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_buffer import CandleBuffer
+from sr_levels import TYPE_NAMES, as_sr_levels
+
+SNAPSHOT_VERSION = 1
+TIMEFRAME_MS = 5 * 60 * 1000
+_FROM_SNAPSHOT = object()
+
+
+def _sr_to_records(sr_levels):
+    if sr_levels is None or sr_levels.empty:
+        return []
+    sr_levels = as_sr_levels(sr_levels)
+    records = []
+    for code, label, price, timestamp in zip(sr_levels.type_code, sr_levels.labels(), sr_levels.price, sr_levels.timestamp):
+        records.append({
+            'Type': TYPE_NAMES[code],
+            'Tier': label,
+            'Price': float(price),
+            'Timestamp': pd.Timestamp(timestamp).isoformat()
+        })
+    return records
+
+
+def _sr_from_records(records, current_price=None):
+    if not records:
+        return pd.DataFrame(columns=['Type', 'Tier', 'Price', 'Timestamp', 'distance'])
+    sr_df = pd.DataFrame(records)
+    sr_df['Timestamp'] = pd.to_datetime(sr_df['Timestamp'])
+    if current_price is not None:
+        sr_df['distance'] = (sr_df['Price'] - current_price).abs()
+    return sr_df
+
+
+def save_snapshot(path, symbol, strategy_state, candle_buffer, sr_levels=None, variant_states=None):
+    """
+    Atomically write a snapshot of the bot to `path`, with the position
+    states of the strategy variants (strategy_variants.py) if any.
+
+    The data is written to a temporary file in the same directory, fsynced and
+    then renamed over the old snapshot, so a crash mid-write never leaves a
+    truncated file behind.
+    """
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'symbol': symbol,
+        'saved_at': time.time(),
+        'capacity': candle_buffer.capacity,
+        'tick_size': candle_buffer.tick_size,
+        'strategy_state': strategy_state,
+        'variant_states': variant_states or {},
+        'sr_levels': _sr_to_records(sr_levels)
+    }
+    values = np.vstack([candle_buffer.column(name) for name in ['Open', 'High', 'Low', 'Close', 'Volume']]).T
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', suffix='.npz', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                timestamps=candle_buffer.timestamps(),
+                values=values
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_snapshot(path):
+    """
+    Read a snapshot written by save_snapshot.
+
+    Returns:
+        dict: 'symbol', 'saved_at', 'strategy_state', 'variant_states',
+        'sr_levels' (records), 'capacity', 'timestamps' and 'values', or None
+        if the file is missing or unreadable.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != SNAPSHOT_VERSION:
+                logging.warning("Ignoring snapshot %s with unsupported version %s", path, meta.get('version'))
+                return None
+            meta['timestamps'] = data['timestamps'].copy()
+            meta['values'] = data['values'].copy()
+        return meta
+    except Exception as e:
+        logging.warning("Could not read snapshot %s: %s", path, e)
+        return None
+
+
+def restore_candle_buffer(snapshot, capacity=None, tick_size=_FROM_SNAPSHOT):
+    """
+    Rebuild a CandleBuffer from a loaded snapshot. `tick_size` is taken as
+    given (None for float prices); only when it is omitted does the buffer
+    keep the snapshot's tick size.
+    """
+    if tick_size is _FROM_SNAPSHOT:
+        tick_size = snapshot.get('tick_size')
+    buffer = CandleBuffer(capacity or snapshot['capacity'], tick_size=tick_size)
+    if len(snapshot['timestamps']):
+        buffer.extend(snapshot['timestamps'], snapshot['values'])
+    return buffer
+
+
+def restore_sr_levels(snapshot, current_price=None, as_frame=True):
+    """S/R levels saved in the snapshot, in the get_closest_sr_levels layout (SRLevels with as_frame=False)"""
+    sr_df = _sr_from_records(snapshot.get('sr_levels'), current_price)
+    return sr_df if as_frame else as_sr_levels(sr_df)
+
+
+def fetch_missed_candles(exchange, symbol, candle_buffer, timeframe='5m', timeframe_ms=TIMEFRAME_MS, page_limit=1000,
+                         now_ms=None):
+    """
+    Fetch the candles published since the newest buffered one and upsert them.
+    `now_ms` is the caller's current time in epoch ms (wall clock if None),
+    used to size the gap.
+
+    Returns:
+        bool: False if the gap is larger than the buffer (caller should do a
+        full refetch), True otherwise.
+    """
+    since = candle_buffer.last_timestamp
+    if since is None:
+        return False
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    if (now_ms - since) // timeframe_ms >= candle_buffer.capacity:
+        return False
+
+    while True:
+        candles = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=page_limit)
+        if not candles:
+            break
+        candle_buffer.upsert_ohlcv(candles)
+        newest = int(candles[-1][0])
+        if newest <= since or len(candles) < page_limit:
+            break
+        since = newest
+    return True
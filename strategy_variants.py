@@ -0,0 +1,174 @@
+# strategy_variants.py
+"""
+Strategy variants evaluated on the bot's shared candle feed and S/R levels
+- Each [VARIANT.<name>] section of config.ini overrides the entry
+  proximity, take-profit fraction, stop-loss loss target, margin or leverage
+  of the main strategy
+- live_signal_bot.main fetches candles and computes S/R once per cycle and
+  hands the price and levels to every variant, so an extra variant only
+  costs its entry / exit checks
+- Every variant keeps its own position state and realized P&L (paper
+  trades, journaled with its name) and is saved in the state snapshot
+"""
+
+import logging
+
+from exit_engine import DEFAULT_TAKE_PROFIT_FRACTION
+
+VARIANT_SECTION_PREFIX = 'VARIANT.'
+DEFAULT_STOP_LOSS_USDT = 1.5
+
+
+def load_variants(parser, defaults):
+    """
+    Variants from the [VARIANT.<name>] sections of a ConfigParser.
+
+    Args:
+        parser (configparser.ConfigParser): The parsed config.ini.
+        defaults (dict): 'trade_margin_usdt' and 'leverage' of the main
+            strategy (the load_config() result), used for keys a variant omits.
+
+    Returns:
+        list: One dict per variant: 'name', 'entry_proximity' (None to follow
+        the main strategy's, ATR-scaled or not), 'take_profit_fraction',
+        'stop_loss_usdt', 'trade_margin_usdt' and 'leverage'.
+    """
+    variants = []
+    for section in parser.sections():
+        if not section.startswith(VARIANT_SECTION_PREFIX):
+            continue
+        name = section[len(VARIANT_SECTION_PREFIX):].strip()
+        if not name:
+            raise ValueError(f"Variant section [{section}] has no name")
+        entry_proximity = parser.get(section, 'ENTRY_PROXIMITY_PERCENT', fallback='')
+        variants.append({
+            'name': name,
+            'entry_proximity': float(entry_proximity) if entry_proximity else None,
+            'take_profit_fraction': float(
+                parser.get(section, 'TAKE_PROFIT_FRACTION', fallback=str(DEFAULT_TAKE_PROFIT_FRACTION))
+            ),
+            'stop_loss_usdt': float(parser.get(section, 'STOP_LOSS_USDT', fallback=str(DEFAULT_STOP_LOSS_USDT))),
+            'trade_margin_usdt': float(
+                parser.get(section, 'TRADE_MARGIN_USDT', fallback=str(defaults['trade_margin_usdt']))
+            ),
+            'leverage': int(parser.get(section, 'LEVERAGE', fallback=str(defaults['leverage'])))
+        })
+    return variants
+
+
+def new_variant_state():
+    """Flat position state of one variant plus its running P&L"""
+    return {
+        'in_position': False,
+        'entry_price': None,
+        'highest_price_since_entry': None,
+        'stop_loss_price': None,
+        'size': None,
+        'realized_pnl': 0.0,
+        'trades': 0,
+        'wins': 0
+    }
+
+
+class VariantRunner:
+    """
+    Position state and P&L of every variant of one symbol.
+
+    Args:
+        variants (list): Variant dicts from load_variants().
+        symbol (str): Traded symbol, for the journal.
+        journal: EventJournal (or any object with record(event, **fields)).
+        states (dict): Variant states from a snapshot, by name.
+    """
+
+    def __init__(self, variants, symbol, journal, states=None):
+        self.variants = variants
+        self.symbol = symbol
+        self.journal = journal
+        states = states or {}
+        self.states = {}
+        for variant in variants:
+            self.states[variant['name']] = {**new_variant_state(), **states.get(variant['name'], {})}
+
+    def __len__(self):
+        return len(self.variants)
+
+    def on_price(self, current_price, sr_levels, entry_proximity):
+        """
+        Apply one polled price to every variant, with the cycle's S/R levels
+        and the main strategy's entry proximity as the default. Returns True
+        if any variant entered or exited.
+        """
+        # Imported here: live_signal_bot imports this module
+        from live_signal_bot import is_developing_lhl, calculate_stop_loss_price, take_profit_trigger
+
+        changed = False
+        for variant in self.variants:
+            name = variant['name']
+            state = self.states[name]
+            if not state['in_position']:
+                proximity = variant['entry_proximity'] if variant['entry_proximity'] is not None else entry_proximity
+                has_pattern, support_price = is_developing_lhl(current_price, sr_levels, proximity)
+                if not has_pattern:
+                    continue
+                state.update(
+                    in_position=True, entry_price=current_price, highest_price_since_entry=current_price,
+                    size=variant['trade_margin_usdt'] * variant['leverage'] / current_price,
+                    stop_loss_price=calculate_stop_loss_price(
+                        current_price, variant['trade_margin_usdt'], variant['leverage'], variant['stop_loss_usdt']
+                    )
+                )
+                logging.info("[%s] ENTRY SIGNAL: Price=%s, Support=%s, Stop Loss=%s",
+                             name, current_price, support_price, state['stop_loss_price'])
+                self.journal.record('signal', symbol=self.symbol, variant=name, side='long', price=current_price,
+                                    support=support_price, stop_loss=state['stop_loss_price'])
+                self.journal.record('trade', symbol=self.symbol, variant=name, action='entry', price=current_price)
+                changed = True
+                continue
+
+            entry_price = state['entry_price']
+            state['highest_price_since_entry'] = highest = max(state['highest_price_since_entry'], current_price)
+            if current_price <= state['stop_loss_price']:
+                action = 'stop_loss'
+            elif entry_price < current_price <= take_profit_trigger(entry_price, highest,
+                                                                    variant['take_profit_fraction']):
+                action = 'take_profit'
+            else:
+                continue
+            pnl = state['size'] * (current_price - entry_price)
+            logging.info("[%s] %s: Entry=%s, Exit=%s, P&L=%.4f",
+                         name, action.upper().replace('_', ' '), entry_price, current_price, pnl)
+            self.journal.record('trade', symbol=self.symbol, variant=name, action=action, entry=entry_price,
+                                price=current_price, highest=highest, pnl=pnl)
+            state.update(
+                in_position=False, entry_price=None, highest_price_since_entry=None, stop_loss_price=None, size=None,
+                realized_pnl=state['realized_pnl'] + pnl, trades=state['trades'] + 1, wins=state['wins'] + (pnl > 0)
+            )
+            changed = True
+        return changed
+
+    def watched_levels(self):
+        """Stop-loss and take-profit triggers of the variants in a position, for the poll scheduler"""
+        from live_signal_bot import take_profit_trigger
+
+        levels = []
+        for variant in self.variants:
+            state = self.states[variant['name']]
+            if not state['in_position']:
+                continue
+            levels.append(state['stop_loss_price'])
+            if state['highest_price_since_entry'] > state['entry_price']:
+                levels.append(take_profit_trigger(
+                    state['entry_price'], state['highest_price_since_entry'], variant['take_profit_fraction']
+                ))
+        return levels
+
+    def summary(self):
+        """Per variant: 'in_position', 'realized_pnl', 'trades' and 'win_rate'"""
+        return {
+            name: {
+                'in_position': state['in_position'], 'realized_pnl': state['realized_pnl'], 'trades': state['trades'],
+                'win_rate': state['wins'] / state['trades'] if state['trades'] else 0.0
+            }
+            for name, state in self.states.items()
+        }
@@ -1,38 +1,186 @@
-import pandas as pd
-from scipy.signal import argrelextrema
-import numpy as np
-import configparser
+# Only NumPy and the small S/R modules are imported here; pandas, the
+# config file and data_fetcher load on first use, so importing this module
+# in notebooks or pool workers stays fast and side-effect free.
 import os
 import logging
 
-# Attempt to import data_fetcher; will be used for loading CSV
-# This might require ensuring data_fetcher.py is in PYTHONPATH or same directory
-try:
-    import data_fetcher
-except ImportError:
-    print("Error: data_fetcher.py not found. Ensure it's in the same directory or PYTHONPATH.")
-    data_fetcher = None
-
-# --- Load Configuration ---
-config = configparser.ConfigParser()
-config_file_path = 'config.ini'
-if os.path.exists(config_file_path):
-    config.read(config_file_path)
-else:
-    print(f"Error: Configuration file '{config_file_path}' not found. Please create one.")
-    # Exit or use sensible defaults if config is critical
-    exit()
-
-# Get paths and parameters from config, with fallbacks
-# Correctly reading from [TRADING] and [DATA] sections as per your config.ini
-INPUT_CSV_PATH = config.get('TRADING', 'HISTORICAL_DATA_CSV', fallback='market_data.csv')
-SR_LEVELS_OUTPUT_CSV_PATH = config.get('DATA', 'SR_LEVELS_OUTPUT_CSV', fallback='sr_levels.csv')
-
-# New parameter for LHL pattern tolerance
-SR_PRICE_TOLERANCE_PERCENT = float(config.get('TRADING', 'SR_PRICE_TOLERANCE_PERCENT', fallback='0.005'))
-
-
-def find_lhl_support_resistance(data_df, tolerance_percent=0.01, window_size=5, sr_count=10):
+import numpy as np
+
+from bot_config import get_setting, config_exists
+from sr_kernels import get_backend
+from sr_parallel import lhl_triples_parallel
+from sr_levels import SRLevels, SUPPORT, RESISTANCE
+from price_ticks import PriceTicks
+
+
+def _sr_backend():
+    """Kernel backend for the S/R calculation: auto (numba if installed), numpy or numba"""
+    return get_setting('SR', 'BACKEND', fallback='auto')
+
+
+def _sr_workers():
+    """Worker processes for the extrema and LHL scan (1 runs in-process)"""
+    return int(get_setting('SR', 'WORKERS', fallback='1'))
+
+
+def _empty_frame():
+    import pandas as pd
+    return pd.DataFrame()
+
+
+def scan_lhl_patterns(close, timestamps, tolerance_percent=0.01, window_size=5, backend=None, tick_size=None,
+                      workers=None):
+    """
+    Stage 1 of the S/R calculation: find every LHL pattern in a price series.
+
+    With `tick_size`, prices are rounded to integer tick counts first and the
+    extrema, tolerance and grouping math runs on exact tick counts; the
+    pattern prices are then in ticks (supports may be half ticks).
+
+    Args:
+        close (np.ndarray): Close prices.
+        timestamps (np.ndarray): Candle timestamps aligned with close.
+        tolerance_percent (float): Percentage tolerance for the two lows.
+        window_size (int): Extrema window on each side (argrelextrema 'order').
+        backend (str): 'auto', 'numpy' or 'numba'; defaults to [SR] BACKEND.
+        tick_size (float): Market price tick, or None for float prices.
+        workers (int): Processes for the scan (see sr_parallel.py); defaults
+            to [SR] WORKERS. Short series always run in-process.
+
+    Returns:
+        dict: Arrays 'support_price', 'resistance_price', 'timestamp' and
+        'recency_index' (candle index of the second low), one entry per
+        pattern in chronological order, plus 'tick_size'.
+    """
+    if window_size < 1:
+        raise ValueError("window_size must be an integer >= 1")
+    kernels = get_backend(backend or _sr_backend())
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if tick_size:
+        # Integer-valued float64 keeps NaN gaps and is exact up to 2**53 ticks
+        close = PriceTicks(tick_size).ticks_float(close)
+    workers = _sr_workers() if workers is None else workers
+    if workers > 1:
+        idx0, idx1, idx2 = lhl_triples_parallel(close, int(window_size), tolerance_percent, kernels.name, workers)
+    else:
+        is_min, is_max = kernels.extrema_masks(close, int(window_size))
+        idx0, idx1, idx2 = kernels.lhl_triples(close, is_min, is_max, tolerance_percent)
+    return {
+        'support_price': (close[idx0] + close[idx2]) / 2,
+        'resistance_price': close[idx1],
+        'timestamp': np.asarray(timestamps)[idx2],
+        'recency_index': idx2,
+        'tick_size': tick_size
+    }
+
+
+def build_sr_levels(patterns, current_price, num_candles, tolerance_percent=0.01, sr_count=10, backend=None):
+    """
+    Stage 2 of the S/R calculation: pick S1/R1 and the tiered levels from the
+    patterns found by scan_lhl_patterns.
+
+    Returns:
+        SRLevels: Supports first (S1, S2, ...), then resistances (R1, ...);
+        empty when there are no patterns.
+    """
+    support = patterns['support_price']
+    resistance = patterns['resistance_price']
+    timestamps = patterns['timestamp']
+    recency = patterns['recency_index']
+    if len(support) == 0:
+        return SRLevels.empty_levels()
+
+    kernels = get_backend(backend or _sr_backend())
+    price_ticks = PriceTicks(patterns['tick_size']) if patterns.get('tick_size') else None
+    to_price = price_ticks.from_ticks if price_ticks else float
+    if price_ticks:
+        current_price = price_ticks.ticks_float(current_price)
+    distance = np.abs(support - current_price)
+
+    # Group patterns by proximity to merge similar levels
+    def group_patterns_by_price(indices):
+        order = indices[np.argsort(support[indices], kind='stable')]
+        representatives, sizes = kernels.group_representatives(
+            support[order], distance[order], recency[order], tolerance_percent
+        )
+        return order[representatives], sizes
+
+    all_patterns = np.arange(len(support))
+    # First look for patterns close to current price
+    close_patterns = all_patterns[np.abs(support - current_price) <= current_price * tolerance_percent * 3]
+    # Then look for recent patterns
+    recent_patterns = all_patterns[recency >= num_candles - 50]
+    candidates = all_patterns
+
+    # Choose the most relevant pattern for S1
+    if close_patterns.size:
+        grouped, sizes = group_patterns_by_price(close_patterns)
+        s1_group = np.argmin(distance[grouped])
+        s1_pattern = grouped[s1_group]
+        logging.info("Using nearby pattern as S1: Support=%.4f", to_price(support[s1_pattern]))
+    elif recent_patterns.size:
+        grouped, sizes = group_patterns_by_price(recent_patterns)
+        s1_group = np.argmax(recency[grouped])
+        s1_pattern = grouped[s1_group]
+        logging.info("Using recent pattern as S1: Support=%.4f", to_price(support[s1_pattern]))
+    else:
+        candidates, sizes = group_patterns_by_price(all_patterns)
+        s1_group = np.argmax(recency[candidates])
+        s1_pattern = candidates[s1_group]
+        logging.info("Using historical pattern as S1: Support=%.4f", to_price(support[s1_pattern]))
+
+    s1_price = support[s1_pattern]
+    r1_price = resistance[s1_pattern]
+    s1_timestamp = timestamps[s1_pattern]
+    s1_strength = sizes[s1_group]
+
+    # Group remaining patterns
+    remaining = candidates[np.abs(support[candidates] - s1_price) > s1_price * tolerance_percent * 2]
+    grouped, counts = group_patterns_by_price(remaining)
+
+    # Only include supports below S1 and resistances above R1 (and S1)
+    is_support = support[grouped] < s1_price
+    is_resistance = (resistance[grouped] > r1_price) & (resistance[grouped] > s1_price)
+    supports, support_counts = grouped[is_support], counts[is_support]
+    resistances, resistance_counts = grouped[is_resistance], counts[is_resistance]
+
+    # Sort by price and strength (pattern count)
+    support_order = np.lexsort((-support[supports], -support_counts))
+    resistance_order = np.lexsort((-resistance_counts, resistance[resistances]))
+    supports, support_counts = supports[support_order][:sr_count - 1], support_counts[support_order][:sr_count - 1]
+    resistances = resistances[resistance_order][:sr_count - 1]
+    resistance_counts = resistance_counts[resistance_order][:sr_count - 1]
+
+    for i, (pattern, count) in enumerate(zip(supports, support_counts), start=2):
+        logging.debug("Adding S%d: Support=%.4f (Count: %d)", i, to_price(support[pattern]), count)
+    for i, (pattern, count) in enumerate(zip(resistances, resistance_counts), start=2):
+        logging.debug("Adding R%d: Resistance=%.4f (Count: %d)", i, to_price(resistance[pattern]), count)
+
+    num_supports = 1 + len(supports)
+    num_resistances = 1 + len(resistances)
+    prices = np.concatenate(([s1_price], support[supports], [r1_price], resistance[resistances]))
+    levels = SRLevels(
+        type_code=np.repeat([SUPPORT, RESISTANCE], [num_supports, num_resistances]),
+        tier=np.concatenate((np.arange(1, num_supports + 1), np.arange(1, num_resistances + 1))),
+        price=price_ticks.from_ticks(prices) if price_ticks else prices,
+        timestamp=np.concatenate(([s1_timestamp], timestamps[supports], [s1_timestamp], timestamps[resistances])),
+        strength=np.concatenate(([s1_strength], support_counts, [s1_strength], resistance_counts))
+    )
+
+    logging.info("Final S/R levels: %d levels identified", len(levels))
+    return levels
+
+
+def filter_patterns(patterns, swing_filter):
+    """Keep the patterns whose second low falls on a candle where `swing_filter` (bool per candle) is True"""
+    keep = np.asarray(swing_filter, dtype=bool)[patterns['recency_index']]
+    filtered = {key: value[keep] for key, value in patterns.items() if key != 'tick_size'}
+    filtered['tick_size'] = patterns['tick_size']
+    return filtered
+
+
+def find_lhl_support_resistance(data_df, tolerance_percent=0.01, window_size=5, sr_count=10, backend=None,
+                                as_frame=True, tick_size=None, workers=None, swing_filter=None):
     """
     Identifies LHL (Low-High-Low) patterns for support and Resistance based on Close prices.
     Support is formed by two lows at similar price levels, with the peak between them forming resistance.
@@ -49,207 +197,220 @@ def find_lhl_support_resistance(data_df, tolerance_percent=0.01, window_size=5,
         tolerance_percent (float): Percentage tolerance for determining if two lows are at 'same' price.
         window_size (int): The 'order' parameter for scipy.signal.argrelextrema.
         sr_count (int): The maximum number of top support and resistance levels to return.
+        backend (str): Kernel backend ('auto', 'numpy' or 'numba'), see sr_kernels.py.
+        as_frame (bool): Return a DataFrame (default) or the lighter SRLevels arrays.
+        tick_size (float): Market price tick; when set, the level math runs on
+            integer tick counts (see price_ticks.py).
+        workers (int): Processes for the pattern scan on long histories
+            (see sr_parallel.py); defaults to [SR] WORKERS.
+        swing_filter (np.ndarray): Optional bool per candle; patterns whose
+            second low is on a False candle are dropped (e.g. low-volume swings,
+            see IndicatorPipeline.swing_mask).
 
     Returns:
         pd.DataFrame: DataFrame containing identified Support and Resistance levels with 'Type', 'Tier', 'Price', 'Timestamp'.
+        With as_frame=False, an SRLevels instance with the same levels.
     """
     if data_df.empty or 'Close' not in data_df.columns or 'timestamp' not in data_df.columns:
         print("DataFrame is empty or required columns ('Close', 'timestamp') are missing.")
-        return pd.DataFrame()
+        return _empty_frame() if as_frame else SRLevels.empty_levels()
 
     logging.debug("Starting S/R level calculation...")
 
-    # Find local minima and maxima
-    minima_indices = argrelextrema(data_df['Close'].values, np.less_equal, order=window_size)[0]
-    maxima_indices = argrelextrema(data_df['Close'].values, np.greater_equal, order=window_size)[0]
-    current_price = data_df['Close'].iloc[-1]
-
-    all_extrema = sorted(np.concatenate((minima_indices, maxima_indices)))
-    found_patterns = []
-
-    # Iterate through all extrema to find LHL patterns
-    for i in range(len(all_extrema) - 2):
-        idx0 = all_extrema[i]
-        idx1 = all_extrema[i+1]
-        idx2 = all_extrema[i+2]
-
-        is_l0 = idx0 in minima_indices
-        is_h1 = idx1 in maxima_indices
-        is_l2 = idx2 in minima_indices
-
-        if is_l0 and is_h1 and is_l2:
-            close0 = data_df['Close'].iloc[idx0]
-            close1 = data_df['Close'].iloc[idx1]
-            close2 = data_df['Close'].iloc[idx2]
-            timestamp = data_df['timestamp'].iloc[idx2]
-
-            if close1 > close0 and close1 > close2:
-                max_allowed_diff = max(close0, close2) * tolerance_percent
-                if abs(close0 - close2) <= max_allowed_diff:
-                    avg_low_price = (close0 + close2) / 2
-                    found_patterns.append({
-                        'support_price': avg_low_price,
-                        'resistance_price': close1,
-                        'timestamp': timestamp,
-                        'recency_index': idx2,
-                        'distance': abs(avg_low_price - current_price)
-                    })
-
-    if not found_patterns:
-        return pd.DataFrame()
+    close = data_df['Close'].to_numpy(dtype=np.float64)
+    patterns = scan_lhl_patterns(close, data_df['timestamp'].to_numpy(), tolerance_percent, window_size, backend,
+                                 tick_size, workers)
+    if swing_filter is not None:
+        patterns = filter_patterns(patterns, swing_filter)
+    levels = build_sr_levels(patterns, close[-1], len(close), tolerance_percent, sr_count, backend)
+    if not as_frame:
+        return levels
+    return levels.to_frame() if not levels.empty else _empty_frame()
+
+
+def _concat_patterns(parts, tick_size=None):
+    keys = ['support_price', 'resistance_price', 'timestamp', 'recency_index']
+    if not parts:
+        patterns = {key: np.empty(0) for key in keys}
+        patterns['recency_index'] = np.empty(0, dtype=np.int64)
+    else:
+        patterns = {key: np.concatenate([part[key] for part in parts]) for key in keys}
+    patterns['tick_size'] = tick_size
+    return patterns
 
-    # Group patterns by proximity to merge similar levels
-    def group_patterns_by_price(patterns, ref_price_key='support_price'):
-        if not patterns:
-            return []
-            
-        patterns = sorted(patterns, key=lambda x: x[ref_price_key])
-        groups = []
-        current_group = [patterns[0]]
-        
-        for pattern in patterns[1:]:
-            last_pattern = current_group[-1]
-            price_diff = abs(pattern[ref_price_key] - last_pattern[ref_price_key])
-            price_tolerance = last_pattern[ref_price_key] * tolerance_percent * 2
-            
-            if price_diff <= price_tolerance:
-                current_group.append(pattern)
-            else:
-                # When starting a new group, select the most relevant pattern from current group
-                merged = select_representative_pattern(current_group)
-                groups.append(merged)
-                current_group = [pattern]
-        
-        # Don't forget the last group
-        if current_group:
-            merged = select_representative_pattern(current_group)
-            groups.append(merged)
-        
-        return groups
 
-    def select_representative_pattern(patterns):
-        if not patterns:
-            return None
-        
-        # Sort by distance to current price, then by recency
-        patterns.sort(key=lambda x: (x['distance'], -x['recency_index']))
-        
-        # Take the most relevant pattern's price but keep track of all timestamps
-        selected = patterns[0].copy()
-        selected['all_timestamps'] = [p['timestamp'] for p in patterns]
-        selected['pattern_count'] = len(patterns)
-        
-        return selected
+def scan_lhl_patterns_chunked(chunks, tolerance_percent=0.01, window_size=5, backend=None, tick_size=None):
+    """
+    Streaming version of scan_lhl_patterns for histories that do not fit in memory.
 
-    # First look for patterns close to current price
-    close_patterns = [p for p in found_patterns 
-                     if abs(p['support_price'] - current_price) <= current_price * tolerance_percent * 3]
-    
-    # Then look for recent patterns
-    recent_patterns = [p for p in found_patterns if p['recency_index'] >= len(data_df) - 50]
+    Each chunk is classified together with a halo of the `window_size`
+    candles before it, and its last `window_size` candles are only classified
+    once the next chunk (or the end of the data) is known, so extrema at chunk
+    edges see the same window as in a single pass. The last two extrema are
+    carried over to find L-H-L triples that span chunks. Memory is bounded by
+    the chunk size plus the patterns found.
 
-    # Choose the most relevant pattern for S1
-    if close_patterns:
-        close_patterns = group_patterns_by_price(close_patterns)
-        close_patterns.sort(key=lambda x: x['distance'])
-        most_recent_pattern = close_patterns[0]
-        logging.info(f"Using nearby pattern as S1: Support={most_recent_pattern['support_price']:.4f}")
-    elif recent_patterns:
-        recent_patterns = group_patterns_by_price(recent_patterns)
-        recent_patterns.sort(key=lambda x: x['recency_index'], reverse=True)
-        most_recent_pattern = recent_patterns[0]
-        logging.info(f"Using recent pattern as S1: Support={most_recent_pattern['support_price']:.4f}")
-    else:
-        found_patterns = group_patterns_by_price(found_patterns)
-        found_patterns.sort(key=lambda x: x['recency_index'], reverse=True)
-        most_recent_pattern = found_patterns[0]
-        logging.info(f"Using historical pattern as S1: Support={most_recent_pattern['support_price']:.4f}")
+    Args:
+        chunks (iterable): DataFrames with 'Close' and 'timestamp' columns, in
+            chronological order (e.g. data_fetcher.iter_market_data_csv).
+        tolerance_percent, window_size, backend, tick_size: As for scan_lhl_patterns.
+
+    Returns:
+        tuple: (patterns, last_close, num_candles), where patterns is the
+        scan_lhl_patterns dict for the whole history (recency_index is global).
+    """
+    if window_size < 1:
+        raise ValueError("window_size must be an integer >= 1")
+    window_size = int(window_size)
+    kernels = get_backend(backend or _sr_backend())
+    price_ticks = PriceTicks(tick_size) if tick_size else None
+
+    # Candles [buffer_start, total) kept from previous chunks: the halo plus the undecided tail
+    buffer_close = np.empty(0)
+    buffer_timestamps = None
+    buffer_start = 0
+    decided = 0
+    total = 0
+    # Last extrema points already classified: global index, close, is_min, is_max
+    carried = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=bool), np.empty(0, dtype=bool))
+    parts = []
+    last_close = None
+
+    def classify(close, timestamps, end):
+        """Classify buffered candles [decided, end) and collect the triples ending among them"""
+        nonlocal carried
+        is_min, is_max = kernels.extrema_masks(close, window_size)
+        segment = slice(decided - buffer_start, end - buffer_start)
+        carried_index, carried_close, carried_min, carried_max = carried
+        local_close = np.concatenate((carried_close, close[segment]))
+        local_min = np.concatenate((carried_min, is_min[segment]))
+        local_max = np.concatenate((carried_max, is_max[segment]))
+        global_index = np.concatenate((carried_index, np.arange(decided, end)))
+
+        idx0, idx1, idx2 = kernels.lhl_triples(local_close, local_min, local_max, tolerance_percent)
+        # Triples ending on a carried point were found with the previous chunk
+        new = idx2 >= len(carried_index)
+        idx0, idx1, idx2 = idx0[new], idx1[new], idx2[new]
+        if len(idx2):
+            parts.append({
+                'support_price': (local_close[idx0] + local_close[idx2]) / 2,
+                'resistance_price': local_close[idx1],
+                'timestamp': timestamps[idx2 - len(carried_index) + segment.start],
+                'recency_index': global_index[idx2]
+            })
 
-    s1_price = most_recent_pattern['support_price']
-    r1_price = most_recent_pattern['resistance_price']
-    s1_timestamp = most_recent_pattern['timestamp']
+        extrema = np.flatnonzero(local_min | local_max)[-2:]
+        carried = (global_index[extrema], local_close[extrema], local_min[extrema], local_max[extrema])
+
+    for chunk in chunks:
+        if chunk is None or chunk.empty:
+            continue
+        close = chunk['Close'].to_numpy(dtype=np.float64)
+        last_close = close[-1]
+        if price_ticks:
+            close = price_ticks.ticks_float(close)
+        timestamps = chunk['timestamp'].to_numpy()
+        total += len(close)
+
+        if buffer_timestamps is None:
+            buffer_close, buffer_timestamps = close, timestamps
+        else:
+            buffer_close = np.concatenate((buffer_close, close))
+            buffer_timestamps = np.concatenate((buffer_timestamps, timestamps))
 
-    # Collect other levels
-    other_supports = []
-    other_resistances = []
+        # Candles whose whole right-hand window is known
+        end = total - window_size
+        if end > decided:
+            classify(buffer_close, buffer_timestamps, end)
+            decided = end
+            keep = max(decided - window_size, buffer_start) - buffer_start
+            buffer_close = buffer_close[keep:].copy()
+            buffer_timestamps = buffer_timestamps[keep:].copy()
+            buffer_start += keep
 
-    # Group remaining patterns
-    remaining_patterns = [p for p in found_patterns if abs(p['support_price'] - s1_price) > s1_price * tolerance_percent * 2]
-    grouped_patterns = group_patterns_by_price(remaining_patterns)
-
-    for pattern in grouped_patterns:
-        if pattern['support_price'] < s1_price:  # Only include supports below S1
-            other_supports.append({
-                'price': pattern['support_price'],
-                'timestamp': pattern['timestamp'],
-                'pattern_count': pattern.get('pattern_count', 1)
-            })
-        if pattern['resistance_price'] > r1_price and pattern['resistance_price'] > s1_price:
-            other_resistances.append({
-                'price': pattern['resistance_price'],
-                'timestamp': pattern['timestamp'],
-                'pattern_count': pattern.get('pattern_count', 1)
-            })
+    if total > decided:
+        classify(buffer_close, buffer_timestamps, total)
 
-    # Sort by price and strength (pattern count)
-    other_supports.sort(key=lambda x: (-x['pattern_count'], -x['price']))
-    other_resistances.sort(key=lambda x: (x['price'], -x['pattern_count']))
+    return _concat_patterns(parts, tick_size), last_close, total
 
-    final_sr_levels = []
-    
-    # Add S1
-    final_sr_levels.append({
-        'Type': 'Support',
-        'Tier': 'S1',
-        'Price': s1_price,
-        'Timestamp': s1_timestamp
-    })
-    
-    # Add other supports
-    for i, support in enumerate(other_supports[:sr_count-1], start=2):
-        logging.debug(f"Adding S{i}: Support={support['price']:.4f} (Count: {support['pattern_count']})")
-        final_sr_levels.append({
-            'Type': 'Support',
-            'Tier': f'S{i}',
-            'Price': support['price'],
-            'Timestamp': support['timestamp']
-        })
-    
-    # Add R1
-    final_sr_levels.append({
-        'Type': 'Resistance',
-        'Tier': 'R1',
-        'Price': r1_price,
-        'Timestamp': s1_timestamp
-    })
-    
-    # Add other resistances
-    for i, resistance in enumerate(other_resistances[:sr_count-1], start=2):
-        logging.debug(f"Adding R{i}: Resistance={resistance['price']:.4f} (Count: {resistance['pattern_count']})")
-        final_sr_levels.append({
-            'Type': 'Resistance',
-            'Tier': f'R{i}',
-            'Price': resistance['price'],
-            'Timestamp': resistance['timestamp']
-        })
-
-    # Create final DataFrame
-    sr_df = pd.DataFrame(final_sr_levels)
-    
-    if not sr_df.empty:
-        sr_df['TierNum'] = sr_df['Tier'].str[1:].astype(int)
-        sr_df = sr_df.sort_values(by=['Type', 'TierNum'], ascending=[False, True])
-        sr_df = sr_df.drop(columns=['TierNum'])
-        sr_df = sr_df.reset_index(drop=True)
 
-    logging.info(f"Final S/R levels: {len(sr_df)} levels identified")
-    return sr_df
+def find_lhl_support_resistance_chunked(chunks, tolerance_percent=0.01, window_size=5, sr_count=10, backend=None,
+                                        as_frame=True, tick_size=None):
+    """
+    find_lhl_support_resistance over a stream of candle chunks (see
+    scan_lhl_patterns_chunked); returns the same levels as an in-memory run.
+    """
+    patterns, last_close, num_candles = scan_lhl_patterns_chunked(
+        chunks, tolerance_percent, window_size, backend, tick_size
+    )
+    if num_candles == 0:
+        print("No candles in the chunked input.")
+        return _empty_frame() if as_frame else SRLevels.empty_levels()
+    levels = build_sr_levels(patterns, last_close, num_candles, tolerance_percent, sr_count, backend)
+    if not as_frame:
+        return levels
+    return levels.to_frame() if not levels.empty else _empty_frame()
+
+
+def save_sr_levels(sr_levels_df, output_path=None):
+    """Print the levels and write them to `output_path` ([DATA] SR_LEVELS_OUTPUT_CSV by default)"""
+    SR_LEVELS_OUTPUT_CSV_PATH = output_path or get_setting('DATA', 'SR_LEVELS_OUTPUT_CSV', fallback='sr_levels.csv')
+    if not sr_levels_df.empty:
+        print(f"\nCalculated S/R Levels (Top {len(sr_levels_df)} shown):")
+        print(sr_levels_df)
+        try:
+            output_dir = os.path.dirname(SR_LEVELS_OUTPUT_CSV_PATH)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+                print(f"Created directory: {output_dir}")
+            sr_levels_df.to_csv(SR_LEVELS_OUTPUT_CSV_PATH, index=False)
+            print(f"\nS/R levels saved to: {SR_LEVELS_OUTPUT_CSV_PATH}")
+        except Exception as e:
+            print(f"\nError saving S/R levels to CSV: {e}")
+    else:
+        print("\nNo S/R levels identified based on LHL pattern.")
 
 
 def main():
+    import pandas as pd
+
+    # Attempt to import data_fetcher; will be used for loading CSV
+    # This might require ensuring data_fetcher.py is in PYTHONPATH or same directory
+    try:
+        import data_fetcher
+    except ImportError:
+        print("Error: data_fetcher.py not found. Ensure it's in the same directory or PYTHONPATH.")
+        data_fetcher = None
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not config_exists():
+        print("Error: Configuration file 'config.ini' not found. Please create one.")
+        return
+
+    # Get paths and parameters from config, with fallbacks
+    INPUT_CSV_PATH = get_setting('TRADING', 'HISTORICAL_DATA_CSV', fallback='market_data.csv')
+    SR_PRICE_TOLERANCE_PERCENT = float(get_setting('TRADING', 'SR_PRICE_TOLERANCE_PERCENT', fallback='0.005'))
+    # Rows per block when streaming the input CSV (0 loads the whole file)
+    SR_CSV_CHUNK_ROWS = int(get_setting('SR', 'CSV_CHUNK_ROWS', fallback='0'))
+
     print(f"--- S/R Level Generation Script (LHL Pattern) ---")
     print(f"Attempting to load candlestick data from: {INPUT_CSV_PATH}")
 
+    if SR_CSV_CHUNK_ROWS > 0 and data_fetcher:
+        print(f"Streaming {INPUT_CSV_PATH} in blocks of {SR_CSV_CHUNK_ROWS} rows.")
+        try:
+            sr_levels_df = find_lhl_support_resistance_chunked(
+                data_fetcher.iter_market_data_csv(INPUT_CSV_PATH, SR_CSV_CHUNK_ROWS),
+                tolerance_percent=SR_PRICE_TOLERANCE_PERCENT,
+                window_size=10,
+                sr_count=10
+            )
+        except Exception as e:
+            print(f"Error streaming market data: {e}")
+            return
+        save_sr_levels(sr_levels_df)
+        return
+
     market_candles_df = None
     if data_fetcher:
         try:
@@ -312,20 +473,7 @@ def main():
             sr_count=10
         )
 
-        if not sr_levels_df.empty:
-            print(f"\nCalculated S/R Levels (Top {len(sr_levels_df)} shown):")
-            print(sr_levels_df)
-            try:
-                output_dir = os.path.dirname(SR_LEVELS_OUTPUT_CSV_PATH)
-                if output_dir and not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                    print(f"Created directory: {output_dir}")
-                sr_levels_df.to_csv(SR_LEVELS_OUTPUT_CSV_PATH, index=False)
-                print(f"\nS/R levels saved to: {SR_LEVELS_OUTPUT_CSV_PATH}")
-            except Exception as e:
-                print(f"\nError saving S/R levels to CSV: {e}")
-        else:
-            print("\nNo S/R levels identified based on LHL pattern.")
+        save_sr_levels(sr_levels_df)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,37 @@
+import numpy as np
+from benchmarks import generate_lhl_candles, generate_regime_candles, compare_to_baseline
+from support_resistance import find_lhl_support_resistance
+
+def test_generators_are_seeded():
+    """Same seed must give identical candles, different seeds must not"""
+    a = generate_lhl_candles(5000, seed=7)
+    b = generate_lhl_candles(5000, seed=7)
+    c = generate_lhl_candles(5000, seed=8)
+    assert a.equals(b)
+    assert not a['Close'].equals(c['Close'])
+
+    r1 = generate_regime_candles(300, seed=1)
+    r2 = generate_regime_candles(300, seed=1)
+    assert r1.equals(r2)
+
+def test_generated_candles_are_consistent():
+    """High/Low must wrap Open/Close and prices must stay positive"""
+    df = generate_lhl_candles(20000)
+    assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+    assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+    assert (df['Low'] > 0).all()
+    assert df['timestamp'].is_monotonic_increasing
+
+def test_generated_candles_contain_lhl_levels():
+    """The injected motifs must be picked up by the S/R detector"""
+    df = generate_lhl_candles(2000)
+    sr_df = find_lhl_support_resistance(df, tolerance_percent=0.01, window_size=5, sr_count=10)
+    assert not sr_df.empty
+    assert (sr_df['Type'] == 'Support').any()
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = {'fast': 1.0, 'slow': 1.0, 'gone': 1.0}
+    results = {'fast': 1.1, 'slow': 1.5, 'new': 3.0}
+    regressions = compare_to_baseline(results, baseline, threshold=0.25)
+    assert [name for name, _, _ in regressions] == ['slow']
+    assert np.isclose(regressions[0][2], 1.5)
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+import bot_config
+
+def test_library_import_is_light():
+    code = ("import sys, support_resistance, data_fetcher, utils, order_utils\n"
+            "print(','.join(m for m in ('scipy', 'ccxt', 'requests', 'numba') if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+    code = "import sys, support_resistance\nprint('pandas' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+def test_settings_are_cached_until_reload(tmp_path):
+    path = tmp_path / 'config.ini'
+    path.write_text('[SR]\nWORKERS = 2\n')
+    assert bot_config.get_setting('SR', 'WORKERS', path=str(path)) == '2'
+    path.write_text('[SR]\nWORKERS = 4\n')
+    assert bot_config.get_setting('SR', 'WORKERS', path=str(path)) == '2'
+    bot_config.reload_config()
+    assert bot_config.get_setting('SR', 'WORKERS', path=str(path)) == '4'
+    assert bot_config.get_setting('SR', 'MISSING', fallback='x', path=str(path)) == 'x'
+    assert bot_config.get_setting('SR', 'WORKERS', path=str(tmp_path / 'none.ini')) is None
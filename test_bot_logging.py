@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import textwrap
+import numpy as np
+from bot_logging import EventJournal, read_journal
+from fakes import FakeClock
+
+def test_event_journal_appends_jsonl(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    journal = EventJournal(str(path))
+    journal.record('signal', symbol='LINKUSDT_UMCBL', price=np.float64(15.5), support=15.45)
+    journal.record('trade', symbol='LINKUSDT_UMCBL', action='entry', size=np.int64(3))
+    journal.close()
+
+    # Reopening appends instead of truncating
+    journal = EventJournal(str(path))
+    journal.record('sr_change', s1_from=15.4, s1_to=15.45)
+    journal.close()
+
+    events = read_journal(str(path))
+    assert [e['event'] for e in events] == ['signal', 'trade', 'sr_change']
+    assert events[0]['price'] == 15.5
+    assert events[1]['size'] == 3
+    assert all('ts' in e for e in events)
+
+def test_disabled_journal_is_noop():
+    journal = EventJournal('')
+    journal.record('trade', action='entry')
+    journal.close()
+    assert journal.events is None
+
+def test_journal_stamps_events_with_its_clock(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    clock = FakeClock(now=1700000000.0)
+    journal = EventJournal(str(path), clock=clock.time, keep_events=True)
+    journal.record('signal', price=15.5)
+    clock.sleep(300)
+    journal.record('trade', action='entry')
+    journal.close()
+    assert [e['ts'] for e in read_journal(str(path))] == [1700000000.0, 1700000300.0]
+    assert journal.events == [{'ts': 1700000000.0, 'event': 'signal', 'price': 15.5},
+                              {'ts': 1700000300.0, 'event': 'trade', 'action': 'entry'}]
+
+def test_setup_logging_writes_through_queue(tmp_path):
+    """Run in a subprocess so the root logger of the test session is untouched"""
+    log_file = tmp_path / 'bot.log'
+    script = textwrap.dedent(f"""
+        import logging
+        from bot_logging import setup_logging, stop_logging
+        setup_logging({str(log_file)!r}, console=False)
+        logging.info("price %s support %s", 1.5, 1.4)
+        stop_logging()
+    """)
+    subprocess.run([sys.executable, '-c', script], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    content = log_file.read_text()
+    assert 'INFO - price 1.5 support 1.4' in content
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from candle_buffer import CandleBuffer
+from benchmarks import generate_lhl_candles
+
+def _reference_update(history_df, latest_candles, capacity):
+    """The pandas concat/dedupe/tail update the bot used before CandleBuffer"""
+    latest_df = pd.DataFrame(latest_candles, columns=['timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
+    latest_df['timestamp'] = pd.to_datetime(latest_df['timestamp'], unit='ms')
+    merged = pd.concat([history_df, latest_df]).drop_duplicates(subset=['timestamp'], keep='last').sort_values('timestamp')
+    return merged.tail(capacity).reset_index(drop=True)
+
+def test_matches_pandas_update():
+    """Forming-candle upserts and appends must match the DataFrame pipeline"""
+    candles = generate_lhl_candles(400)
+    rows = np.column_stack([
+        candles['timestamp'].values.astype('datetime64[ms]').astype(np.int64),
+        candles[['Open', 'High', 'Low', 'Close', 'Volume']].values
+    ]).tolist()
+    rows = [[int(r[0])] + r[1:] for r in rows]
+
+    capacity = 100
+    buffer = CandleBuffer.from_frame(candles.iloc[:150], capacity=capacity)
+    reference = candles.iloc[:150].tail(capacity).reset_index(drop=True)
+
+    for i in range(150, 400):
+        forming = list(rows[i])
+        forming[4] = forming[4] * 1.001  # forming candle first seen with a different close
+        buffer.upsert_ohlcv([rows[i - 1], forming])
+        buffer.upsert_ohlcv([rows[i - 1], rows[i]])
+        reference = _reference_update(reference, [rows[i - 1], rows[i]], capacity)
+
+    frame = buffer.to_frame()
+    assert len(frame) == capacity
+    np.testing.assert_array_equal(frame['timestamp'].values.astype('datetime64[ns]'), reference['timestamp'].values)
+    for name in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        np.testing.assert_array_equal(frame[name].values, reference[name].values)
+
+def test_views_are_zero_copy_and_contiguous():
+    buffer = CandleBuffer(capacity=8)
+    for i in range(20):
+        buffer.upsert(i * 300000, 1.0, 2.0, 0.5, float(i), 10.0)
+    close = buffer.column('Close')
+    assert close.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(close, np.arange(12, 20, dtype=float))
+    assert np.shares_memory(buffer.to_frame()['Close'].values, close)
+
+    # Updating the forming candle is visible through the existing view
+    buffer.upsert(19 * 300000, 1.0, 2.0, 0.5, 99.0, 10.0)
+    assert close[-1] == 99.0
+
+def test_old_candles_update_or_are_ignored():
+    buffer = CandleBuffer(capacity=4)
+    for i in range(6):
+        buffer.upsert(i, 0, 0, 0, float(i), 0)
+    assert buffer.upsert(3, 0, 0, 0, 33.0, 0)
+    assert not buffer.upsert(0, 0, 0, 0, 5.0, 0)
+    np.testing.assert_array_equal(buffer.column('Close'), [2.0, 33.0, 4.0, 5.0])
+    assert buffer.last_timestamp == 5
+    assert len(buffer) == 4
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from candle_builder import CandleBuilder, TradeCandleExchange, timeframe_to_ms
+from fakes import FakeClock
+
+def _trades(n=5000, seed=3, max_gap_ms=400):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_700_000_000_000 + np.cumsum(rng.integers(0, max_gap_ms, n))
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    amounts = rng.uniform(0.01, 2.0, n)
+    return timestamps, prices, amounts
+
+def _reference(timestamps, prices, amounts, timeframe_ms):
+    """OHLCV bars by pandas groupby, as rows"""
+    df = pd.DataFrame({'bar': timestamps - timestamps % timeframe_ms, 'price': prices, 'amount': amounts})
+    bars = df.groupby('bar').agg(
+        Open=('price', 'first'), High=('price', 'max'), Low=('price', 'min'),
+        Close=('price', 'last'), Volume=('amount', 'sum')
+    )
+    return [[int(ts), *row] for ts, row in zip(bars.index, bars.to_numpy())]
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms('5m') == 300_000
+    assert timeframe_to_ms('1h') == 3_600_000
+    assert timeframe_to_ms('15s') == 15_000
+
+def test_matches_reference_in_any_batch_size():
+    timestamps, prices, amounts = _trades()
+    for timeframe in ('1m', '5m'):
+        expected = _reference(timestamps, prices, amounts, timeframe_to_ms(timeframe))
+        one_by_one, batched = CandleBuilder(timeframe), CandleBuilder(timeframe)
+        closed = []
+        for ts, price, amount in zip(timestamps, prices, amounts):
+            closed += one_by_one.add_trade(ts, price, amount)
+        for start in range(0, len(timestamps), 700):
+            batched.add_trades(timestamps[start:start + 700], prices[start:start + 700], amounts[start:start + 700])
+        for builder in (one_by_one, batched):
+            np.testing.assert_allclose(builder.ohlcv(), expected)
+            assert builder.forming == tuple(builder.ohlcv(1)[0])
+        # Every bar but the forming one was reported closed exactly once
+        np.testing.assert_allclose(closed, expected[:-1])
+
+def test_late_trades_and_reconcile():
+    builder = CandleBuilder('5m')
+    builder.add_trades([0, 1_000, 2_000], [10.0, 11.0, 9.5], [1, 1, 1])
+    builder.add_trade(300_500, 12.0, 2)
+    # A trade of the closed bar arriving late is dropped and counted
+    builder.add_trade(299_000, 8.0, 1)
+    assert builder.late_trades == 1
+    assert builder.ohlcv()[0] == [0, 10.0, 11.0, 9.5, 9.5, 3.0]
+
+    corrected = builder.reconcile([
+        [0, 10.0, 11.0, 8.0, 8.0, 4.0],        # closed bar: the exchange's values win
+        [300_000, 11.8, 12.1, 11.7, 11.9, 5.0],  # forming bar: exchange open, wider range, local close
+    ])
+    assert corrected == 2
+    assert builder.ohlcv() == [[0, 10.0, 11.0, 8.0, 8.0, 4.0], [300_000, 11.8, 12.1, 11.7, 12.0, 5.0]]
+    assert builder.reconcile([[0, 10.0, 11.0, 8.0, 8.0, 4.0]]) == 0
+    # A bar the exchange opened before any local trade becomes the forming bar
+    builder.reconcile([[600_000, 12.0, 12.0, 12.0, 12.0, 0.5]])
+    builder.add_trade(600_100, 12.5, 1)
+    assert builder.forming == (600_000, 12.0, 12.5, 12.0, 12.5, 1.5)
+
+class _FakeExchange:
+    """fetch_trades / fetch_ohlcv over a fixed trade tape, up to a moving 'now'"""
+
+    id = 'fake'
+
+    def __init__(self, timestamps, prices, amounts):
+        self.trades = [
+            {'id': str(i), 'timestamp': int(ts), 'price': float(p), 'amount': float(a)}
+            for i, (ts, p, a) in enumerate(zip(timestamps, prices, amounts))
+        ]
+        self.now = int(timestamps[0])
+        self.calls = {'fetch_trades': 0, 'fetch_ohlcv': 0}
+
+    def fetch_trades(self, symbol, since=None, limit=100):
+        self.calls['fetch_trades'] += 1
+        visible = [t for t in self.trades if t['timestamp'] <= self.now and (since is None or t['timestamp'] >= since)]
+        return visible[:limit] if since is not None else visible[-limit:]
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        self.calls['fetch_ohlcv'] += 1
+        visible = [t for t in self.trades if t['timestamp'] <= self.now]
+        rows = _reference(np.array([t['timestamp'] for t in visible]), np.array([t['price'] for t in visible]),
+                          np.array([t['amount'] for t in visible]), timeframe_to_ms(timeframe))
+        return rows[-limit:] if limit else rows
+
+    def fetch_ticker(self, symbol):
+        return {'last': self.trades[0]['price']}
+
+def test_exchange_adapter_polls_trades_and_reconciles():
+    timestamps, prices, amounts = _trades(3000, seed=5, max_gap_ms=2000)
+    exchange, clock = _FakeExchange(timestamps, prices, amounts), FakeClock()
+    adapter = TradeCandleExchange(exchange, 'BTCUSDT', '5m', reconcile_interval=60, stream=False, clock=clock)
+    exchange.now = int(timestamps[200])
+    history = adapter.fetch_ohlcv('BTCUSDT', '5m', limit=100)
+    assert history == exchange.fetch_ohlcv('BTCUSDT', '5m')
+    reconciles = exchange.calls['fetch_ohlcv']
+    for step in range(400, 3000, 37):
+        exchange.now = int(timestamps[step])
+        clock.now += 5
+        latest = adapter.fetch_ohlcv('BTCUSDT', '5m', limit=2)
+        expected = exchange.fetch_ohlcv('BTCUSDT', '5m', limit=2)
+        exchange.calls['fetch_ohlcv'] -= 1
+        # The forming bar is current to the last trade without waiting for the exchange's candle
+        assert latest[-1][0] == expected[-1][0]
+        assert latest[-1][4] == expected[-1][4]
+        np.testing.assert_allclose(latest[-1][1:4], expected[-1][1:4])
+    # One reconciliation per minute of polling, not one per poll
+    assert exchange.calls['fetch_ohlcv'] - reconciles == len(range(400, 3000, 37)) * 5 // 60
+    # Other calls go to the wrapped exchange
+    assert adapter.fetch_ticker('BTCUSDT')['last'] == prices[0]
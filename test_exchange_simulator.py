@@ -0,0 +1,49 @@
+import ccxt
+import pytest
+from benchmarks import generate_lhl_candles
+from exchange_simulator import SimulatedBitget, start_simulator, run_load_test
+from order_utils import place_uni_long_order, close_uni_long_order
+from utils import close_long_position_bitget_v1
+
+CREDENTIALS = {'API_KEY': 'key', 'SECRET_KEY': 'secret', 'PASSPHRASE': 'pass'}
+
+@pytest.fixture
+def server():
+    server = start_simulator(generate_lhl_candles(500, seed=1), secret_key='secret', leverage=10)
+    yield server
+    server.shutdown()
+
+def test_order_paths_round_trip(server):
+    exchange = SimulatedBitget(server.base_url, 'key', 'secret', 'pass')
+    assert len(exchange.fetch_ohlcv('LINK/USDT:USDT', '5m', limit=50)) == 50
+    price = exchange.fetch_ticker('LINK/USDT:USDT')['last']
+    assert price == server.market.last_price()
+
+    state = {'in_position': False, 'position_size': 0.0, 'entry_price': 0.0}
+    order = place_uni_long_order(exchange, 'LINK/USDT:USDT', 10.0, 20, state, base_url=server.base_url)
+    assert order and state['in_position'] and state['entry_price'] == price
+    assert server.market.leverage == 20
+    assert server.market.position_size == pytest.approx(10.0 * 20 / price)
+
+    server.market.advance()
+    assert close_uni_long_order('LINKUSDT_UMCBL', CREDENTIALS, state, base_url=server.base_url)
+    assert not state['in_position'] and server.market.position_size == 0
+
+    # Wrong secret fails the signature check, closing without a position is rejected
+    assert close_long_position_bitget_v1('key', 'bad', 'pass', 'LINKUSDT_UMCBL', 1, base_url=server.base_url)['status'] == 'error'
+    assert close_long_position_bitget_v1('key', 'secret', 'pass', 'LINKUSDT_UMCBL', 1, base_url=server.base_url)['status'] == 'error'
+
+def test_error_injection():
+    server = start_simulator(generate_lhl_candles(100, seed=2), error_rate=1.0)
+    try:
+        with pytest.raises(ccxt.NetworkError):
+            SimulatedBitget(server.base_url).fetch_ticker('LINK/USDT:USDT')
+    finally:
+        server.shutdown()
+
+def test_load_test(server):
+    results = run_load_test(server.base_url, threads=4, iterations=5,
+                            api_credentials={'API_KEY': 'key', 'SECRET_KEY': 'secret', 'PASSPHRASE': 'pass'})
+    assert results['round_trips'] == 20 and results['failed_opens'] == 0 and results['failed_closes'] == 0
+    assert results['round_trip_ms']['p99'] >= results['round_trip_ms']['p50'] > 0
+    assert server.market.position_size == pytest.approx(0, abs=1e-9)
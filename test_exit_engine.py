@@ -0,0 +1,54 @@
+import numpy as np
+from benchmarks import generate_lhl_candles
+from exit_engine import resolve_exits, EXIT_NONE, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT
+from live_signal_bot import calculate_stop_loss_price
+
+def _loop_reference(high, low, open_, entry_index, entry_price, stop_price, fraction=0.15):
+    """Per-bar simulation of the same rules, used to check the vectorized engine"""
+    highest = entry_price
+    for j in range(entry_index + 1, len(high)):
+        trigger = highest - fraction * (highest - entry_price)
+        tp_fill = trigger if open_ is None else min(trigger, open_[j])
+        if highest > entry_price and low[j] <= trigger and tp_fill > entry_price:
+            return j, tp_fill, EXIT_TAKE_PROFIT
+        if low[j] <= stop_price:
+            return j, stop_price if open_ is None else min(stop_price, open_[j]), EXIT_STOP_LOSS
+        highest = max(highest, high[j])
+    return -1, np.nan, EXIT_NONE
+
+def test_matches_per_bar_loop():
+    candles = generate_lhl_candles(5000, seed=3)
+    high, low, open_, close = (candles[c].values for c in ['High', 'Low', 'Open', 'Close'])
+    rng = np.random.default_rng(0)
+    entry_indices = np.sort(rng.choice(len(close), 400, replace=False))
+    entry_prices = close[entry_indices]
+    stop_prices = calculate_stop_loss_price(entry_prices, 10.0, 25)
+
+    for opens in (None, open_):
+        result = resolve_exits(high, low, entry_indices, entry_prices, stop_prices, open_=opens, block_bars=16)
+        for k, (i, price, stop) in enumerate(zip(entry_indices, entry_prices, stop_prices)):
+            idx, fill, reason = _loop_reference(high, low, opens, i, price, stop)
+            assert result['exit_index'][k] == idx
+            assert result['exit_reason'][k] == reason
+            np.testing.assert_equal(result['exit_price'][k], fill)
+
+def test_intrabar_wick_hits_stop():
+    """A wick through the stop exits even though the close recovers"""
+    high = np.array([10.0, 10.0, 10.1, 10.2])
+    low = np.array([9.9, 9.95, 9.5, 10.0])
+    result = resolve_exits(high, low, [0], [10.0], [9.8])
+    assert result['exit_index'][0] == 2
+    assert result['exit_reason'][0] == EXIT_STOP_LOSS
+    assert result['exit_price'][0] == 9.8
+
+def test_trailing_take_profit_and_unresolved():
+    high = np.array([10.0, 11.0, 12.0, 12.0, 12.0])
+    low = np.array([10.0, 10.5, 11.5, 11.6, 11.0])
+    # Highest before bar 4 is 12 -> trigger 12 - 0.15 * 2 = 11.7, bar 3 low 11.6 hits it
+    result = resolve_exits(high, low, [0, 3], [10.0, 12.0], [9.0, 11.0], block_bars=2)
+    assert result['exit_index'].tolist() == [3, 4]
+    assert result['exit_reason'].tolist() == [EXIT_TAKE_PROFIT, EXIT_STOP_LOSS]
+    assert np.isclose(result['exit_price'][0], 11.7)
+
+    result = resolve_exits(high, low, [4], [11.0], [5.0])
+    assert result['exit_index'][0] == -1 and result['exit_reason'][0] == EXIT_NONE
@@ -0,0 +1,164 @@
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+import live_signal_bot
+from benchmarks import generate_lhl_candles
+from exchange_simulator import SimulatedBitget, start_simulator
+from exit_orders import ExitOrders
+from fakes import FakeClock
+from bot_logging import EventJournal, setup_logging
+from market_replay import ReplayClock, ReplayExchange, ReplayFinished
+
+CREDENTIALS = {'API_KEY': 'key', 'SECRET_KEY': 'secret', 'PASSPHRASE': 'pass'}
+SYMBOL = 'LINKUSDT_UMCBL'
+
+def _candles(rows):
+    """Candles from (open, high, low, close) rows, 5 minutes apart"""
+    df = pd.DataFrame(rows, columns=['Open', 'High', 'Low', 'Close'])
+    df['Volume'] = 1.0
+    df['timestamp'] = pd.date_range('2024-01-01', periods=len(df), freq='5min')
+    return df
+
+def _open_long(rows):
+    server = start_simulator(_candles(rows), secret_key='secret', start_index=0)
+    SimulatedBitget(server.base_url, 'key', 'secret', 'pass').create_market_buy_order('LINK/USDT:USDT', 10.0)
+    return server
+
+def test_stop_fires_on_the_exchange_at_the_trigger():
+    server = _open_long([(10, 10, 10, 10), (9.8, 9.9, 9.2, 9.6)])
+    try:
+        exits = ExitOrders(CREDENTIALS, base_url=server.base_url, clock=FakeClock())
+        assert exits.place(SYMBOL, 10.0, 9.5, 10.0)
+        assert exits.check(SYMBOL, 9.6) is None and server.market.plan_requests == 1
+        server.market.advance()
+        assert server.market.position_size == 0
+        result = exits.check(SYMBOL, 9.2)
+        assert result['action'] == 'stop_loss' and result['price'] == 9.5
+        assert exits.trigger_price(SYMBOL) is None
+    finally:
+        server.shutdown()
+
+def test_trailing_amends_are_coalesced_and_rate_limited():
+    server = _open_long([(10, 10, 10, 10), (10, 11, 10, 11), (11, 12, 11, 12), (11.0, 11.2, 10.9, 11.1)])
+    try:
+        clock = FakeClock()
+        exits = ExitOrders(CREDENTIALS, base_url=server.base_url, min_amend_interval=10.0, clock=clock)
+        exits.place(SYMBOL, 10.0, 9.5, 10.0)
+        server.market.advance(2)
+        for highest in (10.5, 11.0, 12.0):
+            exits.trail(SYMBOL, highest)
+            assert exits.flush() == 0
+        clock.now = 10.0
+        # Only the latest level (12 - 0.15 * 2) is sent
+        assert exits.flush() == 1 and exits.trigger_price(SYMBOL) == pytest.approx(11.7)
+        exits.trail(SYMBOL, 12.0)
+        clock.now = 30.0
+        assert exits.flush() == 0
+        assert server.market.plan_requests == 2
+
+        # The bar opens below the trigger, so the fill gaps to the open
+        server.market.advance()
+        result = exits.check(SYMBOL, 10.9)
+        assert result['action'] == 'take_profit' and result['price'] == 11.0
+    finally:
+        server.shutdown()
+
+def test_rejected_plan_and_cancel():
+    server = start_simulator(_candles([(10, 10, 10, 10)] * 3), secret_key='secret', start_index=0)
+    try:
+        exits = ExitOrders(CREDENTIALS, base_url=server.base_url)
+        # No position on the exchange: the plan is rejected and the bot keeps its polled exits
+        assert exits.place(SYMBOL, 10.0, 9.5, 1.0) is None
+        SimulatedBitget(server.base_url, 'key', 'secret', 'pass').create_market_buy_order('LINK/USDT:USDT', 1.0)
+        exits.place(SYMBOL, 10.0, 9.5, 1.0)
+        assert exits.cancel(SYMBOL) and not exits.cancel(SYMBOL)
+        assert [plan['status'] for plan in server.market.plans.values()] == ['cancel']
+    finally:
+        server.shutdown()
+
+class RecordingExitOrders:
+    """ExitOrders stand-in recording the plans main() places; the exchange rejects every plan"""
+    created = []
+
+    def __init__(self, *args, **kwargs):
+        self.placed = []
+        self.cancelled = 0
+        RecordingExitOrders.created.append(self)
+
+    def place(self, symbol, entry_price, stop_price, size):
+        self.placed.append((entry_price, size))
+        return None
+
+    def trigger_price(self, symbol):
+        return None
+
+    def cancel(self, symbol):
+        self.cancelled += 1
+        return False
+
+def _run_bot(monkeypatch, open_position=None, close_position=None):
+    setup_logging(None, level=logging.WARNING)  # main() would log to bot.log
+    RecordingExitOrders.created = []
+    monkeypatch.setattr(live_signal_bot, 'ExitOrders', RecordingExitOrders)
+    config = live_signal_bot.load_config()
+    config.update(snapshot_file='', event_journal_file='')
+    config['exit_orders'] = {**config['exit_orders'], 'enabled': True}
+    candles = generate_lhl_candles(900, seed=8, pattern_every=60)
+    timestamps = candles['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+    clock = ReplayClock(timestamps[400] / 1000 + 1, end=timestamps[-1] / 1000)
+    journal = EventJournal(None, clock=clock.time, keep_events=True)
+    for attr in ('prev_s1', 'prev_r1'):
+        if hasattr(live_signal_bot.main, attr):
+            delattr(live_signal_bot.main, attr)
+    try:
+        live_signal_bot.main(config=config, exchange=ReplayExchange(candles, clock, config['symbol']), clock=clock,
+                             journal=journal, open_position=open_position, close_position=close_position)
+    except ReplayFinished:
+        pass
+    return journal.events
+
+def _fill(price):
+    return price * 1.001, 2.5
+
+def test_plans_need_an_order_path(monkeypatch):
+    # Signal-only bot: no plan is ever placed, however many entries it signals
+    assert any(e['event'] == 'trade' and e['action'] == 'entry' for e in _run_bot(monkeypatch))
+    assert RecordingExitOrders.created == []
+    # Opening without a way to close is no order path either
+    _run_bot(monkeypatch, open_position=_fill)
+    assert RecordingExitOrders.created == []
+
+    opened = []
+    def open_position(symbol, price, margin_usdt, leverage):
+        opened.append(price)
+        # The first order fails; later ones fill slightly above the signal price
+        return None if len(opened) == 1 else _fill(price)
+    events = _run_bot(monkeypatch, open_position, close_position=lambda symbol, price, size: True)
+    entries = [e['price'] for e in events if e['event'] == 'trade' and e['action'] == 'entry']
+    assert len(entries) >= 2 and len(opened) == len(entries)
+    placed = RecordingExitOrders.created[0].placed
+    assert placed == [_fill(price) for price in opened[1:]]
+    # Opened positions are entered at their fill, the failed one at the signal price
+    assert entries == [opened[0]] + [fill for fill, size in placed]
+
+def test_polled_exit_closes_the_opened_position(monkeypatch):
+    config = live_signal_bot.load_config()
+    closes = []
+    def close_position(symbol, price, size):
+        closes.append((price, size))
+        return len(closes) > 1  # The first close fails and is retried on the next cycle
+    events = _run_bot(monkeypatch, lambda symbol, price, margin_usdt, leverage: _fill(price), close_position)
+
+    trades = [e for e in events if e['event'] == 'trade']
+    entries = [trade for trade in trades if trade['action'] == 'entry']
+    exits = [trade for trade in trades if trade['action'] != 'entry']
+    assert any(trade['action'] == 'stop_loss' for trade in exits)
+    # No plan was ever live, so every exit went through the close path after cancelling
+    assert [(trade['price'], 2.5) for trade in exits] == closes[1:]
+    assert RecordingExitOrders.created[0].cancelled == len(closes)
+    assert all(exit['entry'] == entry['price'] for entry, exit in zip(entries, exits))
+    # The stop is the 1.5 USDT loss of the filled size at the fill price
+    stops = [e['stop_loss'] for e in events if e['event'] == 'signal']
+    assert stops == [pytest.approx(live_signal_bot.calculate_stop_loss_price(
+        entry['price'], config['trade_margin_usdt'], config['leverage'], position_size=2.5)) for entry in entries]
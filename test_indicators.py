@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from candle_buffer import CandleBuffer
+from indicators import IndicatorPipeline, RollingWindow
+from support_resistance import find_lhl_support_resistance
+
+def _candles(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, n))
+    volume = rng.lognormal(3, 0.5, n)
+    timestamps = 1_700_000_000_000 + 300_000 * np.arange(n)
+    return pd.DataFrame({
+        'timestamp': timestamps.astype('datetime64[ms]'), 'Open': open_, 'High': high, 'Low': low,
+        'Close': close, 'Volume': volume
+    })
+
+def _reference(df, atr_period=14, window=20):
+    """Full-window recomputation with pandas"""
+    prev_close = df['Close'].shift(1)
+    true_range = (np.maximum(df['High'], prev_close.fillna(df['High'])) -
+                  np.minimum(df['Low'], prev_close.fillna(df['Low'])))
+    atr = np.full(len(df), np.nan)
+    atr[atr_period - 1] = true_range[:atr_period].mean()
+    for i in range(atr_period, len(df)):
+        atr[i] = (atr[i - 1] * (atr_period - 1) + true_range[i]) / atr_period
+    volume = df['Volume']
+    zscore = (volume - volume.rolling(window).mean().shift(1)) / volume.rolling(window).std(ddof=0).shift(1)
+    volatility = np.log(df['Close']).diff().rolling(window).std(ddof=0)
+    return {'atr': atr, 'volume_zscore': zscore.to_numpy(), 'volatility': volatility.to_numpy()}
+
+def test_rolling_window_matches_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.normal(1e6, 5, 5000)
+    window = RollingWindow(50)
+    for i, value in enumerate(values):
+        window.push(value)
+        if i >= 49:
+            mean, std = window.stats()
+            assert np.isclose(mean, values[i - 49:i + 1].mean())
+            assert np.isclose(std, values[i - 49:i + 1].std(), rtol=1e-6)
+    mean, std = window.stats(extra=7.0)
+    expected = np.r_[values[-49:], 7.0]
+    assert np.isclose(mean, expected.mean()) and np.isclose(std, expected.std())
+
+def test_incremental_matches_full_recomputation():
+    df = _candles()
+    buffer = CandleBuffer.from_frame(df.iloc[:1000], capacity=1000)
+    pipeline = IndicatorPipeline(capacity=1000)
+    pipeline.sync(buffer)
+    # Then the live loop: the forming candle polled a few times, then closed
+    for i in range(1000, len(df)):
+        row = df.iloc[i]
+        ts = int(row['timestamp'].value // 10**6)
+        for partial in (0.3, 0.7):
+            close = row['Open'] + partial * (row['Close'] - row['Open'])
+            buffer.upsert(ts, row['Open'], max(row['Open'], close), min(row['Open'], close), close,
+                          partial * row['Volume'])
+            pipeline.sync(buffer)
+        buffer.upsert(ts, *row[['Open', 'High', 'Low', 'Close', 'Volume']])
+        pipeline.sync(buffer)
+
+    expected = _reference(df)
+    for name in ('atr', 'volume_zscore', 'volatility'):
+        np.testing.assert_allclose(pipeline.history(name), expected[name][-1000:], rtol=1e-7)
+    assert np.isclose(pipeline.atr, expected['atr'][-1])
+    assert np.isclose(pipeline.volume_zscore, expected['volume_zscore'][-1])
+    assert np.isclose(pipeline.volatility, expected['volatility'][-1])
+    aligned = pipeline.history('atr', buffer.timestamps()[-5:])
+    np.testing.assert_allclose(aligned, expected['atr'][-5:])
+
+def test_scaled_tolerance_and_swing_filter():
+    df = _candles(800, seed=4)
+    buffer = CandleBuffer.from_frame(df, capacity=1000)
+    pipeline = IndicatorPipeline()
+    assert pipeline.scaled_tolerance(100.0, 1.0, 0.01) == 0.01  # ATR not seeded yet
+    pipeline.sync(buffer)
+    price = float(df['Close'].iloc[-1])
+    assert np.isclose(pipeline.scaled_tolerance(price, 2.0, 0.01), 2 * pipeline.atr / price)
+    assert pipeline.scaled_tolerance(price, 0, 0.01) == 0.01
+
+    mask = pipeline.swing_mask(buffer.timestamps(), 0.5)
+    # Unknown z-scores (the first window) never filter a swing out
+    assert mask[:20].all()
+    everything = find_lhl_support_resistance(df, tolerance_percent=0.01, window_size=5, as_frame=False)
+    filtered = find_lhl_support_resistance(df, tolerance_percent=0.01, window_size=5, as_frame=False,
+                                           swing_filter=mask)
+    allow_all = find_lhl_support_resistance(df, tolerance_percent=0.01, window_size=5, as_frame=False,
+                                            swing_filter=np.ones(len(df), dtype=bool))
+    np.testing.assert_array_equal(allow_all.price, everything.price)
+    assert filtered.strength.sum() < everything.strength.sum()
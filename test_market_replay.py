@@ -0,0 +1,43 @@
+import time
+import numpy as np
+from benchmarks import generate_lhl_candles
+from market_replay import ReplayClock, ReplayExchange, run_replay
+from state_snapshot import TIMEFRAME_MS
+
+def test_forming_candle_follows_ohlc_path():
+    candles = generate_lhl_candles(10, seed=1)
+    start = candles['timestamp'].values.astype('datetime64[ms]').astype(np.int64)[5] / 1000
+    clock = ReplayClock(start)
+    exchange = ReplayExchange(candles, clock, 'TEST')
+    open_, high, low, close = candles[['Open', 'High', 'Low', 'Close']].values[5]
+    assert exchange.fetch_ohlcv('TEST', limit=2)[-1][4] == open_
+    clock.now += TIMEFRAME_MS / 1000 - 1e-3
+    latest = exchange.fetch_ohlcv('TEST', limit=2)
+    assert len(latest) == 2 and latest[0][4] == candles['Close'].values[4]
+    assert np.allclose(latest[-1][2:5], [high, low, close], rtol=1e-5)
+
+def test_replay_is_deterministic():
+    candles = generate_lhl_candles(700, seed=8)
+    first = run_replay(candles, speed=0, history=400)
+    second = run_replay(candles, speed=0, history=400)
+    assert first['stats']['cycles'] > 300
+    assert first['stats']['virtual_hours'] >= 299 * 5 / 60
+    assert first['events'] and first['events'] == second['events']
+    assert (first['cycles']['latency_ms'] > 0).all()
+
+def test_replay_sends_no_exchange_requests(monkeypatch):
+    import requests
+    import live_signal_bot
+    sent = []
+    monkeypatch.setattr(requests.Session, 'request', lambda self, method, url, *args, **kwargs: sent.append(url))
+    config = live_signal_bot.load_config()
+    config['exit_orders'] = {**config['exit_orders'], 'enabled': True, 'base_url': 'https://api.bitget.com'}
+    result = run_replay(generate_lhl_candles(900, seed=8, pattern_every=60), history=400, config=config)
+    assert result['stats']['events']['trade'] > 0
+    assert sent == [] and config['exit_orders']['enabled']
+
+def test_replay_speed():
+    candles = generate_lhl_candles(420, seed=3)
+    started = time.perf_counter()
+    result = run_replay(candles, speed=10000, history=400)
+    assert time.perf_counter() - started >= result['stats']['virtual_hours'] * 3600 / 10000 * 0.9
@@ -0,0 +1,50 @@
+import logging
+import tracemalloc
+import live_signal_bot
+from benchmarks import generate_lhl_candles
+from fakes import FakeClock, RecordingJournal
+from market_replay import run_replay
+from memory_monitor import MemoryMonitor
+
+def _leak(store):
+    store.extend(bytearray(1024) for _ in range(2000))
+
+def test_reports_growing_allocation_sites():
+    journal, clock, store = RecordingJournal(), FakeClock(), []
+    monitor = MemoryMonitor('TEST', journal, interval=60, top=5, clock=clock.time)
+    monitor.start()
+    try:
+        _leak(store)
+        assert monitor.check() is None  # Interval not over yet
+        clock.now = 60
+        report = monitor.check()
+        assert report is not None and journal.events[-1] == ('memory', {'symbol': 'TEST', **report})
+        assert report['growth_mb'] > 1.5 and report['growth_since_start_mb'] > 1.5
+        assert __file__ in report['top'][0]['site'] and report['top'][0]['count_diff'] >= 2000
+        assert report['over_budget'] is False
+        # The next report is diffed against this one: nothing new from _leak
+        clock.now = 120
+        report = monitor.check()
+        assert all(__file__ not in site['site'] or site['diff_kb'] < 100 for site in report['top'])
+    finally:
+        monitor.stop()
+    assert not tracemalloc.is_tracing()
+
+def test_budget_warns_when_exceeded(caplog):
+    monitor = MemoryMonitor('TEST', RecordingJournal(), interval=0, budget_mb=1, clock=FakeClock().time)
+    monitor.start()
+    try:
+        with caplog.at_level(logging.WARNING):
+            report = monitor.report()
+    finally:
+        monitor.stop()
+    assert report['over_budget'] and monitor.over_budget == 1
+    assert 'over its 1 MB memory budget' in caplog.text
+
+def test_bot_journals_memory_reports():
+    config = live_signal_bot.load_config()
+    config['memory'] = {'enabled': True, 'interval': 3600, 'top': 3, 'frames': 1, 'budget_mb': 0}
+    result = run_replay(generate_lhl_candles(500, seed=4), history=400, config=config)
+    reports = [e for e in result['events'] if e['event'] == 'memory']
+    assert len(reports) >= 1 and reports[0]['symbol'] == config['symbol']
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,38 @@
+from poll_scheduler import PollScheduler
+
+def test_wakes_after_candle_close():
+    scheduler = PollScheduler(timeframe_seconds=300, normal_interval=30, candle_close_offset=1)
+    boundary = 1_700_000_100  # multiple of 300
+    assert scheduler.seconds_to_candle_close(boundary - 10) == 11
+    assert scheduler.seconds_to_candle_close(boundary + 0.5) == 0.5
+    assert scheduler.seconds_to_candle_close(boundary + 2) == 299
+    # Far from the close the normal interval wins, near it the close wins
+    assert scheduler.next_delay(boundary - 200) == 30
+    assert scheduler.next_delay(boundary - 10) == 11
+
+def test_interval_follows_proximity():
+    scheduler = PollScheduler(fast_interval=5, normal_interval=30, slow_interval=60, far_multiplier=5)
+    proximity = 0.002
+    assert scheduler.interval_for(100.0, [99.9], proximity) == 5      # 0.1% away
+    assert scheduler.interval_for(100.0, [99.5], proximity) == 30     # 0.5% away
+    assert scheduler.interval_for(100.0, [95.0, 120.0], proximity) == 60
+    assert scheduler.interval_for(100.0, [], proximity) == 30
+    assert scheduler.interval_for(100.0, [None, 99.95], proximity) == 5
+
+def test_error_backoff_grows_and_resets():
+    scheduler = PollScheduler(error_backoff_base=2, error_backoff_max=10)
+    assert [scheduler.error_delay() for _ in range(5)] == [2, 4, 8, 10, 10]
+    scheduler.next_delay(0)
+    assert scheduler.error_delay() == 2
+
+def test_watched_levels():
+    import pandas as pd
+    from live_signal_bot import watched_levels, new_strategy_state, take_profit_trigger
+    sr_df = pd.DataFrame({'Type': ['Support', 'Support', 'Resistance'], 'Price': [10.0, 9.5, 11.0]})
+    state = new_strategy_state()
+    assert watched_levels(state, sr_df) == [10.0, 9.5]
+    state.update({'in_position': True, 'entry_price': 10.0, 'highest_price_since_entry': 10.0, 'stop_loss_price': 9.9})
+    assert watched_levels(state, sr_df) == [9.9]
+    state['highest_price_since_entry'] = 11.0
+    assert watched_levels(state, sr_df) == [9.9, take_profit_trigger(10.0, 11.0)]
+    assert abs(take_profit_trigger(10.0, 11.0) - 10.85) < 1e-12
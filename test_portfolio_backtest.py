@@ -0,0 +1,55 @@
+import numpy as np
+from benchmarks import generate_lhl_candles
+from portfolio_backtest import run_portfolio_backtest, generate_signals
+
+CONFIG = {'sr_price_tolerance': 0.01, 'entry_proximity': 0.002, 'trade_margin_usdt': 10.0, 'leverage': 25}
+
+def _candles(symbols=3, num_candles=1600):
+    return {f"SYM{k}": generate_lhl_candles(num_candles, seed=k, pattern_every=60) for k in range(symbols)}
+
+def test_parallel_matches_in_process_and_accounts_pnl():
+    candles = _candles()
+    serial = run_portfolio_backtest(candles, CONFIG, capital=1e6, workers=1, history=300, sr_interval=5)
+    parallel = run_portfolio_backtest(candles, CONFIG, capital=1e6, workers=2, history=300, sr_interval=5)
+    trades = serial['trades']
+    assert len(trades) > 0
+    assert trades.equals(parallel['trades'])
+    np.testing.assert_allclose(serial['equity']['equity'], parallel['equity']['equity'])
+    # Unlimited capital: every signal is taken and the merge keeps each symbol's own trades
+    assert serial['stats']['skipped'] == 0
+    for symbol, df in candles.items():
+        signals = generate_signals(symbol, df, dict(CONFIG, tick_size=None), history=300, sr_interval=5)
+        assert (trades['symbol'] == symbol).sum() == len(signals['trades'])
+    assert trades['entry_time'].is_monotonic_increasing
+    # Equity ends at the capital plus every trade's PnL (open ones marked to the last close)
+    last_close = {symbol: df['Close'].iloc[-1] for symbol, df in candles.items()}
+    open_trades = trades[trades['status'] == 'open']
+    unrealized = sum(row.size * (last_close[row.symbol] - row.entry_price) for row in open_trades.itertuples())
+    assert np.isclose(serial['stats']['final_equity'], 1e6 + trades['pnl'].sum() + unrealized)
+    assert 0 <= serial['equity']['drawdown'].max() <= 1
+
+def test_shared_margin_limits_concurrent_positions():
+    candles = _candles(symbols=4)
+    result = run_portfolio_backtest(candles, CONFIG, capital=15.0, workers=1, history=300, sr_interval=5)
+    trades = result['trades']
+    assert result['stats']['skipped'] > 0
+    # Replay the trade list: an entry is taken exactly when the free margin covers 10 USDT
+    events = []
+    for row in trades.itertuples():
+        events.append((row.entry_time, 1, row.Index))
+        if row.status == 'closed':
+            events.append((row.exit_time, 0, row.Index))
+    cash, locked, entry_fees = 15.0, 0.0, {}
+    for _, kind, index in sorted(events):
+        row = trades.loc[index]
+        if kind == 1:
+            assert (row['status'] != 'skipped') == (cash - locked >= 10.0)
+            if row['status'] != 'skipped':
+                entry_fees[index] = 0.0006 * 250
+                cash -= entry_fees[index]
+                locked += 10.0
+        else:
+            cash += row['pnl'] + entry_fees[index]
+            locked -= 10.0
+    assert np.isclose(cash, 15.0 + trades['pnl'][trades['status'] == 'closed'].sum() -
+                      sum(fee for index, fee in entry_fees.items() if trades.loc[index, 'status'] == 'open'))
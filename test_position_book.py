@@ -0,0 +1,58 @@
+import numpy as np
+from live_signal_bot import calculate_stop_loss_price, take_profit_trigger
+from position_book import PositionBook, STOP_LOSS, TAKE_PROFIT
+
+def _naive_exits(positions, price):
+    """The live bot's per-position checks, applied to every open position"""
+    exits = {}
+    for position_id, position in list(positions.items()):
+        position['highest'] = max(position['highest'], price)
+        if price <= position['stop']:
+            exits[position_id] = STOP_LOSS
+        elif price > position['entry'] and price <= take_profit_trigger(position['entry'], position['highest']):
+            exits[position_id] = TAKE_PROFIT
+    for position_id in exits:
+        del positions[position_id]
+    return exits
+
+def test_matches_per_position_checks():
+    rng = np.random.default_rng(7)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 6000)))
+    book, naive, closed = PositionBook(), {}, 0
+    for tick, price in enumerate(prices):
+        exits = book.on_price('BTC', price)
+        expected = _naive_exits(naive, price)
+        assert {e['id']: e['reason'] for e in exits} == expected
+        for e in exits:
+            assert e['highest_price'] >= e['entry_price']
+        closed += len(exits)
+        # Open a few positions most ticks, close one manually now and then
+        for _ in range(rng.integers(0, 4)):
+            stop = calculate_stop_loss_price(price, 10.0, rng.integers(5, 50))
+            position_id = book.open('BTC', price, stop)
+            naive[position_id] = {'entry': float(price), 'highest': float(price), 'stop': stop}
+        if naive and tick % 50 == 0:
+            position_id = next(iter(naive))
+            del naive[position_id]
+            assert book.close(position_id)['id'] == position_id
+        assert book.open_count('BTC') == len(naive)
+        for position_id in list(naive)[:3]:
+            assert book.highest_price(position_id) == naive[position_id]['highest']
+    assert closed > 1000
+
+def test_symbols_are_independent_and_fields_kept():
+    book = PositionBook()
+    first = book.open('BTC', 100.0, 95.0, size=0.1)
+    book.open('ETH', 100.0, 99.0)
+    assert book.on_price('ETH', 120.0) == []
+    exits = book.on_price('BTC', 94.0)
+    assert [e['id'] for e in exits] == [first] and exits[0]['size'] == 0.1
+    assert book.open_count('ETH') == 1 and book.open_count('BTC') == 0
+
+    book.open('BTC', 100.0, 90.0)
+    book.on_price('BTC', 110.0)
+    # Stop at 90 and trigger 110 - 0.15 * 10 = 108.5
+    assert book.watched_levels('BTC') == [90.0, 108.5]
+    exits = book.on_price('BTC', 108.0)
+    assert exits[0]['reason'] == TAKE_PROFIT and exits[0]['highest_price'] == 110.0
+    assert book.get(first) is None and 'size' not in exits[0]
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from benchmarks import generate_lhl_candles
+from candle_buffer import CandleBuffer
+from price_ticks import PriceTicks, tick_size_from_market, DECIMAL_PLACES, TICK_SIZE
+from support_resistance import find_lhl_support_resistance
+
+def test_tick_size_from_market():
+    assert tick_size_from_market({'precision': {'price': 0.005}}, TICK_SIZE) == 0.005
+    assert tick_size_from_market({'precision': {'price': 3}}, DECIMAL_PLACES) == pytest.approx(0.001)
+    assert tick_size_from_market({'precision': {}}) is None
+
+def test_round_trip():
+    ticks = PriceTicks(0.005, np.int32)
+    prices = np.array([16.725, 16.73, 0.005, 12345.675])
+    counts = ticks.to_ticks(prices)
+    assert counts.dtype == np.int32
+    np.testing.assert_array_equal(counts, [3345, 3346, 1, 2469135])
+    np.testing.assert_array_equal(ticks.from_ticks(counts), prices)
+    assert ticks.from_ticks(3345.5) == 16.7275
+    with pytest.raises(ValueError):
+        ticks.to_ticks([np.nan])
+    with pytest.raises(ValueError):
+        PriceTicks(1e-9, np.int32).to_ticks([100.0])
+
+def _rounded_candles(seed):
+    candles = generate_lhl_candles(3000, seed=seed)
+    for name in ['Open', 'High', 'Low', 'Close']:
+        candles[name] = candles[name].round(3)
+    return candles
+
+def test_tick_candle_buffer():
+    candles = _rounded_candles(1)
+    floats = CandleBuffer.from_frame(candles, capacity=1000)
+    ticks = CandleBuffer.from_frame(candles, capacity=1000, tick_size=0.001)
+    assert ticks.nbytes < floats.nbytes
+    assert ticks.ticks('Close').dtype == np.int32
+    for name in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        np.testing.assert_array_equal(ticks.column(name), floats.column(name))
+    ticks.upsert(ticks.last_timestamp, 1.0, 2.0004, 0.9996, 1.5, 10.0)
+    assert ticks.last()[1:] == (1.0, 2.0, 1.0, 1.5, 10.0)
+
+def test_tick_levels_match_float_levels():
+    for seed in range(5):
+        candles = _rounded_candles(seed)
+        expected = find_lhl_support_resistance(candles, 0.005, 10, 10)
+        actual = find_lhl_support_resistance(candles, 0.005, 10, 10, tick_size=0.001)
+        assert list(actual['Tier']) == list(expected['Tier'])
+        assert (actual['Timestamp'] == expected['Timestamp']).all()
+        np.testing.assert_allclose(actual['Price'], expected['Price'], rtol=0, atol=1e-9)
+        # Levels land exactly on the half-tick grid
+        np.testing.assert_array_equal(actual['Price'], np.round(actual['Price'], 4))
@@ -0,0 +1,125 @@
+import random
+import ccxt
+import pytest
+from fakes import FakeClock
+from retry_policy import RetryPolicy, CircuitOpenError, backoff_delay, is_retryable
+
+def _flaky(failures, error=ccxt.NetworkError):
+    calls = []
+    def func(value):
+        calls.append(value)
+        if len(calls) <= failures:
+            raise error('boom')
+        return value
+    return func, calls
+
+def _policy(clock, **options):
+    return RetryPolicy(sleep=clock.sleep, clock=clock.time, seed=1, **options)
+
+def test_classification():
+    assert is_retryable(ccxt.RequestTimeout('x')) and is_retryable(ccxt.RateLimitExceeded('x'))
+    assert is_retryable(ccxt.ExchangeNotAvailable('x')) and is_retryable(ConnectionResetError())
+    assert not is_retryable(ccxt.InsufficientFunds('x')) and not is_retryable(ccxt.BadSymbol('x'))
+    assert not is_retryable(ValueError())
+
+def test_backoff_grows_with_jitter_and_cap():
+    delays = [backoff_delay(n, 1.0, 10.0, jitter=0.0) for n in range(6)]
+    assert delays == [1, 2, 4, 8, 10, 10]
+    jittered = [backoff_delay(3, 1.0, 10.0, jitter=0.5) for _ in range(200)]
+    assert 4.0 <= min(jittered) < max(jittered) <= 8.0
+
+def test_retries_transient_errors_only():
+    clock = FakeClock()
+    policy = _policy(clock, max_attempts=4, base_delay=1.0, jitter=0.0)
+    func, calls = _flaky(2)
+    assert policy.call('ohlcv', func, 7) == 7
+    assert len(calls) == 3 and clock.slept == [1.0, 2.0]
+
+    func, calls = _flaky(5, ccxt.InsufficientFunds)
+    with pytest.raises(ccxt.InsufficientFunds):
+        policy.call('order', func, 1)
+    assert len(calls) == 1
+
+def test_deadline_stops_retrying():
+    clock = FakeClock()
+    policy = _policy(clock, max_attempts=10, base_delay=1.0, jitter=0.0, deadline=5.0)
+    func, calls = _flaky(10)
+    with pytest.raises(ccxt.NetworkError):
+        policy.call('ohlcv', func, 1)
+    # Waits 1 + 2, the next 4s wait would overrun the 5s deadline
+    assert clock.slept == [1.0, 2.0] and len(calls) == 3
+
+def test_circuit_breaker_per_endpoint():
+    clock = FakeClock()
+    policy = _policy(clock, max_attempts=1, failure_threshold=3, reset_timeout=30.0)
+    func, calls = _flaky(100)
+    for _ in range(3):
+        with pytest.raises(ccxt.NetworkError):
+            policy.call('ticker', func, 1)
+    with pytest.raises(CircuitOpenError) as info:
+        policy.call('ticker', func, 1)
+    assert info.value.retry_after == 30.0 and len(calls) == 3
+    # Other endpoints are unaffected
+    assert policy.call('positions', lambda: 'ok') == 'ok'
+
+    # After the reset timeout one probe goes through; its failure re-opens the circuit
+    clock.now += 30.0
+    with pytest.raises(ccxt.NetworkError):
+        policy.call('ticker', func, 1)
+    with pytest.raises(CircuitOpenError):
+        policy.call('ticker', func, 1)
+    clock.now += 30.0
+    assert policy.call('ticker', lambda: 'up') == 'up'
+    assert policy.breaker('ticker').state == 'closed'
+
+class CandlesExchange:
+    """fetch_ohlcv serving `results` in order, then empty lists"""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.calls = 0
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=None):
+        self.calls += 1
+        return self.results.pop(0) if self.results else []
+
+def test_fetch_with_retry_retries_empty_results():
+    from live_signal_bot import fetch_with_retry
+    clock = FakeClock()
+    exchange = CandlesExchange([[], [], [[0, 1, 1, 1, 1, 1]]])
+    assert fetch_with_retry(exchange, 'X', _policy(clock, max_attempts=3, jitter=0.0)) == [[0, 1, 1, 1, 1, 1]]
+    assert clock.slept == [1.0, 2.0] and exchange.calls == 3
+
+    # Giving up takes max_attempts calls in total
+    clock = FakeClock()
+    exchange = CandlesExchange()
+    assert fetch_with_retry(exchange, 'X', _policy(clock, max_attempts=3, jitter=0.0)) is None
+    assert clock.slept == [1.0, 2.0] and exchange.calls == 3
+
+def test_fetch_with_retry_follows_the_policy_alone():
+    from live_signal_bot import fetch_with_retry
+    # The deadline bounds empty results like errors: the 4s wait would overrun it
+    clock = FakeClock()
+    exchange = CandlesExchange()
+    assert fetch_with_retry(exchange, 'X', _policy(clock, max_attempts=10, jitter=0.0, deadline=5.0)) is None
+    assert clock.slept == [1.0, 2.0] and exchange.calls == 3
+
+    # Jittered delays come from the policy's seeded generator
+    clock = FakeClock()
+    fetch_with_retry(CandlesExchange(), 'X', _policy(clock, max_attempts=3, jitter=0.5))
+    rng = random.Random(1)
+    assert clock.slept == [backoff_delay(n, 1.0, 30.0, 2.0, 0.5, rng) for n in range(2)]
+
+def test_interrupted_probe_does_not_wedge_the_circuit():
+    clock = FakeClock()
+    policy = _policy(clock, max_attempts=1, failure_threshold=1, reset_timeout=30.0)
+    func, _ = _flaky(1)
+    with pytest.raises(ccxt.NetworkError):
+        policy.call('ticker', func, 1)
+    clock.now += 30.0
+    def interrupted():
+        raise KeyboardInterrupt()
+    with pytest.raises(KeyboardInterrupt):
+        policy.call('ticker', interrupted)
+    # The probe gave no verdict: the next call may probe again
+    assert policy.call('ticker', lambda: 'up') == 'up'
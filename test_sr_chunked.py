@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from benchmarks import generate_lhl_candles
+from data_fetcher import iter_market_data_csv, load_market_data_from_csv
+from support_resistance import (
+    scan_lhl_patterns, scan_lhl_patterns_chunked, find_lhl_support_resistance, find_lhl_support_resistance_chunked
+)
+
+def _chunks(df, size):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+def test_chunked_patterns_match_in_memory():
+    candles = generate_lhl_candles(3000, seed=9)
+    close = candles['Close'].values.copy()
+    close[[0, 499, 500, 1777]] = np.nan
+    candles['Close'] = close
+    for window in (1, 5, 20):
+        expected = scan_lhl_patterns(close, candles['timestamp'].values, 0.005, window)
+        # Chunk sizes smaller than, equal to and larger than the halo
+        for size in (3, window, 128, 5000):
+            patterns, last_close, total = scan_lhl_patterns_chunked(_chunks(candles, size), 0.005, window)
+            assert total == len(candles) and last_close == close[-1]
+            for key in ('support_price', 'resistance_price', 'timestamp', 'recency_index'):
+                np.testing.assert_array_equal(patterns[key], expected[key])
+
+def test_chunked_levels_from_csv(tmp_path):
+    path = tmp_path / 'history.csv'
+    candles = generate_lhl_candles(5000, seed=2)
+    candles.rename(columns={'timestamp': 'Time'}).to_csv(path, index=False)
+    expected = find_lhl_support_resistance(load_market_data_from_csv(path), 0.005, 10, 10)
+    actual = find_lhl_support_resistance_chunked(iter_market_data_csv(path, chunksize=700), 0.005, 10, 10)
+    assert not expected.empty
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy.signal import argrelextrema
+from benchmarks import generate_lhl_candles
+from sr_kernels import NUMBA_BACKEND, NUMPY_BACKEND, get_backend
+from support_resistance import find_lhl_support_resistance
+
+def _series():
+    rng = np.random.default_rng(7)
+    smooth = generate_lhl_candles(2000, seed=5)['Close'].values
+    flat = np.round(100 + np.cumsum(rng.normal(0, 0.3, 1500)), 0)
+    with_nan = smooth.copy()
+    with_nan[[3, 400, 401, 1999]] = np.nan
+    return [smooth, flat, with_nan]
+
+def test_numpy_extrema_match_argrelextrema():
+    for close in _series():
+        for order in (1, 5, 10):
+            is_min, is_max = NUMPY_BACKEND.extrema_masks(close, order)
+            np.testing.assert_array_equal(np.flatnonzero(is_min), argrelextrema(close, np.less_equal, order=order)[0])
+            np.testing.assert_array_equal(np.flatnonzero(is_max), argrelextrema(close, np.greater_equal, order=order)[0])
+
+@pytest.mark.skipif(NUMBA_BACKEND is None, reason="numba not installed")
+def test_backends_agree():
+    for close in _series():
+        for order in (1, 5, 10):
+            for fast, ref in zip(NUMBA_BACKEND.extrema_masks(close, order), NUMPY_BACKEND.extrema_masks(close, order)):
+                np.testing.assert_array_equal(fast, ref)
+    candles = generate_lhl_candles(3000, seed=11)
+    for tolerance in (0.002, 0.01):
+        expected = find_lhl_support_resistance(candles, tolerance, 5, 10, backend='numpy')
+        actual = find_lhl_support_resistance(candles, tolerance, 5, 10, backend='numba')
+        assert not expected.empty
+        assert expected.equals(actual)
+
+def test_get_backend():
+    assert get_backend('numpy') is NUMPY_BACKEND
+    assert get_backend('auto') is (NUMBA_BACKEND or NUMPY_BACKEND)
+    with pytest.raises(ValueError):
+        get_backend('cuda')
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from benchmarks import generate_lhl_candles
+from live_signal_bot import get_closest_sr_levels, is_developing_lhl, _tier_price
+from sr_levels import SRLevels, SUPPORT, RESISTANCE, as_sr_levels
+from support_resistance import find_lhl_support_resistance
+
+def test_frame_round_trip():
+    candles = generate_lhl_candles(3000, seed=4)
+    levels = find_lhl_support_resistance(candles, 0.005, 10, 10, as_frame=False)
+    frame = find_lhl_support_resistance(candles, 0.005, 10, 10)
+    assert isinstance(levels, SRLevels) and len(levels) == len(frame)
+    pd.testing.assert_frame_equal(levels.to_frame(), frame)
+    pd.testing.assert_frame_equal(SRLevels.from_frame(frame).to_frame(), frame)
+    assert (levels.strength >= 1).all()
+    assert levels.tier_price(SUPPORT, 1) == frame['Price'].iat[0]
+
+def test_closest_levels_both_layouts():
+    candles = generate_lhl_candles(1000, seed=8)
+    config = {'sr_price_tolerance': 0.005}
+    price = float(candles['Close'].iat[-1])
+    frame = get_closest_sr_levels(price, candles, config)
+    levels = get_closest_sr_levels(price, candles, config, as_frame=False)
+    pd.testing.assert_frame_equal(levels.to_frame(), frame)
+    for sr in (frame, levels):
+        assert _tier_price(sr, 'R1') == levels.tier_price(RESISTANCE, 1)
+    # Re-tiered by distance: S1 is the nearest support
+    supports = levels.supports()
+    assert list(supports.tier) == list(range(1, len(supports) + 1))
+    assert np.all(np.diff(supports.distance) >= 0)
+
+def test_developing_lhl_accepts_both_layouts():
+    levels = SRLevels([RESISTANCE, SUPPORT, SUPPORT], [1, 1, 2], [11.0, 10.0, np.nan], pd.to_datetime(['2025-01-01'] * 3))
+    assert is_developing_lhl(10.04, levels, 0.005) == (True, 10.0)
+    assert is_developing_lhl(10.04, levels.to_frame(), 0.005) == (True, 10.0)
+    assert is_developing_lhl(9.99, levels, 0.005) == (False, None)
+    assert is_developing_lhl(10.04, None, 0.005) == (False, None)
+    assert as_sr_levels(pd.DataFrame()).empty
@@ -0,0 +1,27 @@
+import numpy as np
+from benchmarks import generate_lhl_candles
+from sr_kernels import NUMPY_BACKEND
+from sr_parallel import lhl_triples_parallel, partition_bounds
+from support_resistance import find_lhl_support_resistance
+
+def test_parallel_triples_match_single_process():
+    close = generate_lhl_candles(4000, seed=3)['Close'].values.copy()
+    close[[0, 999, 1000, 2500]] = np.nan
+    for window in (1, 5, 20):
+        is_min, is_max = NUMPY_BACKEND.extrema_masks(close, window)
+        expected = NUMPY_BACKEND.lhl_triples(close, is_min, is_max, 0.005)
+        # Partitions far smaller than the window force triples across several partitions
+        for partitions in (2, 7, 400):
+            actual = lhl_triples_parallel(close, window, 0.005, 'numpy', workers=2, partitions=partitions)
+            for exp, act in zip(expected, actual):
+                np.testing.assert_array_equal(act, exp)
+
+def test_parallel_levels_match():
+    candles = generate_lhl_candles(3000, seed=4)
+    expected = find_lhl_support_resistance(candles, 0.005, 10, 10, workers=1)
+    assert not expected.empty
+    assert expected.equals(find_lhl_support_resistance(candles, 0.005, 10, 10, workers=4))
+
+def test_partition_bounds():
+    assert partition_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert partition_bounds(2, 4) == [(0, 1), (1, 2)]
@@ -0,0 +1,58 @@
+import multiprocessing
+import uuid
+import ccxt
+import numpy as np
+import pytest
+from benchmarks import generate_lhl_candles
+from candle_buffer import CandleBuffer
+from live_signal_bot import get_closest_sr_levels
+from sr_publisher import SharedSRFeed, FeedExchange
+
+CONFIG = {'sr_price_tolerance': 0.01, 'entry_proximity': 0.002}
+
+def _reader(name, result):
+    feed = SharedSRFeed.attach(name)
+    data = feed.read()
+    result.put((data['version'], data['candles'][-1], data['levels'].price.tolist()))
+    feed.close()
+
+@pytest.fixture
+def feed():
+    feed = SharedSRFeed.create(f"lhl_test_{uuid.uuid4().hex[:8]}", capacity=300)
+    yield feed
+    feed.close()
+
+def test_publish_and_read(feed):
+    assert feed.read() is None
+    candles = generate_lhl_candles(500, seed=6)
+    buffer = CandleBuffer.from_frame(candles, capacity=400)
+    price = float(candles['Close'].iloc[-1])
+    levels = get_closest_sr_levels(price, buffer.to_frame(), CONFIG, as_frame=False)
+    feed.publish(buffer, levels)
+
+    data = feed.read()
+    assert data['version'] == 2 and data['last_price'] == price
+    assert len(data['candles']) == 300 and data['candles'][-1] == list(buffer.last())
+    np.testing.assert_array_equal(data['levels'].price, levels.price)
+    assert data['levels'].labels() == levels.labels()
+    np.testing.assert_array_equal(data['levels'].timestamp, levels.timestamp)
+
+    exchange = FeedExchange(feed)
+    assert exchange.fetch_ohlcv('X', limit=2) == data['candles'][-2:]
+    assert exchange.fetch_ohlcv('X', since=data['candles'][-5][0], limit=3) == data['candles'][-5:-2]
+    assert exchange.published_levels(price, None, CONFIG) is exchange._latest['levels']
+
+    # Another process attaches and reads the same data
+    result = multiprocessing.get_context('spawn').Queue()
+    process = multiprocessing.get_context('spawn').Process(target=_reader, args=(feed.shm.name, result))
+    process.start()
+    version, last_candle, prices = result.get(timeout=60)
+    process.join()
+    assert version == 2 and last_candle == data['candles'][-1] and prices == levels.price.tolist()
+
+def test_reader_retries_during_write(feed):
+    feed.header[0] = 3
+    with pytest.raises(ccxt.NetworkError, match="stayed busy"):
+        feed.read()
+    feed.header[0] = 4
+    assert feed.read() is not None
@@ -0,0 +1,109 @@
+import numpy as np
+import live_signal_bot
+from benchmarks import generate_lhl_candles
+from candle_buffer import CandleBuffer
+from market_replay import run_replay
+from sr_levels import SRLevels, SUPPORT, RESISTANCE
+from sr_registry import SRRegistry, ACTIVE, BROKEN, STALE
+
+def _levels(types, prices, timestamp_ms=0):
+    return SRLevels(types, np.arange(1, len(prices) + 1), prices,
+                    np.full(len(prices), timestamp_ms, dtype='datetime64[ms]'))
+
+def test_ids_are_stable_across_re_estimated_levels():
+    registry = SRRegistry(tolerance=0.01)
+    ids = registry.observe(_levels([SUPPORT, SUPPORT, RESISTANCE], [100.0, 95.0, 110.0]), 1000)
+    assert ids.tolist() == [1, 2, 3] and registry.added == [1, 2, 3]
+    # Prices re-estimated and tiers swapped: same ids, one new level, one gone
+    ids = registry.observe(_levels([SUPPORT, SUPPORT, RESISTANCE], [95.3, 100.4, 120.0]), 2000)
+    assert ids.tolist() == [2, 1, 4]
+    assert registry.added == [4] and registry.stale == [3]
+    assert registry.get(1)['price'] == 100.4 and registry.get(3)['state'] == STALE
+    # A support never matches a resistance at the same price
+    ids = registry.observe(_levels([RESISTANCE, SUPPORT], [110.2, 120.0]), 3000)
+    assert ids[0] == 3 and registry.get(3)['state'] == ACTIVE and ids[1] == 5
+
+def _candle_buffer(rows):
+    buffer = CandleBuffer(100)
+    for timestamp, row in enumerate(rows):
+        buffer.upsert(timestamp * 1000, *row)
+    return buffer
+
+def test_touches_volume_and_breaks_are_incremental():
+    # open, high, low, close, volume around a support at 100 and a resistance at 110
+    rows = [(105, 106, 104, 105, 1), (104, 105, 100.5, 103, 2), (103, 104, 102, 103, 3), (103, 103, 99.5, 101, 4),
+            (101, 101, 100.2, 100.8, 5), (101, 110.5, 101.5, 109, 6), (109, 112, 108, 111.5, 7), (111, 113, 110, 112, 8),
+            (102, 103, 101, 101, 9), (101, 101, 97, 97, 10), (97, 101, 96, 100, 11), (100, 100, 99, 99.5, 12)]
+    levels = _levels([SUPPORT, RESISTANCE], [100.0, 110.0], timestamp_ms=0)
+
+    at_once = SRRegistry(tolerance=0.01)
+    at_once.observe(levels, 0)
+    at_once.update(_candle_buffer(rows))
+
+    stepwise = SRRegistry(tolerance=0.01)
+    stepwise.observe(levels, 0)
+    for count in range(1, len(rows) + 1):
+        stepwise.update(_candle_buffer(rows[:count]))
+    for name in ('touches', 'last_touch', 'broken_at', 'volume', 'state', 'updated_to'):
+        np.testing.assert_array_equal(stepwise.column(name), at_once.column(name))
+
+    support, resistance = at_once.get(1), at_once.get(2)
+    # Touch episodes: candles 1, 3-4 (one episode) and 8; candle 9 breaks the support
+    assert support['touches'] == 3 and support['state'] == BROKEN and support['broken_at'] == 9000
+    assert support['volume'] == 2 + 4 + 5 + 9 and support['last_touch'] == 8000
+    # The resistance breaks on the candle closing at 111.5; only candle 5 touched it before
+    assert resistance['touches'] == 1 and resistance['broken_at'] == 6000 and resistance['volume'] == 6
+    assert resistance['last_touch'] == 5000
+    # The forming last candle is never folded in
+    assert at_once.get(1)['updated_to'] == 10000
+
+def test_changes_are_appended_and_compacted(tmp_path):
+    path = str(tmp_path / 'sr_registry.csv')
+    registry = SRRegistry.load(path, tolerance=0.01)
+    registry.observe(_levels([SUPPORT, RESISTANCE], [100.0, 110.0]), 1000)
+    assert registry.flush() == 2
+    registry.observe(_levels([SUPPORT, RESISTANCE], [100.0, 110.0]), 2000)
+    assert registry.flush() == 0  # Nothing but last_seen changed
+    registry.observe(_levels([SUPPORT, RESISTANCE], [100.5, 110.0]), 3000)
+    assert registry.flush() == 1
+    with open(path) as f:
+        assert len(f.readlines()) == 1 + 3
+
+    restored = SRRegistry.load(path, tolerance=0.01)
+    assert restored.get(1)['price'] == 100.5 and len(restored) == 2
+    with open(path) as f:
+        assert len(f.readlines()) == 1 + 2
+    assert restored.observe(_levels([RESISTANCE, SUPPORT], [110.0, 90.0]), 4000).tolist() == [2, 3]
+
+def test_capacity_drops_levels_seen_longest_ago():
+    registry = SRRegistry(tolerance=0.001, capacity=3)
+    registry.observe(_levels([SUPPORT, SUPPORT], [100.0, 90.0]), 1000)
+    registry.observe(_levels([SUPPORT], [80.0]), 2000)
+    registry.observe(_levels([SUPPORT], [70.0]), 3000)
+    assert sorted(registry.column('id').tolist()) == [2, 3, 4]
+
+def test_bot_keys_sr_changes_on_level_ids(tmp_path):
+    candles = generate_lhl_candles(900, seed=8, pattern_every=60)
+    config = live_signal_bot.load_config()
+    plain = run_replay(candles, history=400, config=config)
+    registry_file = tmp_path / 'sr_registry.csv'
+    config['sr_registry'] = {'enabled': True, 'file': str(registry_file), 'capacity': 500}
+    registered = run_replay(candles, history=400, config=config)
+
+    trades = lambda result: [(e['ts'], e['action'], e['price']) for e in result['events'] if e['event'] == 'trade']
+    assert trades(registered) == trades(plain)
+    assert registered['stats']['events'].get('sr_change', 0) < plain['stats']['events']['sr_change']
+    levels = [e for e in registered['events'] if e['event'] == 'sr_level']
+    assert levels and any(e['state'] == 'broken' for e in levels)
+    # A replay never touches the live registry file
+    assert not registry_file.exists()
+
+def test_registry_of_another_symbol_is_not_loaded(tmp_path):
+    path = str(tmp_path / 'sr_registry.csv')
+    registry = SRRegistry.load(path, symbol='BTCUSDT')
+    registry.observe(_levels([SUPPORT], [100.0]), 1000)
+    registry.close()
+    assert len(SRRegistry.load(path, symbol='BTCUSDT')) == 1
+    other = SRRegistry.load(path, symbol='ETHUSDT')
+    assert len(other) == 0
+    assert other.observe(_levels([SUPPORT], [100.0]), 2000).tolist() == [1] and other.added == [1]
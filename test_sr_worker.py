@@ -0,0 +1,71 @@
+import time
+import numpy as np
+import live_signal_bot
+from benchmarks import generate_lhl_candles
+from candle_buffer import CandleBuffer
+from sr_worker import SRWorker
+
+def _append(buffer, rows):
+    timestamps = rows['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+    for timestamp, row in zip(timestamps, rows[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy()):
+        buffer.upsert(int(timestamp), *row)
+
+def _assert_same_levels(a, b):
+    assert len(a) == len(b)
+    for field in ('type_code', 'tier', 'price', 'strength'):
+        np.testing.assert_array_equal(getattr(a, field), getattr(b, field))
+
+def test_worker_levels_match_inline_computation():
+    df = generate_lhl_candles(700, seed=3, pattern_every=60)
+    config = live_signal_bot.load_config()
+    buffer = CandleBuffer.from_frame(df.iloc[:500])
+    worker = SRWorker(buffer, deadline=30.0)
+    try:
+        for rows in (500, 501, 501, 540):
+            if rows > len(buffer):
+                _append(buffer, df.iloc[len(buffer):rows])
+            else:
+                # The forming candle changes in place
+                last = buffer.last()
+                buffer.upsert(last[0], last[1], last[2] + 1.0, last[3], last[4] + 0.5, last[5] + 1.0)
+            price = float(buffer.column('Close')[-1])
+            expected = live_signal_bot.get_closest_sr_levels(price, buffer.to_frame(), config, as_frame=False)
+            _assert_same_levels(worker.levels(price, config), expected)
+        assert worker.late_requests == 0
+    finally:
+        worker.close()
+
+def slow_levels(current_price, historical_candles_df, config):
+    time.sleep(config['delay'])
+    return ('levels', len(historical_candles_df), current_price)
+
+def test_late_request_serves_last_levels_then_catches_up():
+    df = generate_lhl_candles(50, seed=1)
+    buffer = CandleBuffer.from_frame(df)
+    worker = SRWorker(buffer, deadline=0.05, initial_levels='old', sr_function=slow_levels)
+    try:
+        started = time.monotonic()
+        assert worker.levels(1.0, {'delay': 0.5}) == 'old'
+        assert time.monotonic() - started < 0.4
+        assert worker.late_requests == 1
+        # Still running: no second request, still the last good levels
+        assert worker.levels(2.0, {'delay': 0.0}) == 'old'
+        time.sleep(0.6)
+        assert worker.levels(3.0, {'delay': 0.0}) in (('levels', 50, 1.0), ('levels', 50, 3.0))
+        assert worker.levels(4.0, {'delay': 0.0}) == ('levels', 50, 4.0)
+    finally:
+        worker.close()
+
+def test_dead_worker_is_restarted_with_full_history():
+    df = generate_lhl_candles(80, seed=2)
+    buffer = CandleBuffer.from_frame(df.iloc[:60])
+    worker = SRWorker(buffer, deadline=5.0, sr_function=slow_levels)
+    try:
+        assert worker.levels(1.0, {'delay': 0.0}) == ('levels', 60, 1.0)
+        worker._process.kill()
+        worker._process.join()
+        _append(buffer, df.iloc[60:70])
+        assert worker.levels(2.0, {'delay': 0.0}) == ('levels', 70, 2.0)
+        assert worker.restarts == 1
+    finally:
+        worker.close()
@@ -0,0 +1,95 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from candle_buffer import CandleBuffer
+from state_snapshot import (
+    save_snapshot, load_snapshot, restore_candle_buffer, restore_sr_levels, fetch_missed_candles, TIMEFRAME_MS
+)
+
+class MissedCandlesExchange:
+    """Serves 5m candles up to 'now' from a start time, like fetch_ohlcv(since=...)"""
+
+    def __init__(self, first_ms, count):
+        self.rows = [[first_ms + i * TIMEFRAME_MS, 1.0, 2.0, 0.5, float(i), 10.0] for i in range(count)]
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        self.calls.append(since)
+        rows = [r for r in self.rows if since is None or r[0] >= since]
+        return rows[:limit]
+
+def _buffer_ending_now(count):
+    now_ms = int(time.time() * 1000) // TIMEFRAME_MS * TIMEFRAME_MS
+    buffer = CandleBuffer(capacity=50)
+    for i in range(count):
+        buffer.upsert(now_ms - (count - 1 - i) * TIMEFRAME_MS, 1.0, 2.0, 0.5, float(i), 10.0)
+    return buffer
+
+def test_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / 'bot_state.npz')
+    buffer = _buffer_ending_now(30)
+    state = {'in_position': True, 'entry_price': 15.2, 'highest_price_since_entry': 15.6,
+             'resistance_target': 16.0, 'stop_loss_price': 15.1}
+    sr_df = pd.DataFrame({
+        'Type': ['Support', 'Resistance'], 'Tier': ['S1', 'R1'], 'Price': [15.0, 16.0],
+        'Timestamp': pd.to_datetime(['2025-05-20 10:00', '2025-05-20 11:00']), 'distance': [0.2, 0.8]
+    })
+    save_snapshot(path, 'LINKUSDT_UMCBL', state, buffer, sr_df)
+    save_snapshot(path, 'LINKUSDT_UMCBL', state, buffer, sr_df)  # overwrite in place
+
+    assert os.listdir(tmp_path) == ['bot_state.npz']
+    snapshot = load_snapshot(path)
+    assert snapshot['symbol'] == 'LINKUSDT_UMCBL'
+    assert snapshot['strategy_state'] == state
+
+    restored = restore_candle_buffer(snapshot)
+    np.testing.assert_array_equal(restored.timestamps(), buffer.timestamps())
+    np.testing.assert_array_equal(restored.column('Close'), buffer.column('Close'))
+
+    levels = restore_sr_levels(snapshot, current_price=15.3)
+    assert levels['Tier'].tolist() == ['S1', 'R1']
+    assert levels['Timestamp'].iloc[1] == pd.Timestamp('2025-05-20 11:00')
+    assert np.isclose(levels['distance'].iloc[0], 0.3)
+
+def test_restore_follows_the_callers_tick_size(tmp_path):
+    path = str(tmp_path / 'bot_state.npz')
+    buffer = CandleBuffer(capacity=10, tick_size=0.5)
+    buffer.upsert(0, 10.0, 11.0, 9.5, 10.5, 1.0)
+    save_snapshot(path, 'TEST', {}, buffer)
+    snapshot = load_snapshot(path)
+    assert restore_candle_buffer(snapshot).tick_size == 0.5
+    # Price ticks switched off in the config since the snapshot was taken
+    restored = restore_candle_buffer(snapshot, tick_size=None)
+    assert restored.tick_size is None and restored.last() == buffer.last()
+
+def test_missing_or_corrupt_snapshot(tmp_path):
+    assert load_snapshot(str(tmp_path / 'missing.npz')) is None
+    bad = tmp_path / 'bad.npz'
+    bad.write_bytes(b'not a snapshot')
+    assert load_snapshot(str(bad)) is None
+
+def test_fetch_missed_candles_only_fetches_gap():
+    buffer = _buffer_ending_now(20)
+    last = buffer.last_timestamp
+    exchange = MissedCandlesExchange(last - 5 * TIMEFRAME_MS, 8)
+    assert fetch_missed_candles(exchange, 'LINKUSDT_UMCBL', buffer)
+    assert exchange.calls[0] == last
+    assert buffer.last_timestamp == last + 2 * TIMEFRAME_MS
+    assert len(buffer) == 22
+
+def test_fetch_missed_candles_gap_too_large():
+    buffer = CandleBuffer(capacity=10)
+    buffer.upsert(int(time.time() * 1000) - 100 * TIMEFRAME_MS, 1, 1, 1, 1, 1)
+    exchange = MissedCandlesExchange(0, 0)
+    assert not fetch_missed_candles(exchange, 'LINKUSDT_UMCBL', buffer)
+    assert exchange.calls == []
+
+def test_fetch_missed_candles_sizes_the_gap_on_the_callers_clock():
+    buffer = CandleBuffer(capacity=10)
+    buffer.upsert(0, 1, 1, 1, 1, 1)
+    exchange = MissedCandlesExchange(0, 4)
+    # Candles from 1970 are far too old on the wall clock, not on a replay clock three candles later
+    assert fetch_missed_candles(exchange, 'LINKUSDT_UMCBL', buffer, now_ms=3 * TIMEFRAME_MS)
+    assert exchange.calls == [0] and len(buffer) == 4
+    assert not fetch_missed_candles(exchange, 'LINKUSDT_UMCBL', buffer, now_ms=20 * TIMEFRAME_MS)
@@ -0,0 +1,81 @@
+import configparser
+import numpy as np
+import live_signal_bot
+from benchmarks import generate_lhl_candles
+from market_replay import run_replay
+from state_snapshot import save_snapshot, load_snapshot
+from candle_buffer import CandleBuffer
+from fakes import RecordingJournal
+from sr_levels import SRLevels, SUPPORT
+from strategy_variants import load_variants, VariantRunner
+
+def test_load_variants_fills_in_defaults():
+    parser = configparser.ConfigParser()
+    parser.read_string(
+        "[TRADING]\nLEVERAGE = 25\n"
+        "[VARIANT.tight]\nENTRY_PROXIMITY_PERCENT = 0.001\nTAKE_PROFIT_FRACTION = 0.1\n"
+        "[VARIANT.wide_stop]\nSTOP_LOSS_USDT = 3\nLEVERAGE = 10\n"
+    )
+    variants = load_variants(parser, {'trade_margin_usdt': 10.0, 'leverage': 25})
+    assert [v['name'] for v in variants] == ['tight', 'wide_stop']
+    assert variants[0] == {'name': 'tight', 'entry_proximity': 0.001, 'take_profit_fraction': 0.1,
+                           'stop_loss_usdt': 1.5, 'trade_margin_usdt': 10.0, 'leverage': 25}
+    assert variants[1]['entry_proximity'] is None
+    assert variants[1]['stop_loss_usdt'] == 3.0 and variants[1]['leverage'] == 10
+
+def _replay_config(variants):
+    config = live_signal_bot.load_config()
+    config['variants'] = variants
+    return config
+
+def test_variants_share_one_sr_computation(monkeypatch):
+    calls = []
+    original = live_signal_bot.get_closest_sr_levels
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(live_signal_bot, 'get_closest_sr_levels', counting)
+
+    variants = [
+        # Same rules as the main strategy: must trade exactly like it
+        {'name': 'same', 'entry_proximity': None, 'take_profit_fraction': 0.15, 'stop_loss_usdt': 1.5,
+         'trade_margin_usdt': 10.0, 'leverage': 25},
+        {'name': 'loose', 'entry_proximity': 0.01, 'take_profit_fraction': 0.3, 'stop_loss_usdt': 3.0,
+         'trade_margin_usdt': 10.0, 'leverage': 25},
+    ]
+    config = _replay_config(variants)
+    result = run_replay(generate_lhl_candles(900, seed=8, pattern_every=60), history=400, config=config)
+    assert len(calls) == result['stats']['cycles']
+
+    trades = [e for e in result['events'] if e['event'] == 'trade']
+    main_trades = [(e['ts'], e['action'], e['price']) for e in trades if 'variant' not in e]
+    same_trades = [(e['ts'], e['action'], e['price']) for e in trades if e.get('variant') == 'same']
+    loose_trades = [e for e in trades if e.get('variant') == 'loose']
+    assert main_trades and main_trades == same_trades
+    assert loose_trades and loose_trades != same_trades
+    # Exits carry their P&L
+    exits = [e for e in loose_trades if e['action'] != 'entry']
+    assert all(('pnl' in e) for e in exits)
+
+def test_variant_states_survive_a_snapshot(tmp_path):
+    variants = [{'name': 'a', 'entry_proximity': 0.01, 'take_profit_fraction': 0.15, 'stop_loss_usdt': 1.5,
+                 'trade_margin_usdt': 10.0, 'leverage': 25}]
+    runner = VariantRunner(variants, 'TEST', RecordingJournal())
+    levels = SRLevels(type_code=np.array([SUPPORT]), tier=np.array([1]), price=np.array([100.0]),
+                      timestamp=np.array([0], dtype='datetime64[ms]'), strength=np.array([1]))
+    assert runner.on_price(100.5, levels, 0.002)
+    assert runner.states['a']['in_position']
+    assert runner.on_price(101.5, levels, 0.002) is False
+    assert runner.on_price(101.2, levels, 0.002)  # trails back past 101.5 - 0.15 * 1.0
+    state = runner.states['a']
+    assert not state['in_position'] and state['trades'] == 1 and state['wins'] == 1
+    assert abs(state['realized_pnl'] - 250 / 100.5 * 0.7) < 1e-9
+    assert runner.on_price(100.4, levels, 0.002)
+
+    path = str(tmp_path / 'state.npz')
+    buffer = CandleBuffer(10)
+    buffer.upsert(0, 1, 1, 1, 1, 1)
+    save_snapshot(path, 'TEST', live_signal_bot.new_strategy_state(), buffer, None, runner.states)
+    restored = VariantRunner(variants, 'TEST', RecordingJournal(), load_snapshot(path)['variant_states'])
+    assert restored.states == runner.states
+    assert restored.watched_levels() == runner.watched_levels() == [runner.states['a']['stop_loss_price']]
@@ -14,13 +14,16 @@ Potential functions based on lhl.txt:
 - Symbol conversion utilities (e.g. Bitget specific to standard).
 """
 
-import ccxt
 import logging
+import base64
 import hashlib
 import hmac
 import time
 import json
-import requests # For direct API calls if needed
+# ccxt and requests are imported inside the functions that use them, so
+# importing this module (e.g. for the symbol helpers) stays cheap
+
+from retry_policy import RetryPolicy
 
 # Configure logging (can be centralized here or done in each main script)
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -36,6 +39,7 @@ def get_ccxt_exchange(exchange_id, api_key, api_secret, passphrase=None, is_sand
     passing the credentials explicitly.
     """
     logging.warning("utils.get_ccxt_exchange is DEPRECATED. Use data_fetcher.get_exchange_client and pass credentials directly.")
+    import ccxt
     try:
         exchange_class = getattr(ccxt, exchange_id)
         config = {
@@ -55,11 +59,12 @@ def get_ccxt_exchange(exchange_id, api_key, api_secret, passphrase=None, is_sand
         logging.error(f"Error initializing CCXT exchange {exchange_id}: {e}")
         return None
 
-def set_leverage_with_retry(exchange, symbol, leverage, max_retries=3, delay_seconds=5):
+def set_leverage_with_retry(exchange, symbol, leverage, max_retries=3, delay_seconds=5, policy=None):
     """
     Sets leverage for a symbol on the exchange, with retry logic.
     Assumes the symbol is for a futures/margin market that supports leverage.
     """
+    import ccxt
     if not hasattr(exchange, 'set_leverage') or not exchange.has.get('setLeverage'):
         logging.warning(f"{exchange.id} does not support setting leverage via CCXT, or flag not set.")
         # Check if the market itself supports leverage according to CCXT market structure
@@ -73,30 +78,20 @@ def set_leverage_with_retry(exchange, symbol, leverage, max_retries=3, delay_sec
             logging.warning(f"Could not check market details for {symbol} on {exchange.id}: {e}")
             # Proceed with trying to set leverage cautiously
 
-    attempt = 0
-    while attempt < max_retries:
-        try:
-            logging.info(f"Attempting to set leverage for {symbol} to {leverage}x on {exchange.id}")
-            # Some exchanges might require productType for Bitget e.g. 'USDT-FUTURES' or 'COIN-FUTURES'
-            # params = {'productType': 'PERPETUAL'} # Example for some exchanges
-            # The exact params might vary or not be needed if defaultType is set on exchange instance
-            exchange.set_leverage(leverage, symbol)
-            logging.info(f"Successfully set leverage for {symbol} to {leverage}x on {exchange.id}.")
-            return True
-        except ccxt.NetworkError as e:
-            logging.warning(f"Network error setting leverage for {symbol} (attempt {attempt + 1}/{max_retries}): {e}")
-            attempt += 1
-            time.sleep(delay_seconds)
-        except ccxt.ExchangeError as e:
-            logging.error(f"Exchange error setting leverage for {symbol} on {exchange.id}: {e}")
-            # Some errors might be non-retryable (e.g., invalid symbol, leverage too high)
-            # Check e.g. if e contains "leverage not supported" or similar
-            return False # For now, assume exchange errors are not retryable here
-        except Exception as e:
-            logging.error(f"An unexpected error occurred setting leverage for {symbol} (attempt {attempt + 1}/{max_retries}): {e}")
-            attempt += 1
-            time.sleep(delay_seconds)
-    logging.error(f"Failed to set leverage for {symbol} to {leverage}x after {max_retries} retries.")
+    # Network errors are retried with exponential backoff from delay_seconds (see retry_policy.py)
+    policy = policy or RetryPolicy(max_attempts=max_retries, base_delay=delay_seconds)
+    try:
+        logging.info(f"Attempting to set leverage for {symbol} to {leverage}x on {exchange.id}")
+        # Some exchanges might require productType for Bitget e.g. 'USDT-FUTURES' or 'COIN-FUTURES'
+        # The exact params might vary or not be needed if defaultType is set on exchange instance
+        policy.call('set_leverage', exchange.set_leverage, leverage, symbol)
+        logging.info(f"Successfully set leverage for {symbol} to {leverage}x on {exchange.id}.")
+        return True
+    except ccxt.ExchangeError as e:
+        # Rejections (invalid symbol, leverage too high, ...) are not retried
+        logging.error(f"Exchange error setting leverage for {symbol} on {exchange.id}: {e}")
+    except Exception as e:
+        logging.error(f"Failed to set leverage for {symbol} to {leverage}x: {e}")
     return False
 
 def create_market_buy_order_with_cost(exchange, symbol, cost_usdt, leverage=1):
@@ -106,6 +101,7 @@ def create_market_buy_order_with_cost(exchange, symbol, cost_usdt, leverage=1):
     This is a common way for futures, but check exchange specifics.
     `create_market_buy_order_with_cost` is a CCXT unified method for this.
     """
+    import ccxt
     try:
         # Fetch current price to estimate size, though create_market_buy_order_with_cost might do this internally
         # ticker = exchange.fetch_ticker(symbol)
@@ -178,7 +174,8 @@ def generate_bitget_v1_signature(timestamp, method, request_path, body_str, api_
     # Re-check Bitget docs: V1 /api/mix/v1/order/placeOrder says base64-encoded SHA256
     # return base64.b64encode(mac.digest()).decode()
 
-def close_long_position_bitget_v1(api_key, api_secret, passphrase, symbol_bitget, size, margin_coin='USDT'):
+def close_long_position_bitget_v1(api_key, api_secret, passphrase, symbol_bitget, size, margin_coin='USDT',
+                                  base_url=BITGET_V1_BASE_URL):
     """
     Closes a long position using Bitget's V1 API directly.
     (As described in lhl.txt as a specific method being used)
@@ -188,7 +185,9 @@ def close_long_position_bitget_v1(api_key, api_secret, passphrase, symbol_bitget
         symbol_bitget (str): The Bitget specific symbol (e.g., 'BTCUSDT_UMCBL').
         size (str or float): The size of the position to close (in base currency).
         margin_coin (str): The margin coin (e.g., 'USDT').
+        base_url (str): API root, e.g. a local exchange_simulator.py instance.
     """
+    import requests
     timestamp = str(int(time.time() * 1000))
     method = 'POST'
     request_path = '/api/mix/v1/order/placeOrder' # Check if this is correct for closing
@@ -218,7 +217,7 @@ def close_long_position_bitget_v1(api_key, api_secret, passphrase, symbol_bitget
         'X-LOCALE': 'en-US' # Optional, but good practice
     }
 
-    url = BITGET_V1_BASE_URL + request_path
+    url = base_url + request_path
     try:
         logging.info(f"Attempting to close long position for {symbol_bitget}, size {size} via Bitget V1 API.")
         response = requests.post(url, headers=headers, data=body_str, timeout=10)